@@ -0,0 +1,235 @@
+"""
+Hand strength buckets for limit hold'em, a card abstraction for the MC agents.
+
+A hand's strength on a street is its expected hand strength (EHS): P(win) + P(tie) / 2
+against a uniformly random opponent hand, with the rest of the board dealt at random.
+Each street splits hands into K buckets of equal probability by EHS:
+
+    preflop  exact table over the 169 hole card classes (13 x 13, suited above the
+             diagonal), EHS by Monte Carlo when the table is built
+    postflop K - 1 EHS quantiles per street, measured on random deals when the table is
+             built. A state's EHS is estimated with a fixed number of samples seeded
+             by its suit canonical cards (isomorphism.py), so a state always lands in
+             the same bucket, and cached
+
+The tables are a small .npz (BUCKETS_FILE, built with `python abstraction.py`), loaded
+on first use. process_limit_state_v3/v4 in utils.py key on the bucket of every street
+so far instead of the exact cards.
+"""
+
+import argparse
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from isomorphism import canonical_limit_cards
+from limit_engine import CARD_STRS, NUM_CARDS, rank_hands
+
+BUCKETS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "limit_buckets.npz"
+)
+STREETS = ("preflop", "flop", "turn", "river")
+BOARD_SIZES = (0, 3, 4, 5)
+CARD_IDS = {c: i for i, c in enumerate(CARD_STRS)}
+
+_tables = None
+
+
+def hand_strength(holes, boards, samples, rng):
+    """
+    Monte Carlo EHS of hole cards on (partial) boards of the same size.
+
+    Args:
+        holes (np.ndarray): int array [n, 2] of card ids.
+        boards (np.ndarray): int array [n, b] of card ids, b in 0, 3, 4, 5.
+        samples (int): Opponent hands / runouts per hand.
+        rng (np.random.Generator): Source of the samples.
+
+    Returns:
+        np.ndarray: float array [n], P(win) + P(tie) / 2.
+    """
+    holes = np.asarray(holes, dtype=np.int64)
+    n = len(holes)
+    boards = np.asarray(boards, dtype=np.int64).reshape(n, -1)
+    need = 2 + 5 - boards.shape[1]
+
+    # random order of the unseen cards per sample, known cards sort last
+    known = np.zeros((n, NUM_CARDS))
+    known[np.arange(n)[:, None], np.concatenate([holes, boards], axis=1)] = 2
+    keys = rng.random((n, samples, NUM_CARDS)) + known[:, None, :]
+    dealt = np.argsort(keys, axis=2)[:, :, :need]
+
+    shown = np.broadcast_to(boards[:, None, :], (n, samples, boards.shape[1]))
+    full_boards = np.concatenate([shown, dealt[:, :, 2:]], axis=2)
+    mine = np.concatenate(
+        [np.broadcast_to(holes[:, None, :], (n, samples, 2)), full_boards], axis=2
+    )
+    theirs = np.concatenate([dealt[:, :, :2], full_boards], axis=2)
+    my_rank = rank_hands(mine.reshape(-1, 7))
+    their_rank = rank_hands(theirs.reshape(-1, 7))
+    score = (my_rank > their_rank) + 0.5 * (my_rank == their_rank)
+    return score.reshape(n, samples).mean(axis=1)
+
+
+def preflop_class(hole):
+    """(row, col) of two hole card ids in the 13 x 13 preflop table."""
+    (r1, s1), (r2, s2) = sorted(divmod(c, 13)[::-1] for c in hole)
+    return (r1, r2) if s1 == s2 else (r2, r1)
+
+
+def _equal_mass_buckets(values, weights, k):
+    """Bucket of each value so every bucket holds about 1/k of the total weight."""
+    order = np.argsort(values, kind="stable")
+    mass = np.cumsum(weights[order]) - weights[order] / 2
+    buckets = np.empty(len(values), dtype=np.uint8)
+    buckets[order] = np.minimum(mass / weights.sum() * k, k - 1).astype(np.uint8)
+    return buckets
+
+
+def build_bucket_tables(
+    buckets=(8, 8, 8, 8),
+    preflop_samples=3000,
+    deals=3000,
+    samples=100,
+    seed=0,
+    chunk_size=200,
+):
+    """
+    Measure the bucket tables, see the module docstring.
+
+    Args:
+        buckets (tuple): K for preflop, flop, turn and river.
+        preflop_samples (int): Samples per hole card class for the preflop table.
+        deals (int): Random deals per postflop street to place the quantiles.
+        samples (int): Samples per postflop EHS, here and when a state is bucketed.
+        seed (int): Seed of the build.
+        chunk_size (int): Hands per hand_strength call, bounds memory.
+
+    Returns:
+        dict: arrays as stored by save_bucket_tables.
+    """
+    rng = np.random.default_rng(seed)
+
+    # one representative per preflop class, weighted by its number of combos
+    reps = {}
+    weights = np.zeros((13, 13))
+    for a in range(NUM_CARDS):
+        for b in range(a + 1, NUM_CARDS):
+            cls = preflop_class((a, b))
+            reps.setdefault(cls, (a, b))
+            weights[cls] += 1
+    classes = list(reps)
+    ehs = np.concatenate(
+        [
+            hand_strength(
+                [reps[c] for c in classes[i : i + chunk_size]],
+                np.zeros((len(classes[i : i + chunk_size]), 0)),
+                preflop_samples,
+                rng,
+            )
+            for i in range(0, len(classes), chunk_size)
+        ]
+    )
+    preflop = np.zeros((13, 13), dtype=np.uint8)
+    class_weights = np.array([weights[c] for c in classes])
+    class_buckets = _equal_mass_buckets(ehs, class_weights, buckets[0])
+    for cls, bucket in zip(classes, class_buckets):
+        preflop[cls] = bucket
+
+    tables = {
+        "buckets": np.array(buckets, dtype=np.int64),
+        "samples": np.array(samples, dtype=np.int64),
+        "preflop": preflop,
+    }
+    for street in (1, 2, 3):
+        cards = np.argsort(rng.random((deals, NUM_CARDS)), axis=1)
+        holes, boards = cards[:, :2], cards[:, 2 : 2 + BOARD_SIZES[street]]
+        ehs = np.concatenate(
+            [
+                hand_strength(
+                    holes[i : i + chunk_size], boards[i : i + chunk_size], samples, rng
+                )
+                for i in range(0, deals, chunk_size)
+            ]
+        )
+        k = buckets[street]
+        quantiles = np.quantile(ehs, np.arange(1, k) / k)
+        tables[STREETS[street]] = quantiles.astype(np.float32)
+    return tables
+
+
+def save_bucket_tables(tables, path=BUCKETS_FILE):
+    np.savez_compressed(path, **tables)
+
+
+def load_bucket_tables(path=BUCKETS_FILE):
+    """Load (and from now on use) the bucket tables at `path`."""
+    global _tables
+    with np.load(path) as data:
+        _tables = {name: data[name] for name in data.files}
+    _postflop_bucket.cache_clear()
+    return _tables
+
+
+def _get_tables():
+    return _tables if _tables is not None else load_bucket_tables()
+
+
+@lru_cache(maxsize=1 << 18)
+def _postflop_bucket(hand, board):
+    tables = _get_tables()
+    hole = [CARD_IDS[c] for c in hand]
+    cards = [CARD_IDS[c] for c in board]
+    # same seed for every suit permutation of the state
+    seed = int.from_bytes(bytes(hole + cards), "little")
+    ehs = hand_strength(
+        [hole], [cards], int(tables["samples"]), np.random.default_rng(seed)
+    )[0]
+    street = STREETS[BOARD_SIZES.index(len(board))]
+    return int(np.searchsorted(tables[street], ehs, side="right"))
+
+
+def hand_bucket(hand, public_cards):
+    """
+    Bucket of hole cards on the current board.
+
+    Args:
+        hand (list): Two card strings, like raw_obs["hand"].
+        public_cards (list): 0, 3, 4 or 5 card strings, like raw_obs["public_cards"].
+
+    Returns:
+        int: bucket id, 0 is the weakest.
+    """
+    if not public_cards:
+        cls = preflop_class([CARD_IDS[c] for c in hand])
+        return int(_get_tables()["preflop"][cls])
+    hand, board = canonical_limit_cards(hand, public_cards)
+    return _postflop_bucket(tuple(hand), tuple(board))
+
+
+def bucket_history(hand, public_cards):
+    """Buckets of the hand on every street so far, (preflop, flop, ...)."""
+    return tuple(
+        hand_bucket(hand, public_cards[:size])
+        for size in BOARD_SIZES
+        if size <= len(public_cards)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the limit hold'em bucket tables.")
+    parser.add_argument("--buckets", type=int, nargs=4, default=[8, 8, 8, 8])
+    parser.add_argument("--preflop-samples", type=int, default=3000)
+    parser.add_argument("--deals", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=BUCKETS_FILE)
+    args = parser.parse_args()
+    tables = build_bucket_tables(
+        tuple(args.buckets), args.preflop_samples, args.deals, args.samples, args.seed
+    )
+    save_bucket_tables(tables, args.out)
+    print(f"saved {args.out}")
+    for street in STREETS[1:]:
+        print(street, np.round(tables[street], 3))
@@ -0,0 +1,166 @@
+"""
+Versioned binary file format for the tabular MC agents.
+
+Layout (little endian):
+    8 bytes   MAGIC
+    uint32    format version
+    uint32    header length
+    header    utf-8 JSON: agent class, epsilon, gamma, state transformer name, actions,
+              and dtype / shape / offset of every array
+    arrays    from the first 64 byte boundary after the header, each starting on a
+              64 byte boundary (header offsets are relative to the first one):
+              q [S, A] float64, n [S, A] int64, key_offsets [S + 1] int64,
+              key_blob uint8 (repr of every info state followed by ",")
+
+Arrays are opened with np.memmap, so loading an agent only reads the header, pages are
+shared between processes, and the key blob is decoded on the first table lookup.
+
+Convert pickled agents with:
+    python agent_format.py agents/*.pkl
+"""
+
+import ast
+import json
+import struct
+import sys
+
+import numpy as np
+
+from agents import EveryVisitMCAgent, FirstVisitMCAgent
+from tabular import MappedTabularStore
+from utils import STATE_TRANSFORMERS
+
+MAGIC = b"MCAGENT\0"
+FORMAT_VERSION = 1
+ALIGN = 64
+AGENT_CLASSES = {cls.__name__: cls for cls in (FirstVisitMCAgent, EveryVisitMCAgent)}
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _encode_keys(states):
+    """repr() every info state into one blob, checking it will literal_eval back."""
+    chunks = []
+    offsets = [0]
+    for s in states:
+        text = repr(s)
+        if ast.literal_eval(text) != s:
+            raise ValueError(f"Info state {text} does not round trip through repr")
+        chunk = (text + ",").encode("utf-8")
+        chunks.append(chunk)
+        offsets.append(offsets[-1] + len(chunk))
+    return (
+        np.frombuffer(b"".join(chunks), dtype=np.uint8),
+        np.array(offsets, dtype=np.int64),
+    )
+
+
+def save_agent_binary(agent, filepath):
+    """Write a FirstVisitMCAgent / EveryVisitMCAgent to `filepath` in the binary format."""
+    name = agent.state_transformer.__name__
+    if STATE_TRANSFORMERS.get(name) != agent.state_transformer:
+        raise ValueError(f"State transformer '{name}' is not in utils.STATE_TRANSFORMERS")
+
+    store = agent.store
+    used, cols = len(store), len(store.actions)
+    key_blob, key_offsets = _encode_keys(store.states)
+    arrays = {
+        "q": np.ascontiguousarray(store.q[:used, :cols], dtype="<f8"),
+        "n": np.ascontiguousarray(store.n[:used, :cols], dtype="<i8"),
+        "key_offsets": key_offsets.astype("<i8"),
+        "key_blob": key_blob,
+    }
+
+    # offsets are relative to the data section, which starts at the first
+    # 64 byte boundary after the header
+    descr = {}
+    offset = 0
+    for key, arr in arrays.items():
+        descr[key] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _aligned(offset + arr.nbytes)
+    header = {
+        "class": type(agent).__name__,
+        "epsilon": agent.epsilon,
+        "gamma": agent.gamma,
+        "state_transformer": name,
+        "actions": list(store.actions),
+        "arrays": descr,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header_bytes))
+
+    with open(filepath, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for key, arr in arrays.items():
+            f.write(b"\0" * (data_start + descr[key]["offset"] - f.tell()))
+            f.write(arr.tobytes())
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def read_header(filepath):
+    """Read and validate the JSON header of an agent file."""
+    with open(filepath, "rb") as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not an MC agent file")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"{filepath} has format version {version}, expected {FORMAT_VERSION}"
+            )
+        header = json.loads(f.read(header_len))
+    header["data_start"] = _aligned(_PREAMBLE.size + header_len)
+    return header
+
+
+def load_agent_binary(filepath, mode="c"):
+    """
+    Open an agent file written by save_agent_binary.
+
+    Args:
+        filepath (str): Path of the agent file.
+        mode (str): np.memmap mode. The default "c" (copy-on-write) lets the agent keep
+            training without touching the file, "r" makes the tables read-only.
+
+    Returns:
+        FirstVisitMCAgent | EveryVisitMCAgent: the agent, its store backed by the file.
+    """
+    header = read_header(filepath)
+    maps = {}
+    for key, d in header["arrays"].items():
+        shape = tuple(d["shape"])
+        if 0 in shape:
+            maps[key] = np.zeros(shape, dtype=d["dtype"])
+        else:
+            maps[key] = np.memmap(
+                filepath,
+                dtype=d["dtype"],
+                mode=mode,
+                offset=header["data_start"] + d["offset"],
+                shape=shape,
+            )
+
+    cls = AGENT_CLASSES[header["class"]]
+    agent = cls(
+        epsilon=header["epsilon"],
+        gamma=header["gamma"],
+        state_transformer=STATE_TRANSFORMERS[header["state_transformer"]],
+    )
+    agent.store = MappedTabularStore(
+        maps["key_blob"], maps["key_offsets"], header["actions"], maps["q"], maps["n"]
+    )
+    return agent
+
+
+def convert_pickle(pkl_path, out_path=None):
+    """Convert a pickled MC agent (e.g. agents/*.pkl) to the binary format."""
+    out_path = out_path or pkl_path.rsplit(".", 1)[0] + ".mca"
+    save_agent_binary(FirstVisitMCAgent.load(pkl_path), out_path)
+    return out_path
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        print(f"{path} -> {convert_pickle(path)}")
@@ -1,12 +1,11 @@
 import random
 from utils import process_leduc_state_v1
+from tabular import TabularStore
 from collections import defaultdict
 import pickle
 
-import torch
-import torch.nn.functional as F
-
 # pickle dont accept lambda
+# (still needed to unpickle agents saved before the TabularStore tables)
 
 
 def default_float_dict():
@@ -17,6 +16,53 @@ def default_int_dict():
     return defaultdict(int)
 
 
+def _restore_tables(agent, state):
+    """__setstate__ helper, converts pickles with defaultdict Q/N into a TabularStore."""
+    if "store" not in state:
+        state["store"] = TabularStore.from_dicts(state.pop("Q"), state.pop("N"))
+    agent.__dict__.update(state)
+
+
+def _egreedy_probs(agent, state, greedy, best_actions):
+    """
+    action_probs of the e-greedy MC agents, mirrors their step().
+    `best_actions(info_s, legal_acts)` gives the actions tied for the highest Q.
+    """
+    raw_obs = state["raw_obs"]
+    legal_acts = raw_obs["legal_actions"]
+    info_s = agent.state_transformer(state, raw_obs.get("current_player", None))
+    best = best_actions(info_s, legal_acts)
+    explore = 0.0 if greedy else agent.epsilon
+    return {
+        a: explore / len(legal_acts) + (1 - explore) * (a in best) / len(best)
+        for a in legal_acts
+    }
+
+
+class _MCStats:
+    """
+    sufficient_stats / merge_stats of the MC agents, which differ only in which returns
+    their visit_returns() yields.
+    """
+
+    def sufficient_stats(self, trajectories):
+        """
+        Summarize episodes as {(state, action): [visit count, sum of returns]} without
+        touching Q/N. Since Q is the plain average of returns, merge_stats() on these
+        gives the same table as update() on the episodes.
+        """
+        stats = {}
+        for s, a, G in self.visit_returns(trajectories):
+            entry = stats.setdefault((s, a), [0, 0.0])
+            entry[0] += 1
+            entry[1] += G
+        return stats
+
+    def merge_stats(self, stats):
+        """Fold counts/return sums from sufficient_stats() into N and Q."""
+        self.store.merge(stats)
+
+
 class RandomAgent:
     """
     Picks random actions in the env.
@@ -28,6 +74,11 @@ class RandomAgent:
 
         return random.choice(legal_acts)
 
+    def action_probs(self, state):
+        """Probability step() picks each legal action, {action: prob}."""
+        legal_acts = state["raw_obs"]["legal_actions"]
+        return {a: 1.0 / len(legal_acts) for a in legal_acts}
+
     def update(self, trajectories):
         pass
 
@@ -56,15 +107,16 @@ class HumanAgent:
         pass
 
 
-class FirstVisitMCAgent:
+class FirstVisitMCAgent(_MCStats):
     """
     A First‑Visit Monte Carlo control agent for imperfect‑information games (e.g. Leduc Poker).
 
     Attributes:
         epsilon (float): Exploration probability for e‑greedy action selection.
         gamma (float): Discount factor for future rewards.
-        Q (defaultdict): Action‑value estimates, Q[state][action] -> float.
-        N (defaultdict): Counts of first visits, N[state][action] -> int.
+        store (TabularStore): Dense Q/N arrays indexed by interned states and actions.
+        Q: Action‑value estimates, Q[state][action] -> float (view on store).
+        N: Counts of first visits, N[state][action] -> int (view on store).
     """
 
     def __init__(
@@ -81,8 +133,18 @@ class FirstVisitMCAgent:
         self.gamma = gamma
         self.state_transformer = state_transformer
 
-        self.Q = defaultdict(default_float_dict)
-        self.N = defaultdict(default_int_dict)
+        self.store = TabularStore()
+
+    @property
+    def Q(self):
+        return self.store.Q
+
+    @property
+    def N(self):
+        return self.store.N
+
+    def __setstate__(self, state):
+        _restore_tables(self, state)
 
     def save(self, filepath):
         """Save the current agent to the given file path."""
@@ -122,21 +184,21 @@ class FirstVisitMCAgent:
 
         # exploit break ties randomly
         info_s = self.state_transformer(state, cur_pid)
-        q_s = self.Q[info_s]  # defaultdict(float), so unseen (s,a) is 0.0
-
-        # find max Q among legal actions
-        best_value = None
-        best_acts = []
-        for a in legal_acts:
-            v = q_s[a]
-            if (best_value is None) or (v > best_value):
-                best_value = v
-                best_acts = [a]
-            elif v == best_value:
-                best_acts.append(a)
+        # max Q among legal actions, unseen (s,a) is 0.0
+        best_acts = self.store.best_actions(info_s, legal_acts)
 
         return random.choice(best_acts)
 
+    def action_probs(self, state, greedy=False):
+        """
+        Probability step() picks each legal action: epsilon spread uniformly over the
+        legal actions, the rest split evenly between the ties for the best Q.
+
+        Returns:
+            dict: {action: prob} over the legal actions.
+        """
+        return _egreedy_probs(self, state, greedy, self.store.best_actions)
+
     def update(self, trajectories):
         """
         Perform First‑Visit Monte Carlo updates on completed episode(s).
@@ -150,6 +212,9 @@ class FirstVisitMCAgent:
             increment N[state][action], and update Q[state][action] via:
                 Q += (1 / N) * (G - Q)
 
+        All episodes are encoded to id arrays and applied in one vectorized pass
+        (TabularStore.update_batch), which gives the same averages.
+
         Args:
             trajectories (List[List[Tuple[state, action, reward]]]):
                 A list of one or more episodes for a single player. Each episode is
@@ -161,6 +226,17 @@ class FirstVisitMCAgent:
                         (s_{T-1}, a_{T-1}, r_T)
                     ]
         """
+        self.store.update_batch(
+            *self.store.encode(trajectories), self.gamma, first_visit=True
+        )
+
+    def visit_returns(self, trajectories):
+        """
+        Yield (state, action, G) for every first visit in each episode, latest first.
+
+        This is what update() averages into Q, split out so the same returns can be
+        collected as sufficient statistics (see sufficient_stats) by parallel workers.
+        """
         for episode in trajectories:
             G = 0.0
             first_visit = set()
@@ -169,12 +245,10 @@ class FirstVisitMCAgent:
                 G = self.gamma * G + r
                 if (s, a) not in first_visit:
                     first_visit.add((s, a))
-                    self.N[s][a] += 1
-                    alpha = 1.0 / self.N[s][a]
-                    self.Q[s][a] += alpha * (G - self.Q[s][a])
+                    yield s, a, G
 
 
-class EveryVisitMCAgent:
+class EveryVisitMCAgent(_MCStats):
     """
     An Every‑Visit Monte Carlo control agent for imperfect‑information games (e.g. Leduc Poker).
 
@@ -184,8 +258,9 @@ class EveryVisitMCAgent:
     Attributes:
         epsilon (float): Exploration probability for epsilon‑greedy action selection.
         gamma (float): Discount factor for computing returns.
-        Q (defaultdict): Action‑value estimates, Q[state][action] -> float.
-        N (defaultdict): Counts of visits, N[state][action] -> int.
+        store (TabularStore): Dense Q/N arrays indexed by interned states and actions.
+        Q: Action‑value estimates, Q[state][action] -> float (view on store).
+        N: Counts of visits, N[state][action] -> int (view on store).
     """
 
     def __init__(
@@ -202,8 +277,18 @@ class EveryVisitMCAgent:
         self.epsilon = epsilon
         self.gamma = gamma
         self.state_transformer = state_transformer
-        self.Q = defaultdict(default_float_dict)
-        self.N = defaultdict(default_int_dict)
+        self.store = TabularStore()
+
+    @property
+    def Q(self):
+        return self.store.Q
+
+    @property
+    def N(self):
+        return self.store.N
+
+    def __setstate__(self, state):
+        _restore_tables(self, state)
 
     def save(self, filepath):
         """Save the current agent to the given file path."""
@@ -241,21 +326,14 @@ class EveryVisitMCAgent:
 
         # exploitation: select the action with the highest Q-value (ties broken randomly)
         info_s = self.state_transformer(state, cur_pid)
-        q_s = self.Q[info_s]
-
-        # find max Q among legal actions
-        best_value = None
-        best_actions = []
-        for a in legal_acts:
-            v = q_s[a]
-            if best_value is None or v > best_value:
-                best_value = v
-                best_actions = [a]
-            elif v == best_value:
-                best_actions.append(a)
+        best_actions = self.store.best_actions(info_s, legal_acts)
 
         return random.choice(best_actions)
 
+    def action_probs(self, state, greedy=False):
+        """Probability step() picks each legal action, {action: prob}."""
+        return _egreedy_probs(self, state, greedy, self.store.best_actions)
+
     def update(self, trajectories):
         """
         Update Q-values using the Every‑Visit MC rule.
@@ -264,20 +342,122 @@ class EveryVisitMCAgent:
           - Compute the return G at each timestep by traversing the episode in reverse.
           - Update Q[s][a] for every occurrence of (state, action).
 
+        Like FirstVisitMCAgent.update, this runs as one TabularStore.update_batch pass.
+
         Args:
             trajectories (List[List[Tuple[state, action, reward]]]):
                 A list of episodes, where each episode is a list of (state, action, reward) tuples.
         """
+        self.store.update_batch(
+            *self.store.encode(trajectories), self.gamma, first_visit=False
+        )
+
+    def visit_returns(self, trajectories):
+        """Yield (state, action, G) for every step of each episode, latest first."""
         for episode in trajectories:
             G = 0.0
             # Process the episode backwards (from terminal state)
             for t in reversed(range(len(episode))):
                 s, a, r = episode[t]
                 G = self.gamma * G + r
-                # For Every‑Visit MC, update every occurrence of (s, a)
-                self.N[s][a] += 1
-                alpha = 1.0 / self.N[s][a]
-                self.Q[s][a] += alpha * (G - self.Q[s][a])
+                # For Every‑Visit MC, every occurrence of (s, a) counts
+                yield s, a, G
+
+
+class FrozenMCAgent:
+    """
+    Read-only, precompiled policy of a trained FirstVisitMCAgent / EveryVisitMCAgent.
+
+    Every info state maps to its actions ranked by Q, so step() is one dict lookup plus
+    a scan that stops at the first lower value. Unseen states fall back to a uniform
+    choice over legal actions (every unseen Q is 0.0), and nothing is ever inserted,
+    so evaluation and serving keep a constant memory footprint.
+
+    Attributes:
+        policy (dict): info state -> tuple of (action, Q) sorted by Q descending.
+        actions (frozenset): every action label the source agent had a Q entry for.
+        epsilon (float): Exploration probability, kept so it is a drop-in replacement.
+    """
+
+    def __init__(self, policy, actions, epsilon, state_transformer):
+        self.policy = policy
+        self.actions = actions
+        self.epsilon = epsilon
+        self.state_transformer = state_transformer
+
+    @classmethod
+    def from_agent(cls, agent):
+        """Compile `agent`'s current Q table, the agent itself is left untouched."""
+        store = agent.store
+        actions = store.actions
+        q = store.q[: len(store), : len(actions)].tolist()
+        policy = {}
+        for s, row in zip(store.states, q):
+            policy[s] = tuple(
+                sorted(zip(actions, row), key=lambda pair: pair[1], reverse=True)
+            )
+        return cls(policy, frozenset(actions), agent.epsilon, agent.state_transformer)
+
+    def save(self, filepath):
+        """Save the frozen agent to the given file path."""
+        with open(filepath, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(filepath):
+        """Load a frozen agent from the given file path."""
+        with open(filepath, "rb") as f:
+            return pickle.load(f)
+
+    def step(self, state, greedy=False):
+        """
+        Same choice as the source agent's step(): e‑greedy, ties broken uniformly.
+
+        Args:
+            state (dict): The current game state (see EveryVisitMCAgent.step).
+            greedy (bool): If True, never explore.
+
+        Returns:
+            action: Chosen legal action.
+        """
+        raw_obs = state["raw_obs"]
+        legal_acts = raw_obs["legal_actions"]
+        cur_pid = raw_obs.get("current_player", None)
+
+        if (not greedy) and (random.random() < self.epsilon):
+            return random.choice(legal_acts)
+
+        best_actions = self._best_actions(
+            self.state_transformer(state, cur_pid), legal_acts
+        )
+        return random.choice(best_actions)
+
+    def _best_actions(self, info_s, legal_acts):
+        ranked = self.policy.get(info_s)
+        if ranked is None:
+            return list(legal_acts)
+
+        best_value = None
+        best_actions = []
+        for a, v in ranked:
+            if best_value is not None and v < best_value:
+                break
+            if a in legal_acts:
+                best_value = v
+                best_actions.append(a)
+
+        # legal actions the agent never saw have Q 0.0 too
+        unseen = [a for a in legal_acts if a not in self.actions]
+        if unseen and (best_value is None or best_value <= 0.0):
+            best_actions = (best_actions if best_value == 0.0 else []) + unseen
+        return best_actions
+
+    def action_probs(self, state, greedy=False):
+        """Probability step() picks each legal action, {action: prob}."""
+        return _egreedy_probs(self, state, greedy, self._best_actions)
+
+    def update(self, trajectories):
+        pass
 
 
 # define a thin wrapper so RLCard knows how to call my net
@@ -288,6 +468,10 @@ class PolicyAgent:
         self.policy.eval()
 
     def step(self, state):
+        # torch is only imported here so loading the table agents does not pull it in
+        import torch
+        import torch.nn.functional as F
+
         obs = torch.tensor(state["obs"], dtype=torch.float32, device=self.device)
         logits = self.policy(obs)  # shape [n_actions]
 
@@ -301,5 +485,16 @@ class PolicyAgent:
         idx_in_legal = torch.multinomial(legal_probs, 1).item()
         return legal_ids[idx_in_legal]
 
+    def action_probs(self, state):
+        """Softmax over the legal logits, {action id: prob}."""
+        import torch
+        import torch.nn.functional as F
+
+        obs = torch.tensor(state["obs"], dtype=torch.float32, device=self.device)
+        legal_ids = list(state["legal_actions"].keys())
+        with torch.no_grad():
+            probs = F.softmax(self.policy(obs)[legal_ids], dim=-1)
+        return dict(zip(legal_ids, probs.tolist()))
+
     def eval_step(self, state):
         return self.step(state), {}
@@ -0,0 +1,163 @@
+"""
+Memoized hand_eval.equity for the expectiminimax heuristics.
+
+Equity doesn't change when the suits are relabeled, when the hole / board cards are
+reordered, or (flipping the result) when hero and villain swap, so entries are keyed on
+one canonical (hero, villain, board) per such class. Two tiers:
+  - in process LRU of `maxsize` entries, least recently used evicted first
+  - optional sqlite file at `path` that persists across runs (e.g. a heuristic sweep
+    in limit_main.py), written in batches of `commit_every` and at exit. New entries
+    wait in memory and each batch goes in one short transaction, so several processes
+    (the parallel.py pool workers) can share the file without holding its write lock
+    while they compute equities
+
+utils.calc_hero_equity goes through EQUITY_CACHE, turn on the disk tier with
+configure_equity_cache(path=...).
+"""
+
+import atexit
+import sqlite3
+from collections import OrderedDict
+
+from hand_eval import equity
+
+
+def canonical_hands(hero, villain, board):
+    """
+    Canonical (hero, villain, board) of OpenSpiel card ids (rank * 4 + suit).
+
+    Each suit's pattern is the sorted (group, rank) of its cards, groups being hero,
+    villain and board. Suits are renamed 0..3 in pattern order (suits not dealt last),
+    so only interchangeable suits can tie, then each group is sorted.
+    """
+    groups = (hero, villain, board)
+    patterns = ([], [], [], [])
+    for g, cards in enumerate(groups):
+        for c in cards:
+            patterns[c & 3].append((g, c >> 2))
+    order = sorted(range(4), key=lambda s: (not patterns[s], sorted(patterns[s])))
+    rename = [0] * 4
+    for new, suit in enumerate(order):
+        rename[suit] = new
+    return tuple(
+        tuple(sorted(c & ~3 | rename[c & 3] for c in cards)) for cards in groups
+    )
+
+
+def _key_text(hero, villain, board):
+    return "|".join(",".join(map(str, cards)) for cards in (hero, villain, board))
+
+
+class EquityCache:
+    """
+    (tie, hero win, villain win) of two known hands, exact, memoized on canonical hands.
+
+    Attributes:
+        hits (int): Lookups answered by the LRU tier.
+        disk_hits (int): Lookups answered by the sqlite tier.
+        misses (int): Lookups that ran hand_eval.equity.
+    """
+
+    def __init__(self, maxsize=1 << 16, path=None, commit_every=100):
+        """
+        Args:
+            maxsize (int): Entries kept in memory.
+            path (str): sqlite file of the disk tier, None for memory only.
+            commit_every (int): New entries buffered before a disk commit.
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.commit_every = commit_every
+        self._lru = OrderedDict()
+        self._pending = {}
+        self.hits = self.disk_hits = self.misses = 0
+
+        self._db = None
+        if path is not None:
+            # autocommit, transactions only around a flush; WAL lets readers go on
+            # while another process writes
+            self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS equity "
+                "(key TEXT PRIMARY KEY, tie REAL, win REAL, lose REAL)"
+            )
+            atexit.register(self.close)
+
+    def equity(self, hero, villain, board=()):
+        """Same as hand_eval.equity(hero, villain, board)."""
+        key = canonical_hands(hero, villain, board)
+        flipped = canonical_hands(villain, hero, board)
+        # store each matchup once, from the side with the smaller key
+        swap = flipped < key
+        if swap:
+            key = flipped
+
+        value = self._lru.get(key)
+        if value is not None:
+            self.hits += 1
+            self._lru.move_to_end(key)
+        else:
+            value = self._load(key)
+            if value is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                value = equity(*key)
+                self._store(key, value)
+            self._lru[key] = value
+            if len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+        tie, win, lose = value
+        return (tie, lose, win) if swap else (tie, win, lose)
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        text = _key_text(*key)
+        if text in self._pending:
+            return self._pending[text]
+        row = self._db.execute(
+            "SELECT tie, win, lose FROM equity WHERE key = ?", (text,)
+        ).fetchone()
+        return None if row is None else tuple(row)
+
+    def _store(self, key, value):
+        if self._db is None:
+            return
+        self._pending[_key_text(*key)] = value
+        if len(self._pending) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries to disk, in one short transaction."""
+        if self._db is None or not self._pending:
+            return
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO equity VALUES (?, ?, ?, ?)",
+                [(text, *value) for text, value in self._pending.items()],
+            )
+        self._pending = {}
+
+    def close(self):
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._lru)
+
+
+EQUITY_CACHE = EquityCache()
+
+
+def configure_equity_cache(maxsize=1 << 16, path=None, commit_every=100):
+    """Replace EQUITY_CACHE, e.g. with a disk tier at `path`."""
+    global EQUITY_CACHE
+    EQUITY_CACHE.close()
+    EQUITY_CACHE = EquityCache(maxsize, path, commit_every)
+    return EQUITY_CACHE
@@ -1,5 +1,7 @@
 import random
 
+from expectiminimax.search import SearchEngine
+
 
 def expectiminimax(state, depth, agent, heursitic_fn, k_samples):
     """
@@ -54,18 +56,38 @@ def expectiminimax(state, depth, agent, heursitic_fn, k_samples):
         return worst
 
 
-def get_best_action(state, depth, agent, heursitic_fn, k_samples=10):
+def get_best_action(
+    state, depth, agent, heursitic_fn, k_samples=10, bounds=None, plan=None
+):
     """
     Returns the (value, action) pair with highest expectiminimax score
     for `agent` given `state` and search `depth`.
+
+    Searches with SearchEngine (transposition table + alpha-beta, and Star1 at chance
+    nodes when the leaf value `bounds` are given), which gives the same result as
+    running expectiminimax() on every action. With a SamplingPlan every chance node
+    samples from the plan's common random numbers, see search.SamplingPlan.
+    """
+    engine = SearchEngine(agent, heursitic_fn, k_samples, bounds, plan=plan)
+    return engine.best_action(state, depth)
+
+
+def get_best_action_timed(
+    state,
+    time_budget,
+    agent,
+    heursitic_fn,
+    k_samples=10,
+    bounds=None,
+    max_depth=20,
+    plan=None,
+):
     """
-    best_value = float("-inf")
-    best_action = None
+    Anytime get_best_action for a per decision deadline: searches depth 1, 2, 3, ...
+    until `time_budget` seconds run out (see SearchEngine.iterative_deepening).
 
-    for action in state.legal_actions():
-        nxt = state.clone()
-        nxt.apply_action(action)
-        val = expectiminimax(nxt, depth - 1, agent, heursitic_fn, k_samples)
-        if val > best_value:
-            best_value, best_action = val, action
-    return best_value, best_action
+    Returns the (value, action, depth, nodes) of the deepest finished search, depth
+    being the search depth reached and nodes the nodes expanded in total.
+    """
+    engine = SearchEngine(agent, heursitic_fn, k_samples, bounds, plan=plan)
+    return engine.iterative_deepening(state, time_budget, max_depth)
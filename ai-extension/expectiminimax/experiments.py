@@ -1,5 +1,9 @@
 import pyspiel
 from expectiminimax.algorithms import get_best_action
+from expectiminimax.heuristics import VECTOR_HEURISTICS, heuristic_bounds
+from expectiminimax.parallel import parallel_best_actions
+from expectiminimax.public_tree import best_actions_all_pairs
+from expectiminimax.search import SamplingPlan
 import matplotlib.pyplot as plt
 import matplotlib.lines as mlines
 import os
@@ -16,6 +20,9 @@ def run_and_plot_leduc(
     Runs expectiminimax best‐action search over all private‐card pairs
     for player 0 at the given depth & heuristic, then plots the results
     *and saves the figure* to out_dir.
+
+    Heuristics with an array version in VECTOR_HEURISTICS search every pair in one
+    public tree walk (public_tree.py), others run get_best_action per pair.
     """
     # ensure output dir exists
     os.makedirs(out_dir, exist_ok=True)
@@ -24,16 +31,30 @@ def run_and_plot_leduc(
     agent = 0
     act_count = len(game.new_initial_state().legal_actions())
 
+    bounds = heuristic_bounds(game, heuristic_fn)
+
     results = []
-    for i in range(act_count - 1):
-        for j in range(i + 1, act_count):
-            for a, b in [(i, j), (j, i)]:
-                state = game.new_initial_state()
-                state.apply_action(a)
-                state.apply_action(b)
-                score, action = get_best_action(state, depth, agent, heuristic_fn)
-                action_str = state.action_to_string(agent, action)
-                results.append((a, b, score, action_str))
+    if heuristic_fn in VECTOR_HEURISTICS:
+        # action names don't depend on the cards
+        state = game.new_initial_state()
+        state.apply_action(0)
+        state.apply_action(1)
+        for a, b, score, action in best_actions_all_pairs(
+            game, depth, agent, VECTOR_HEURISTICS[heuristic_fn]
+        ):
+            results.append((a, b, score, state.action_to_string(agent, action)))
+    else:
+        for i in range(act_count - 1):
+            for j in range(i + 1, act_count):
+                for a, b in [(i, j), (j, i)]:
+                    state = game.new_initial_state()
+                    state.apply_action(a)
+                    state.apply_action(b)
+                    score, action = get_best_action(
+                        state, depth, agent, heuristic_fn, bounds=bounds
+                    )
+                    action_str = state.action_to_string(agent, action)
+                    results.append((a, b, score, action_str))
 
     # unpack
     xs = [r[0] for r in results]
@@ -104,24 +125,50 @@ def run_and_plot_limit(
     trials,
     out_dir="../ai-extension/graphs",
     hand_desc="not specified",
+    workers=1,
+    plan_seed=None,
 ):
     """
     Run expectiminimax multiple times on fresh clones of start_state,
     average the heuristic scores (to smooth out sampling noise),
     and report the most common action seen—but also
     save two plots: a histogram of scores and a bar chart of action counts.
+
+    workers > 1 (or None for every core) runs the trials and their root actions
+    on a process pool, see parallel.py. With plan_seed, trial t samples chance
+    nodes with SamplingPlan(k_samples, plan_seed + t): root actions are compared on
+    the same cards, and so are calls with the same plan_seed (e.g. heuristics).
     """
     os.makedirs(out_dir, exist_ok=True)
 
     scores = []
     actions = []
     agent = 0
-
-    for t in range(trials):
-        state = start_state.clone()
-        score, action = get_best_action(state, depth, agent, heuristic_fn, k_samples)
-        scores.append(score)
-        actions.append(action)
+    bounds = heuristic_bounds(start_state.get_game(), heuristic_fn)
+
+    if workers == 1:
+        for t in range(trials):
+            state = start_state.clone()
+            plan = None if plan_seed is None else SamplingPlan(k_samples, plan_seed + t)
+            score, action = get_best_action(
+                state, depth, agent, heuristic_fn, k_samples, bounds, plan
+            )
+            scores.append(score)
+            actions.append(action)
+    else:
+        for score, action in parallel_best_actions(
+            start_state,
+            depth,
+            agent,
+            heuristic_fn,
+            k_samples,
+            trials,
+            bounds,
+            workers,
+            plan_seed=plan_seed,
+        ):
+            scores.append(score)
+            actions.append(action)
 
     avg_score = sum(scores) / trials
     action_counts = Counter(actions)
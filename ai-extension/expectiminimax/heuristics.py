@@ -1,3 +1,5 @@
+import numpy as np
+
 from utils import calc_hero_equity, simple_strength_heuristic
 
 # Use the same invalid card constant defined in OpenSpiel.
@@ -143,3 +145,69 @@ def h_imperfect_info_weighted_ctrb_limit(state, agent):
     contrib = state_contrib(state, agent)
     # expected net‐EV = equity * pot − your sunk chips
     return this_eq * pot - contrib
+
+
+def heuristic_bounds(game, heuristic_fn):
+    """
+    (lo, hi) of every leaf value a search with `heuristic_fn` can see: the
+    heuristic's own range and the game's terminal returns. SearchEngine uses it to
+    prune chance nodes, None (no pruning) for an unknown heuristic.
+    """
+    lo, hi = game.min_utility(), game.max_utility()
+    # pot sizes never exceed what both players can put in
+    pot = 2 * hi
+    ranges = {
+        h_perfect_info_leduc: (-12, 12),
+        h_imperfect_info_leduc: (-12, 12),
+        h_perfect_info_limit: (0, 1),
+        h_perfect_info_weighted_total_limit: (0, pot),
+        h_perfect_info_weighted_ctrb_limit: (-hi, pot),
+        h_imperfect_info_weighted_ctrb_limit: (-hi, pot),
+    }
+    if heuristic_fn not in ranges:
+        return None
+    h_lo, h_hi = ranges[heuristic_fn]
+    return min(lo, h_lo), max(hi, h_hi)
+
+
+def leduc_scores(cards, public):
+    """
+    Vectorized Leduc hand score, rank plus 10 for pairing the public card (the same
+    score the heuristics above use, and it orders showdowns like the game).
+
+    Args:
+        cards (np.ndarray): int array of private cards.
+        public (int): Public card, kInvalidCard before it is dealt.
+    """
+    ranks = cards // 2
+    if public == kInvalidCard:
+        return ranks
+    return ranks + 10 * (ranks == card_rank(public))
+
+
+def h_perfect_info_leduc_vector(state, my_cards, opp_cards):
+    """
+    h_perfect_info_leduc for many private card pairs at once, `state` is only read
+    for the public card (see public_tree.py).
+    """
+    public = state.public_card()
+    return leduc_scores(my_cards, public) - leduc_scores(opp_cards, public)
+
+
+def h_imperfect_info_leduc_vector(state, my_cards, opp_cards):
+    """h_imperfect_info_leduc for many private card pairs at once."""
+    public = state.public_card()
+    # expected opp score over the cards 0..5 that aren't mine or public
+    unseen = [c for c in range(6) if c != public]
+    opp_total = np.zeros(len(my_cards))
+    for card in unseen:
+        opp_score = leduc_scores(np.array(card), public)
+        opp_total += np.where(my_cards != card, opp_score, 0)
+    return leduc_scores(my_cards, public) - opp_total / (len(unseen) - 1)
+
+
+# array versions of the heuristics, (public state, my cards, opp cards) -> values
+VECTOR_HEURISTICS = {
+    h_perfect_info_leduc: h_perfect_info_leduc_vector,
+    h_imperfect_info_leduc: h_imperfect_info_leduc_vector,
+}
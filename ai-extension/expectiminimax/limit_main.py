@@ -5,8 +5,13 @@ from expectiminimax.heuristics import (
     h_imperfect_info_weighted_ctrb_limit,
 )
 import pyspiel
+from equity_cache import configure_equity_cache
 from expectiminimax.experiments import run_and_plot_limit
 
+# the equity heuristics below share leaves across trials and heuristics, keep their
+# equities on disk so re-runs hit them too
+cache = configure_equity_cache(path="equity_cache.sqlite")
+
 game = pyspiel.load_game(
     "universal_poker("
     "betting=limit,numPlayers=2,numRounds=4,"
@@ -43,4 +48,9 @@ for fn, name in [
         trials,
         "../ai-extension/graphs",
         "AKs vs QQ",
+        workers=None,  # trials and root actions on every core
+        plan_seed=0,  # every heuristic sees the same cards in trial t
     )
+
+# counts this process only, the pool workers share the sqlite tier
+print(f"equity cache: {cache.hits} hits, {cache.disk_hits} disk hits, {cache.misses} misses")
@@ -0,0 +1,127 @@
+"""
+Process pool version of get_best_action over several trials, for run_and_plot_limit.
+
+Every (trial, root action) subtree is its own task. A task only ships the root's
+action history, the root action and the search settings, and each worker rebuilds the
+pyspiel game from its string once (pyspiel states don't pickle). Trial t samples chance
+nodes with SearchEngine seed `seed + t`, and SearchEngine draws a node's sample from
+(seed, history) alone, so the tasks of a trial see the same samples as a sequential
+SearchEngine(seed=seed + t).best_action would, whichever worker runs them.
+
+With plan_seed, trial t samples through SamplingPlan(k_samples, plan_seed + t)
+instead, a plan draws its numbers in a fixed order so every worker's copy agrees.
+
+heuristic_fn has to be picklable, i.e. a module level function like the ones in
+heuristics.py.
+"""
+
+import multiprocessing as mp
+import os
+import random
+
+import pyspiel
+
+import equity_cache
+from expectiminimax.search import SamplingPlan, SearchEngine
+
+_game = None
+
+
+def _init_worker(game_string, cache_path):
+    global _game
+    _game = pyspiel.load_game(game_string)
+    # own connection to the parent's disk tier, sqlite connections don't survive a fork
+    equity_cache.EQUITY_CACHE = equity_cache.EquityCache(path=cache_path)
+
+
+def _search_root_action(task):
+    history, action, depth, agent, heuristic_fn, k_samples, bounds, seed, plan = task
+    state = _game.new_initial_state()
+    for a in history:
+        state.apply_action(a)
+    state.apply_action(action)
+    engine = SearchEngine(agent, heuristic_fn, k_samples, bounds, seed, plan)
+    value = engine.search(state, depth - 1)
+    # workers are killed without atexit, so write their equities now
+    equity_cache.EQUITY_CACHE.flush()
+    return value
+
+
+def parallel_best_actions(
+    state,
+    depth,
+    agent,
+    heuristic_fn,
+    k_samples=10,
+    trials=1,
+    bounds=None,
+    workers=None,
+    seed=None,
+    plan_seed=None,
+):
+    """
+    get_best_action `trials` times from `state`, trials and root actions spread over
+    a process pool.
+
+    Args:
+        state: Root pyspiel state, a decision node.
+        depth, agent, heuristic_fn, k_samples, bounds: As in get_best_action.
+        trials (int): Independent searches, each with its own chance samples.
+        workers (int): Processes, os.cpu_count() if None. 1 runs in this process.
+        seed (int): Seed of trial 0, random if None.
+        plan_seed (int): Sample trial t with SamplingPlan(k_samples, plan_seed + t),
+            None for independent samples per node.
+
+    Returns:
+        list: (value, action) per trial.
+    """
+    workers = workers or os.cpu_count()
+    seed = random.getrandbits(32) if seed is None else seed
+    plans = [
+        None if plan_seed is None else SamplingPlan(k_samples, plan_seed + t)
+        for t in range(trials)
+    ]
+    if workers == 1:
+        return [
+            SearchEngine(
+                agent, heuristic_fn, k_samples, bounds, seed + t, plans[t]
+            ).best_action(state.clone(), depth)
+            for t in range(trials)
+        ]
+
+    history = state.history()
+    actions = state.legal_actions()
+    tasks = [
+        (
+            history,
+            action,
+            depth,
+            agent,
+            heuristic_fn,
+            k_samples,
+            bounds,
+            seed + t,
+            plans[t],
+        )
+        for t in range(trials)
+        for action in actions
+    ]
+    # workers read what this process cached so far
+    equity_cache.EQUITY_CACHE.flush()
+    with mp.Pool(
+        workers,
+        initializer=_init_worker,
+        initargs=(str(state.get_game()), equity_cache.EQUITY_CACHE.path),
+    ) as pool:
+        values = pool.map(_search_root_action, tasks, chunksize=1)
+
+    results = []
+    for t in range(trials):
+        best_value, best_action = float("-inf"), None
+        # legal order and a strict >, ties go to the same action as get_best_action
+        for i, action in enumerate(actions):
+            val = values[t * len(actions) + i]
+            if val > best_value:
+                best_value, best_action = val, action
+        results.append((best_value, best_action))
+    return results
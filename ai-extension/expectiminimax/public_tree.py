@@ -0,0 +1,121 @@
+"""
+Expectiminimax for every Leduc private card deal at once, for run_and_plot_leduc.
+
+Leduc's betting (legal actions, who acts, fold payoffs) doesn't depend on the private
+cards, so instead of one search per (player 0 card, player 1 card) pair this walks the
+public tree (betting and public card) once and carries an array of values, one per
+pair, through each node:
+
+    decision  elementwise max (agent to act) / min over the actions' arrays
+    chance    sum over every public card, weighted 1/4 for the pairs that don't hold
+              it and 0 for those that do
+    terminal  the fold payoff, or a showdown decided per pair from leduc_scores
+    cutoff    an array heuristic from heuristics.VECTOR_HEURISTICS
+
+The tree is walked with one representative pyspiel state holding two cards of
+different ranks that aren't the public card (so its showdowns never tie and
+|returns| is the pot share at stake). This gives exactly what SearchEngine /
+expectiminimax give for each pair, Leduc's chance nodes having fewer outcomes than
+k_samples, with one walk instead of 30.
+"""
+
+import numpy as np
+
+from expectiminimax.heuristics import kInvalidCard, leduc_scores
+
+FOLD = 0
+
+
+def private_pairs(num_cards):
+    """(player 0 card, player 1 card) pairs, in run_and_plot_leduc's order."""
+    pairs = []
+    for i in range(num_cards - 1):
+        for j in range(i + 1, num_cards):
+            pairs += [(i, j), (j, i)]
+    return pairs
+
+
+def _representative(game, betting, public=kInvalidCard):
+    """State after `betting`, dealt two different rank cards that aren't `public`."""
+    num_cards = len(game.new_initial_state().legal_actions())
+    first = next(c for c in range(num_cards) if c != public)
+    second = next(c for c in range(num_cards) if c != public and c // 2 != first // 2)
+    state = game.new_initial_state()
+    for action in [first, second, *betting]:
+        state.apply_action(action)
+    if public != kInvalidCard:
+        state.apply_action(public)
+    return state
+
+
+def _values(state, depth, agent, heuristic_vec, my_cards, opp_cards):
+    if state.is_terminal():
+        payoff = state.returns()[agent]
+        if state.history()[-1] == FOLD:
+            return np.full(len(my_cards), float(payoff))
+        public = state.public_card()
+        diff = leduc_scores(my_cards, public) - leduc_scores(opp_cards, public)
+        return np.sign(diff) * abs(payoff)
+    if depth == 0:
+        return np.asarray(heuristic_vec(state, my_cards, opp_cards), dtype=float)
+
+    if state.is_chance_node():
+        game = state.get_game()
+        betting = state.history()[2:]
+        outcomes = len(game.new_initial_state().legal_actions()) - 2
+        value = np.zeros(len(my_cards))
+        for public in range(outcomes + 2):
+            dealable = (my_cards != public) & (opp_cards != public)
+            prob = np.where(dealable, 1 / outcomes, 0)
+            child = _representative(game, betting, public)
+            value += prob * _values(
+                child, depth, agent, heuristic_vec, my_cards, opp_cards
+            )
+        return value
+
+    children = []
+    for action in state.legal_actions():
+        nxt = state.clone()
+        nxt.apply_action(action)
+        children.append(
+            _values(nxt, depth - 1, agent, heuristic_vec, my_cards, opp_cards)
+        )
+    children = np.stack(children)
+    if state.current_player() == agent:
+        return children.max(axis=0)
+    return children.min(axis=0)
+
+
+def best_actions_all_pairs(game, depth, agent, heuristic_vec):
+    """
+    get_best_action for every private card pair, in one public tree walk.
+
+    Args:
+        game: pyspiel leduc_poker game.
+        depth, agent: As in get_best_action.
+        heuristic_vec: (state, my cards, opp cards) -> values, like the entries of
+            heuristics.VECTOR_HEURISTICS. Only read the state's public information.
+
+    Returns:
+        list: (player 0 card, player 1 card, value, action) per pair, in
+        private_pairs order, ties going to the first legal action like
+        get_best_action.
+    """
+    pairs = np.array(private_pairs(len(game.new_initial_state().legal_actions())))
+    my_cards, opp_cards = pairs[:, agent], pairs[:, 1 - agent]
+
+    root = _representative(game, [])
+    actions = root.legal_actions()
+    values = []
+    for action in actions:
+        nxt = root.clone()
+        nxt.apply_action(action)
+        values.append(
+            _values(nxt, depth - 1, agent, heuristic_vec, my_cards, opp_cards)
+        )
+    values = np.stack(values)
+    best = values.argmax(axis=0)  # first of equal values, like the strict > loop
+    return [
+        (int(a), int(b), float(values[best[k], k]), actions[best[k]])
+        for k, (a, b) in enumerate(pairs)
+    ]
@@ -0,0 +1,291 @@
+import random
+import time
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+
+INF = float("inf")
+
+# transposition table flags: the stored value is exact, a lower or an upper bound
+EXACT, LOWER, UPPER = range(3)
+
+
+class SearchTimeout(Exception):
+    """The search passed its deadline, raised out of SearchEngine.search."""
+
+
+class SamplingPlan:
+    """
+    Common random numbers for the chance nodes of a search: k stratified uniforms
+    (one in each [i / k, (i + 1) / k)) drawn once per chance level, i.e. per number of
+    chance nodes between the search root and the node, and mapped onto each node's
+    outcomes by their cumulative probabilities.
+
+    Every node on the same level reuses the same numbers, so sibling actions (and the
+    root actions of a trial) are compared on the same cards, not on independent
+    samples, which takes most of the sampling noise out of the comparison. Share one
+    plan (or plans with the same seed) across searches to compare heuristics or
+    settings on the same cards too.
+
+    Uniforms that land on the same outcome are merged into one child of weight
+    count / k, so the node clones each distinct outcome once. Nodes with at most k
+    outcomes are searched exactly, like expectiminimax.
+
+    Levels are drawn in order from `seed`, so a pickled copy (e.g. in a pool worker)
+    draws the same numbers.
+    """
+
+    def __init__(self, k_samples=10, seed=None):
+        """
+        Args:
+            k_samples: Strata, the most outcomes searched per chance node.
+            seed: Seed of the uniforms, random if None.
+        """
+        self.k_samples = k_samples
+        self.rng = random.Random(seed)
+        self.levels = []
+
+    def uniforms(self, level):
+        """The k stratified uniforms of a chance level, drawn on first use."""
+        while len(self.levels) <= level:
+            k = self.k_samples
+            self.levels.append([(i + self.rng.random()) / k for i in range(k)])
+        return self.levels[level]
+
+    def sample(self, outcomes, level):
+        """(action, weight) children of a chance node with (action, prob) outcomes."""
+        if len(outcomes) <= self.k_samples:
+            return list(outcomes)
+        cum = list(accumulate(p for _, p in outcomes))
+        total = cum[-1]
+        picks = Counter(
+            min(bisect_right(cum, u * total), len(outcomes) - 1)
+            for u in self.uniforms(level)
+        )
+        return [
+            (outcomes[i][0], count / self.k_samples)
+            for i, count in sorted(picks.items())
+        ]
+
+
+class SearchEngine:
+    """
+    Expectiminimax with a transposition table, alpha-beta at decision nodes and Star1
+    pruning at chance nodes. Returns the same values as algorithms.expectiminimax
+    (for the same sampled chance outcomes) while expanding far fewer nodes.
+
+    - transposition table: (action history, remaining depth) -> (flag, value), plus
+      the best action found at each history, which is tried first next time (move
+      ordering). Entries stay valid across searches with the same engine, e.g.
+      iterative deepening or several root actions.
+    - chance nodes sample k_samples outcomes like expectiminimax, but with a random
+      generator seeded by (seed, history), so the sample at a node doesn't depend on
+      which other nodes got pruned and the pruned search matches the full one. With
+      a SamplingPlan, nodes sample through the plan's common random numbers instead.
+    - Star1: with `bounds` = (lo, hi) on every leaf value (heuristic or terminal
+      return), a chance node stops as soon as the children searched so far prove its
+      value falls outside (alpha, beta). Without bounds chance nodes are searched in
+      full.
+
+    Attributes:
+        nodes (int): Nodes expanded so far.
+        deadline (float): time.perf_counter() after which search raises
+            SearchTimeout, None for no limit.
+        hit_cutoff (bool): Whether a search reached the depth cutoff (else a deeper
+            search returns the same value).
+        tt (dict): The transposition table.
+        best_moves (dict): history -> best action seen there.
+    """
+
+    def __init__(
+        self, agent, heuristic_fn, k_samples=10, bounds=None, seed=None, plan=None
+    ):
+        """
+        Args:
+            agent: Player id whose value is maximized.
+            heuristic_fn: (state, agent) -> value at the depth cutoff.
+            k_samples: Chance outcomes sampled per chance node.
+            bounds: (lo, hi) of all leaf values, see heuristics.heuristic_bounds.
+            seed: Seed of the chance samples, random if None.
+            plan: SamplingPlan to sample chance nodes with (its k_samples wins), None
+                for independent samples per node.
+        """
+        self.agent = agent
+        self.heuristic_fn = heuristic_fn
+        self.k_samples = k_samples
+        self.bounds = bounds
+        self.plan = plan
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.tt = {}
+        self.best_moves = {}
+        self.nodes = 0
+        self.deadline = None
+        self.hit_cutoff = False
+
+    def sample_outcomes(self, state, history, level=0):
+        """Sampled (action, weight) of a chance node, fixed per history (and level)."""
+        outcomes = state.chance_outcomes()
+        if self.plan is not None:
+            return self.plan.sample(outcomes, level)
+        rng = random.Random(hash((self.seed, history)))
+        sampled = rng.sample(outcomes, min(self.k_samples, len(outcomes)))
+        total_p = sum(p for _, p in sampled)
+        return [(action, p / total_p) for action, p in sampled]
+
+    def ordered_actions(self, state, history):
+        """Legal actions, the table's best action at this history first."""
+        actions = state.legal_actions()
+        best = self.best_moves.get(history)
+        if best in actions:
+            actions = [best] + [a for a in actions if a != best]
+        return actions
+
+    def search(self, state, depth, alpha=-INF, beta=INF, level=0):
+        """
+        Value of `state` for the agent, `depth` decisions deep (fail soft: a value
+        <= alpha is an upper bound, a value >= beta a lower bound). `level` counts
+        the chance nodes above `state`, for the sampling plan.
+        """
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        if state.is_terminal():
+            return state.returns()[self.agent]
+        if depth == 0:
+            self.hit_cutoff = True
+            return self.heuristic_fn(state, self.agent)
+
+        history = tuple(state.history())
+        entry = self.tt.get((history, depth))
+        if entry is not None:
+            flag, value = entry
+            if (
+                flag == EXACT
+                or (flag == LOWER and value >= beta)
+                or (flag == UPPER and value <= alpha)
+            ):
+                return value
+
+        if state.is_chance_node():
+            value = self._chance(state, history, depth, alpha, beta, level)
+        else:
+            value = self._decision(state, history, depth, alpha, beta, level)
+
+        if value <= alpha:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt[(history, depth)] = (flag, value)
+        return value
+
+    def _decision(self, state, history, depth, alpha, beta, level):
+        maximize = state.current_player() == self.agent
+        best_value = -INF if maximize else INF
+        best_action = None
+        for action in self.ordered_actions(state, history):
+            nxt = state.clone()
+            nxt.apply_action(action)
+            val = self.search(nxt, depth - 1, alpha, beta, level)
+            if maximize:
+                if val > best_value:
+                    best_value, best_action = val, action
+                alpha = max(alpha, val)
+            else:
+                if val < best_value:
+                    best_value, best_action = val, action
+                beta = min(beta, val)
+            if alpha >= beta:
+                break
+        self.best_moves[history] = best_action
+        return best_value
+
+    def _chance(self, state, history, depth, alpha, beta, level):
+        outcomes = self.sample_outcomes(state, history, level)
+        if self.bounds is None:
+            value = 0.0
+            for action, p in outcomes:
+                nxt = state.clone()
+                nxt.apply_action(action)
+                value += p * self.search(nxt, depth, level=level + 1)
+            return value
+
+        lo, hi = self.bounds
+        done = 0.0  # sum of p * value over the searched children
+        rest = 1.0  # probability of the children not searched yet
+        for action, p in outcomes:
+            rest -= p
+            # child values that settle the chance node outside (alpha, beta) even if
+            # every remaining child is as good / bad as possible
+            child_alpha = (alpha - done - rest * hi) / p
+            child_beta = (beta - done - rest * lo) / p
+            nxt = state.clone()
+            nxt.apply_action(action)
+            val = self.search(
+                nxt, depth, max(child_alpha, lo), min(child_beta, hi), level + 1
+            )
+            if val <= child_alpha:
+                return done + p * val + rest * hi
+            if val >= child_beta:
+                return done + p * val + rest * lo
+            done += p * val
+        return done
+
+    def best_action(self, state, depth, first=None):
+        """
+        (value, action) of the best root action, like algorithms.get_best_action.
+
+        Root actions are searched in legal order, so ties go to the same action as
+        expectiminimax, except `first` (e.g. the last iteration's best) goes first.
+        """
+        best_value = -INF
+        best_action = None
+        actions = state.legal_actions()
+        if first in actions:
+            actions = [first] + [a for a in actions if a != first]
+        for action in actions:
+            nxt = state.clone()
+            nxt.apply_action(action)
+            val = self.search(nxt, depth - 1, best_value, INF)
+            if val > best_value:
+                best_value, best_action = val, action
+        return best_value, best_action
+
+    def iterative_deepening(self, state, time_budget, max_depth=20):
+        """
+        Anytime search: best_action at depth 1, 2, 3, ... until `time_budget` seconds
+        run out. Each iteration starts from the previous best root action and the
+        table's best moves, and entries of finished subtrees stay valid, so the deep
+        iterations redo little of the shallow ones.
+
+        Depth 1 always finishes, so there is an action even with a tiny budget. An
+        iteration cut off by the deadline is thrown away, and the search stops early
+        once an iteration reaches no depth cutoff (only terminal leaves, deeper is the
+        same).
+
+        Args:
+            state: Root pyspiel state.
+            time_budget (float): Seconds for the whole search.
+            max_depth (int): Deepest iteration.
+
+        Returns:
+            tuple: (value, action, depth, nodes) of the deepest finished iteration,
+            nodes counting every iteration including the aborted one.
+        """
+        deadline = time.perf_counter() + time_budget
+        value, action, reached = None, None, 0
+        for depth in range(1, max_depth + 1):
+            # the first iteration runs without a deadline
+            self.deadline = deadline if depth > 1 else None
+            self.hit_cutoff = False
+            try:
+                value, action = self.best_action(state, depth, first=action)
+            except SearchTimeout:
+                break
+            finally:
+                self.deadline = None
+            reached = depth
+            if not self.hit_cutoff or time.perf_counter() > deadline:
+                break
+        return value, action, reached, self.nodes
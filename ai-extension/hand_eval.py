@@ -0,0 +1,262 @@
+"""
+Lookup table hand evaluator for 5, 6 and 7 card hold'em hands, plus exact / Monte
+Carlo equity on top of it (replaces holdem_calc in utils.calc_hero_equity).
+
+Cards are OpenSpiel universal_poker ids like utils.mapping: rank * 4 + suit, ranks
+2..A = 0..12, suits c d h s = 0..3.
+
+A hand's value only depends on
+  - its rank multiset, unless it holds a flush: looked up by a base 5 code of the rank
+    counts (49205 + 18395 + 6175 codes of 7, 6 and 5 cards, searched in a sorted table)
+  - the 13 bit rank mask of its flush suit otherwise: a direct 8192 entry table
+(both stored in TABLES_FILE), so ranking a hand is a couple of array lookups, and
+rank_hands does millions of hands per second with NumPy. Values are category * 13^5 +
+kickers, larger is better, equal is a split pot.
+"""
+
+import os
+from functools import lru_cache
+from itertools import chain, combinations
+
+import numpy as np
+
+(
+    HIGH_CARD,
+    PAIR,
+    TWO_PAIR,
+    TRIPS,
+    STRAIGHT,
+    FLUSH,
+    FULL_HOUSE,
+    QUADS,
+    STRAIGHT_FLUSH,
+) = range(9)
+
+# built on first import (a few seconds), later imports just load it
+TABLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_tables.npz")
+_RANK_CODES = 5 ** np.arange(13, dtype=np.int64)
+_KICKER_WEIGHTS = 13 ** np.arange(4, -1, -1)
+
+
+# (top rank, rank mask) of every straight, best first, the wheel A-2-3-4-5 plays five high
+_STRAIGHTS = [(top, 0b11111 << (top - 4)) for top in range(12, 3, -1)] + [
+    (3, 0b1000000001111)
+]
+
+
+def _straight_top(mask):
+    """Top rank of the best straight in a rank mask, -1 if there is none."""
+    for top, straight in _STRAIGHTS:
+        if mask & straight == straight:
+            return top
+    return -1
+
+
+def _straight_kickers(top):
+    # the wheel's ace plays low, like a 0 kicker
+    return [top - i for i in range(4)] + [max(top - 4, 0)]
+
+
+def _value(category, ranks):
+    ranks = list(ranks)[:5] + [0] * (5 - len(ranks))
+    return category * 13**5 + sum(r * w for r, w in zip(ranks, _KICKER_WEIGHTS))
+
+
+def _multiset_value(counts):
+    """Best non flush 5 card hand out of the rank counts (counts[r] cards of rank r)."""
+    by_count = {
+        n: [r for r in range(12, -1, -1) if counts[r] >= n] for n in (1, 2, 3, 4)
+    }
+    if by_count[4]:
+        q = by_count[4][0]
+        return _value(QUADS, [q] * 4 + [r for r in by_count[1] if r != q][:1])
+    if by_count[3]:
+        t = by_count[3][0]
+        pairs = [r for r in by_count[2] if r != t]
+        if pairs:
+            return _value(FULL_HOUSE, [t] * 3 + [pairs[0]] * 2)
+    top = _straight_top(sum(1 << r for r in range(13) if counts[r]))
+    if top >= 0:
+        return _value(STRAIGHT, _straight_kickers(top))
+    if by_count[3]:
+        t = by_count[3][0]
+        return _value(TRIPS, [t] * 3 + [r for r in by_count[1] if r != t][:2])
+    if len(by_count[2]) >= 2:
+        p1, p2 = by_count[2][:2]
+        kicker = [r for r in by_count[1] if r not in (p1, p2)][:1]
+        return _value(TWO_PAIR, [p1, p1, p2, p2] + kicker)
+    if by_count[2]:
+        p = by_count[2][0]
+        return _value(PAIR, [p, p] + [r for r in by_count[1] if r != p][:3])
+    return _value(HIGH_CARD, by_count[1][:5])
+
+
+def _rank_counts(total, rank=0):
+    """Every rank count vector of `total` cards over ranks rank..12, at most 4 each."""
+    if rank == 12:
+        return [[total]] if total <= 4 else []
+    return [
+        [n] + rest
+        for n in range(min(total, 4) + 1)
+        for rest in _rank_counts(total - n, rank + 1)
+    ]
+
+
+def _build_tables():
+    keys, values = [], []
+    for total in (5, 6, 7):
+        for counts in _rank_counts(total):
+            keys.append(int(np.dot(counts, _RANK_CODES)))
+            values.append(_multiset_value(counts))
+    order = np.argsort(keys)
+    multiset_keys = np.array(keys, dtype=np.int64)[order]
+    multiset_values = np.array(values, dtype=np.int32)[order]
+
+    # flush value of every rank mask with 5+ suited cards, 0 (no flush) otherwise
+    flush_values = np.zeros(1 << 13, dtype=np.int32)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") < 5:
+            continue
+        top = _straight_top(mask)
+        if top >= 0:
+            flush_values[mask] = _value(STRAIGHT_FLUSH, _straight_kickers(top))
+        else:
+            flush_values[mask] = _value(
+                FLUSH, [r for r in range(12, -1, -1) if mask >> r & 1][:5]
+            )
+    return multiset_keys, multiset_values, flush_values
+
+
+def _load_tables():
+    """The tables from TABLES_FILE, built and saved there the first time."""
+    try:
+        with np.load(TABLES_FILE) as data:
+            return data["multiset_keys"], data["multiset_values"], data["flush_values"]
+    except (OSError, KeyError):
+        pass
+    tables = _build_tables()
+    try:
+        np.savez(
+            TABLES_FILE,
+            multiset_keys=tables[0],
+            multiset_values=tables[1],
+            flush_values=tables[2],
+        )
+    except OSError:
+        pass  # read only checkout, build again next time
+    return tables
+
+
+MULTISET_KEYS, MULTISET_VALUES, FLUSH_VALUES = _load_tables()
+_MULTISET_LOOKUP = dict(zip(MULTISET_KEYS.tolist(), MULTISET_VALUES.tolist()))
+
+
+def rank_hand(cards):
+    """Value of one 5, 6 or 7 card hand (sequence of card ids), pure Python."""
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    suit_counts = [0, 0, 0, 0]
+    for c in cards:
+        rank, suit = c >> 2, c & 3
+        key += 5**rank
+        suit_masks[suit] |= 1 << rank
+        suit_counts[suit] += 1
+    value = _MULTISET_LOOKUP[key]
+    for suit in range(4):
+        if suit_counts[suit] >= 5:
+            value = max(value, int(FLUSH_VALUES[suit_masks[suit]]))
+    return value
+
+
+def rank_hands(cards):
+    """
+    Vectorized rank_hand.
+
+    Args:
+        cards (np.ndarray): int array [n, 5 | 6 | 7] of card ids.
+
+    Returns:
+        np.ndarray: int32 array [n] of hand values.
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    ranks, suits = cards >> 2, cards & 3
+
+    keys = _RANK_CODES[ranks].sum(axis=1)
+    values = MULTISET_VALUES[np.searchsorted(MULTISET_KEYS, keys)]
+
+    bits = np.left_shift(1, ranks)
+    for suit in range(4):
+        suited = suits == suit
+        flush = suited.sum(axis=1) >= 5
+        if flush.any():
+            masks = np.where(suited[flush], bits[flush], 0).sum(axis=1)
+            values[flush] = np.maximum(values[flush], FLUSH_VALUES[masks])
+    return values
+
+
+def _showdowns(hero, villain, boards):
+    """(ties, hero wins, villain wins) counts over an int array [n, 5] of boards."""
+    n = len(boards)
+    hero_vals = rank_hands(np.concatenate([np.tile(hero, (n, 1)), boards], axis=1))
+    villain_vals = rank_hands(
+        np.concatenate([np.tile(villain, (n, 1)), boards], axis=1)
+    )
+    return (
+        int((hero_vals == villain_vals).sum()),
+        int((hero_vals > villain_vals).sum()),
+        int((hero_vals < villain_vals).sum()),
+    )
+
+
+@lru_cache(maxsize=None)
+def _runout_index(deck_size, missing):
+    """Every `missing` card combination of a deck_size card deck, as deck positions."""
+    if missing == 0:
+        return np.zeros((1, 0), dtype=np.int8)  # the river, one empty runout
+    flat = chain.from_iterable(combinations(range(deck_size), missing))
+    return np.fromiter(flat, dtype=np.int8).reshape(-1, missing)
+
+
+def _exact_equity(hero, villain, board, chunk_size):
+    dead = set(hero + villain + board)
+    deck = np.array([c for c in range(52) if c not in dead], dtype=np.int64)
+    runouts = _runout_index(len(deck), 5 - len(board))
+    board = np.array(board, dtype=np.int64)
+    totals = np.zeros(3, dtype=np.int64)
+    for start in range(0, len(runouts), chunk_size):
+        chunk = deck[runouts[start : start + chunk_size]]
+        boards = np.concatenate([np.tile(board, (len(chunk), 1)), chunk], axis=1)
+        totals += _showdowns(hero, villain, boards)
+    return tuple((totals / totals.sum()).tolist())
+
+
+def equity(hero, villain, board=(), samples=None, rng=None, chunk_size=1 << 18):
+    """
+    Showdown equity of two known hands, with the rest of the board dealt out.
+
+    Args:
+        hero, villain (sequence): Two card ids each.
+        board (sequence): 0 to 5 board card ids.
+        samples (int): Monte Carlo runouts, None enumerates every runout (exact,
+            1.7M runouts preflop, see equity_cache.py to memoize it).
+        rng (np.random.Generator): Source of the Monte Carlo runouts.
+        chunk_size (int): Runouts ranked per NumPy call.
+
+    Returns:
+        tuple: (tie, hero win, villain win) probabilities, like holdem_calc.calculate
+        with the hands in that order.
+    """
+    hero, villain, board = tuple(hero), tuple(villain), tuple(board)
+    if samples is None or len(board) == 5:
+        return _exact_equity(hero, villain, board, chunk_size)
+
+    rng = rng if rng is not None else np.random.default_rng()
+    dead = np.array(hero + villain + board, dtype=np.int64)
+    deck = np.setdiff1d(np.arange(52), dead)
+    missing = 5 - len(board)
+    picks = np.argsort(rng.random((samples, len(deck))), axis=1)[:, :missing]
+    boards = np.concatenate(
+        [np.tile(np.array(board, dtype=np.int64), (samples, 1)), deck[picks]], axis=1
+    )
+    tie, win, lose = _showdowns(hero, villain, boards)
+    return tie / samples, win / samples, lose / samples
@@ -0,0 +1,31 @@
+import importlib
+import os
+import sys
+
+AI_EXTENSION = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UTILS = os.path.join(AI_EXTENSION, "utils.py")
+
+_utils = None
+
+
+def _use_ai_extension_modules():
+    # ai-extension's modules are imported top level (it runs from ai-extension/) and
+    # the repo root has its own utils.py, so put ai-extension/ first and make `utils`
+    # ai-extension's for the tests here
+    global _utils
+    if AI_EXTENSION in sys.path:
+        sys.path.remove(AI_EXTENSION)
+    sys.path.insert(0, AI_EXTENSION)
+    if _utils is None:
+        if getattr(sys.modules.get("utils"), "__file__", UTILS) != UTILS:
+            del sys.modules["utils"]
+        _utils = importlib.import_module("utils")
+    sys.modules["utils"] = _utils
+
+
+def pytest_collectstart(collector):
+    _use_ai_extension_modules()
+
+
+def pytest_runtest_setup(item):
+    _use_ai_extension_modules()
@@ -0,0 +1,205 @@
+"""
+Small games with the slice of the pyspiel State API the searches use, so they can be
+tested without OpenSpiel.
+"""
+
+import random
+
+INVALID_CARD = -10000
+
+
+class RandomTreeGame:
+    """Game whose tree (branching, chance odds, terminals, payoffs) is set by `seed`."""
+
+    def __init__(self, seed):
+        self.seed = int(seed)
+
+    def __str__(self):
+        return str(self.seed)
+
+    def new_initial_state(self):
+        return RandomTreeState(self)
+
+
+def load_game(game_string):
+    """pyspiel.load_game for RandomTreeGame, the pool workers rebuild it by name."""
+    return RandomTreeGame(game_string)
+
+
+class RandomTreeState:
+    """
+    Decision nodes with 2-3 actions and a chance node with 3-8 weighted outcomes
+    (actions 100+) after every second decision, terminal at random from depth 3 on.
+    Everything is a function of the action history.
+    """
+
+    def __init__(self, game, history=()):
+        self.game = game
+        self.hist = list(history)
+
+    def _rng(self, salt):
+        return random.Random(repr((self.game.seed, self.hist, salt)))
+
+    def get_game(self):
+        return self.game
+
+    def history(self):
+        return list(self.hist)
+
+    def clone(self):
+        return RandomTreeState(self.game, self.hist)
+
+    def apply_action(self, action):
+        self.hist.append(action)
+
+    def is_terminal(self):
+        if len(self.hist) >= 14:
+            return True
+        return len(self.hist) >= 3 and self._rng("terminal").random() < 0.12
+
+    def is_chance_node(self):
+        return len(self.hist) % 4 == 2
+
+    def chance_outcomes(self):
+        n = self._rng("outcomes").randint(3, 8)
+        weights = [self._rng(i).random() + 0.1 for i in range(n)]
+        return [(100 + i, w / sum(weights)) for i, w in enumerate(weights)]
+
+    def current_player(self):
+        return sum(1 for a in self.hist if a < 100) % 2
+
+    def legal_actions(self):
+        return list(range(self._rng("actions").randint(2, 3)))
+
+    def returns(self):
+        value = self._rng("returns").uniform(-2, 2)
+        return [value, -value]
+
+
+def random_tree_heuristic(state, agent):
+    """Leaf value in [-1, 1], so every leaf of the random tree is in [-2, 2]."""
+    value = state._rng("heuristic").uniform(-1, 1)
+    return value if agent == 0 else -value
+
+
+RANDOM_TREE_BOUNDS = (-2, 2)
+
+
+class LeducGame:
+    """Leduc hold'em with OpenSpiel's action ids and card ids (rank = card // 2)."""
+
+    def new_initial_state(self):
+        return LeducState(self)
+
+    def min_utility(self):
+        return -13
+
+    def max_utility(self):
+        return 13
+
+
+class LeducState:
+    """
+    Ante 1, raises of 2 then 4, at most 2 raises a round; fold 0, call 1, raise 2,
+    fold only when facing a bet. Showdown: pairing the public card, then rank.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.hist = []
+        self.cards = []
+        self.public = INVALID_CARD
+        self.contrib = [1, 1]
+        self.round = 0
+        self.raises = 0
+        self.player = 0
+        self.acted = 0
+        self.folded = None
+        self.done = False
+
+    def clone(self):
+        state = LeducState(self.game)
+        state.__dict__.update(
+            {k: list(v) if isinstance(v, list) else v for k, v in self.__dict__.items()}
+        )
+        return state
+
+    def get_game(self):
+        return self.game
+
+    def history(self):
+        return list(self.hist)
+
+    def is_chance_node(self):
+        if self.done:
+            return False
+        return len(self.cards) < 2 or (self.round == 1 and self.public == INVALID_CARD)
+
+    def legal_actions(self):
+        if self.is_chance_node():
+            return [c for c in range(6) if c not in self.cards and c != self.public]
+        actions = [1]
+        if self.contrib[self.player] < self.contrib[1 - self.player]:
+            actions = [0, 1]
+        if self.raises < 2:
+            actions.append(2)
+        return actions
+
+    def chance_outcomes(self):
+        cards = self.legal_actions()
+        return [(c, 1 / len(cards)) for c in cards]
+
+    def current_player(self):
+        return -1 if self.is_chance_node() else self.player
+
+    def public_card(self):
+        return self.public
+
+    def private_card(self, player):
+        return self.cards[player] if len(self.cards) > player else INVALID_CARD
+
+    def is_terminal(self):
+        return self.done
+
+    def action_to_string(self, player, action):
+        return ["Fold", "Call", "Raise"][action]
+
+    def apply_action(self, action):
+        self.hist.append(action)
+        if len(self.cards) < 2:
+            self.cards.append(action)
+            return
+        if self.is_chance_node():
+            self.public = action
+            self.player, self.acted, self.raises = 0, 0, 0
+            return
+        player = self.player
+        if action == 0:
+            self.folded, self.done = player, True
+            return
+        if action == 2:
+            self.contrib[player] = self.contrib[1 - player] + (2, 4)[self.round]
+            self.raises += 1
+        else:
+            self.contrib[player] = self.contrib[1 - player]
+        self.acted += 1
+        if action == 1 and self.acted >= 2:
+            if self.round == 1:
+                self.done = True
+            else:
+                self.round = 1
+            return
+        self.player = 1 - player
+
+    def returns(self):
+        if self.folded is not None:
+            winner = 1 - self.folded
+        else:
+            scores = [
+                c // 2 + 10 * (c // 2 == self.public // 2) for c in self.cards
+            ]
+            if scores[0] == scores[1]:
+                return [0.0, 0.0]
+            winner = 0 if scores[0] > scores[1] else 1
+        won = float(self.contrib[1 - winner])
+        return [won if p == winner else -won for p in (0, 1)]
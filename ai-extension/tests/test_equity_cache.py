@@ -0,0 +1,66 @@
+import multiprocessing as mp
+import random
+
+import pytest
+
+from equity_cache import EquityCache
+from hand_eval import equity
+
+# river boards, so every equity is a single exact showdown
+BOARD = (0, 5, 10, 27, 30)
+HANDS = [((48, 44), (41, 42)), ((49, 45), (12, 13))]
+
+
+def _hold_pending_entry(path, ready, done):
+    cache = EquityCache(path=path, commit_every=100)
+    cache.equity(*HANDS[0], BOARD)  # buffered, not flushed yet
+    ready.set()
+    done.wait(30)
+    cache.close()
+
+
+def test_two_processes_share_the_file(tmp_path):
+    path = str(tmp_path / "equity.sqlite")
+    ctx = mp.get_context("fork")
+    ready, done = ctx.Event(), ctx.Event()
+    other = ctx.Process(target=_hold_pending_entry, args=(path, ready, done))
+    other.start()
+    try:
+        assert ready.wait(30)
+        # writes while the other process has an unflushed entry
+        cache = EquityCache(path=path, commit_every=1)
+        cache.equity(*HANDS[1], BOARD)
+        cache.close()
+    finally:
+        done.set()
+        other.join(30)
+    assert other.exitcode == 0
+
+    cache = EquityCache(path=path)
+    for hero, villain in HANDS:
+        cache.equity(hero, villain, BOARD)
+    assert cache.disk_hits == 2 and cache.misses == 0
+    cache.close()
+
+
+@pytest.mark.parametrize("board_size", [3, 4, 5])
+def test_cached_equity_matches_under_suit_and_seat_changes(board_size):
+    rng = random.Random(board_size)
+    cache = EquityCache()
+    for _ in range(20):
+        cards = rng.sample(range(52), 4 + board_size)
+        hero, villain, board = cards[:2], cards[2:4], cards[4:]
+        cache.equity(hero, villain, board)
+
+        # same deal with the suits relabeled, and/or the seats swapped
+        perm = rng.sample(range(4), 4)
+        relabel = [c & ~3 | perm[c & 3] for c in cards]
+        r_hero, r_villain, r_board = relabel[:2], relabel[2:4], relabel[4:]
+        hits = cache.hits
+        assert cache.equity(r_hero, r_villain, r_board) == pytest.approx(
+            equity(r_hero, r_villain, r_board)
+        )
+        assert cache.equity(r_villain, r_hero, r_board[::-1]) == pytest.approx(
+            equity(r_villain, r_hero, r_board)
+        )
+        assert cache.hits == hits + 2
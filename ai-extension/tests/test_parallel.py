@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+
+import mock_games
+from expectiminimax.search import SamplingPlan, SearchEngine
+from mock_games import RANDOM_TREE_BOUNDS, RandomTreeGame, random_tree_heuristic
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    # the workers rebuild the game with pyspiel.load_game, point it at the mock games
+    monkeypatch.setitem(sys.modules, "pyspiel", mock_games)
+    from expectiminimax import parallel
+
+    monkeypatch.setattr(parallel, "pyspiel", mock_games)
+    return parallel
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_trials_match_sequential_engines(parallel, seed):
+    root = RandomTreeGame(seed).new_initial_state()
+    results = parallel.parallel_best_actions(
+        root, 4, 0, random_tree_heuristic, 3, 3, RANDOM_TREE_BOUNDS, 1, seed=7
+    )
+    for t, (value, action) in enumerate(results):
+        engine = SearchEngine(0, random_tree_heuristic, 3, seed=7 + t)
+        ref_value, ref_action = engine.best_action(root, 4)
+        assert action == ref_action
+        assert value == pytest.approx(ref_value, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_pool_matches_one_worker(parallel, seed):
+    root = RandomTreeGame(seed).new_initial_state()
+    args = (root, 4, 0, random_tree_heuristic, 3, 3, RANDOM_TREE_BOUNDS)
+    serial = parallel.parallel_best_actions(*args, 1, seed=11)
+    pooled = parallel.parallel_best_actions(*args, 2, seed=11)
+    assert [a for _, a in pooled] == [a for _, a in serial]
+    assert [v for v, _ in pooled] == pytest.approx([v for v, _ in serial], abs=1e-9)
+
+
+def test_plan_seed_matches_sequential_plans(parallel):
+    root = RandomTreeGame(5).new_initial_state()
+    args = (root, 4, 0, random_tree_heuristic, 3, 3, RANDOM_TREE_BOUNDS)
+    serial = parallel.parallel_best_actions(*args, 1, seed=1, plan_seed=20)
+    pooled = parallel.parallel_best_actions(*args, 2, seed=1, plan_seed=20)
+    for t, (value, action) in enumerate(serial):
+        plan = SamplingPlan(3, 20 + t)
+        engine = SearchEngine(0, random_tree_heuristic, 3, plan=plan)
+        ref_value, ref_action = engine.best_action(root, 4)
+        assert action == ref_action == pooled[t][1]
+        assert value == pytest.approx(ref_value, abs=1e-9)
+        assert pooled[t][0] == pytest.approx(ref_value, abs=1e-9)
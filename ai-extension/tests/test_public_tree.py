@@ -0,0 +1,68 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from expectiminimax.heuristics import VECTOR_HEURISTICS, heuristic_bounds
+from expectiminimax.public_tree import _values, best_actions_all_pairs, private_pairs
+from expectiminimax.search import SearchEngine
+from mock_games import LeducGame
+
+
+def _deal(game, a, b, actions=()):
+    state = game.new_initial_state()
+    for action in (a, b, *actions):
+        state.apply_action(action)
+    return state
+
+
+@pytest.mark.parametrize("heuristic", list(VECTOR_HEURISTICS))
+@pytest.mark.parametrize("agent", [0, 1])
+@pytest.mark.parametrize("depth", range(1, 9))
+def test_matches_per_pair_search(heuristic, agent, depth):
+    game = LeducGame()
+    results = best_actions_all_pairs(game, depth, agent, VECTOR_HEURISTICS[heuristic])
+    assert [(a, b) for a, b, _, _ in results] == private_pairs(6)
+    for a, b, value, action in results:
+        state = _deal(game, a, b)
+        engine = SearchEngine(agent, heuristic, 10, heuristic_bounds(game, heuristic))
+        ref_value, ref_action = engine.best_action(state, depth)
+        assert action == ref_action
+        assert value == pytest.approx(ref_value, abs=1e-9)
+
+
+def _terminal_histories(game):
+    """Every betting history to a terminal node, public card 4 (a queen) if dealt."""
+    histories, stack = [], [[]]
+    while stack:
+        betting = stack.pop()
+        state = _deal(game, 0, 2, betting)
+        if state.is_terminal():
+            histories.append(betting)
+        elif state.is_chance_node():
+            stack.append(betting + [4])
+        else:
+            stack += [betting + [a] for a in state.legal_actions()]
+    return histories
+
+
+@pytest.mark.parametrize("agent", [0, 1])
+def test_terminal_values_are_each_pairs_returns(agent):
+    # pins the fold check (last action FOLD) and the sign(diff) * |payoff| showdown,
+    # ties included, against the game's own returns for every pair
+    game = LeducGame()
+    pairs = [p for p in itertools.permutations(range(6), 2) if 4 not in p]
+    cards = np.array(pairs)
+    histories = _terminal_histories(game)
+    assert any(h[-1] == 0 for h in histories) and any(h[-1] != 0 for h in histories)
+    for betting in histories:
+        values = _values(
+            _deal(game, 0, 2, betting),
+            0,
+            agent,
+            None,
+            cards[:, agent],
+            cards[:, 1 - agent],
+        )
+        expected = [_deal(game, a, b, betting).returns()[agent] for a, b in pairs]
+        assert values.tolist() == pytest.approx(expected)
@@ -0,0 +1,163 @@
+import math
+import time
+
+import pytest
+
+from expectiminimax.algorithms import expectiminimax, get_best_action_timed
+from expectiminimax.search import SamplingPlan, SearchEngine
+from mock_games import RANDOM_TREE_BOUNDS, RandomTreeGame, random_tree_heuristic
+
+SEEDS = range(25)
+DEPTHS = (2, 3, 4, 5)
+
+
+def _child(state, action):
+    nxt = state.clone()
+    nxt.apply_action(action)
+    return nxt
+
+
+def brute_force(engine, state, depth, level=0):
+    """Plain expectiminimax over engine.sample_outcomes, no table, no pruning."""
+    if state.is_terminal():
+        return state.returns()[engine.agent]
+    if depth == 0:
+        return engine.heuristic_fn(state, engine.agent)
+    if state.is_chance_node():
+        outcomes = engine.sample_outcomes(state, tuple(state.history()), level)
+        return sum(
+            p * brute_force(engine, _child(state, a), depth, level + 1)
+            for a, p in outcomes
+        )
+    values = [
+        brute_force(engine, _child(state, a), depth - 1, level)
+        for a in state.legal_actions()
+    ]
+    return max(values) if state.current_player() == engine.agent else min(values)
+
+
+def brute_force_best(engine, state, depth):
+    best_value, best_action = -math.inf, None
+    for action in state.legal_actions():
+        value = brute_force(engine, _child(state, action), depth - 1)
+        if value > best_value:
+            best_value, best_action = value, action
+    return best_value, best_action
+
+
+@pytest.mark.parametrize("bounds", [None, RANDOM_TREE_BOUNDS])
+@pytest.mark.parametrize("agent", [0, 1])
+def test_search_matches_brute_force(bounds, agent):
+    for seed in SEEDS:
+        root = RandomTreeGame(seed).new_initial_state()
+        for depth in DEPTHS:
+            engine = SearchEngine(agent, random_tree_heuristic, 3, bounds, seed=seed)
+            value, action = engine.best_action(root, depth)
+            ref_value, ref_action = brute_force_best(
+                SearchEngine(agent, random_tree_heuristic, 3, seed=seed), root, depth
+            )
+            assert action == ref_action
+            assert value == pytest.approx(ref_value, abs=1e-9)
+
+
+def test_pruning_expands_fewer_nodes():
+    plain = pruned = 0
+    for seed in SEEDS:
+        root = RandomTreeGame(seed).new_initial_state()
+        engine = SearchEngine(0, random_tree_heuristic, 3, seed=seed)
+        engine.best_action(root, 5)
+        plain += engine.nodes
+        engine = SearchEngine(
+            0, random_tree_heuristic, 3, RANDOM_TREE_BOUNDS, seed=seed
+        )
+        engine.best_action(root, 5)
+        pruned += engine.nodes
+    assert pruned < plain
+
+
+def test_reused_table_gives_same_values():
+    # LOWER / UPPER entries of one search must not leak wrong values into the next
+    for seed in SEEDS:
+        root = RandomTreeGame(seed).new_initial_state()
+        engine = SearchEngine(
+            0, random_tree_heuristic, 3, RANDOM_TREE_BOUNDS, seed=seed
+        )
+        for depth in DEPTHS:
+            fresh = SearchEngine(0, random_tree_heuristic, 3, seed=seed)
+            value, action = engine.best_action(root, depth)
+            ref_value, ref_action = fresh.best_action(root, depth)
+            assert action == ref_action
+            assert value == pytest.approx(ref_value, abs=1e-9)
+
+
+def test_matches_expectiminimax_when_every_outcome_is_searched():
+    for seed in SEEDS:
+        root = RandomTreeGame(seed).new_initial_state()
+        best_value, best_action = -math.inf, None
+        for action in root.legal_actions():
+            nxt = _child(root, action)
+            value = expectiminimax(nxt, 3, 0, random_tree_heuristic, 100)
+            if value > best_value:
+                best_value, best_action = value, action
+        engine = SearchEngine(0, random_tree_heuristic, 100, RANDOM_TREE_BOUNDS)
+        value, action = engine.best_action(root, 4)
+        assert action == best_action
+        assert value == pytest.approx(best_value, abs=1e-9)
+
+
+def test_iterative_deepening_matches_fixed_depth():
+    for seed in SEEDS:
+        root = RandomTreeGame(seed).new_initial_state()
+        engine = SearchEngine(
+            0, random_tree_heuristic, 3, RANDOM_TREE_BOUNDS, seed=seed
+        )
+        value, action, depth, nodes = engine.iterative_deepening(root, 60, max_depth=5)
+        assert 1 <= depth <= 5 and nodes == engine.nodes
+        fresh = SearchEngine(0, random_tree_heuristic, 3, seed=seed)
+        ref_value, ref_action = fresh.best_action(root, depth)
+        assert action == ref_action
+        assert value == pytest.approx(ref_value, abs=1e-9)
+
+
+def test_iterative_deepening_keeps_to_the_budget():
+    def slow_heuristic(state, agent):
+        time.sleep(0.001)
+        return random_tree_heuristic(state, agent)
+
+    root = RandomTreeGame(3).new_initial_state()
+    start = time.perf_counter()
+    value, action, depth, _ = get_best_action_timed(
+        root, 0.05, 0, slow_heuristic, 3, RANDOM_TREE_BOUNDS
+    )
+    # depth 1 always finishes, deeper ones stop at the deadline
+    assert action in root.legal_actions() and depth >= 1
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.parametrize("bounds", [None, RANDOM_TREE_BOUNDS])
+def test_plan_search_matches_brute_force(bounds):
+    for seed in SEEDS:
+        root = RandomTreeGame(seed).new_initial_state()
+        for depth in DEPTHS:
+            engine = SearchEngine(
+                0, random_tree_heuristic, 3, bounds, plan=SamplingPlan(3, seed)
+            )
+            value, action = engine.best_action(root, depth)
+            reference = SearchEngine(
+                0, random_tree_heuristic, 3, plan=SamplingPlan(3, seed)
+            )
+            ref_value, ref_action = brute_force_best(reference, root, depth)
+            assert action == ref_action
+            assert value == pytest.approx(ref_value, abs=1e-9)
+
+
+def test_plan_samples_are_shared_and_weighted():
+    plan = SamplingPlan(3, seed=0)
+    outcomes = [(a, p) for a, p in zip(range(8), [0.3, 0.05, 0.05, 0.2] + [0.1] * 4)]
+    sample = plan.sample(outcomes, 0)
+    # same level, same draws: siblings and copies of the plan see the same outcomes
+    assert sample == plan.sample(outcomes, 0) == SamplingPlan(3, 0).sample(outcomes, 0)
+    assert sum(w for _, w in sample) == pytest.approx(1)
+    assert len({a for a, _ in sample}) == len(sample) <= 3
+    # nodes with at most k outcomes are searched exactly
+    assert plan.sample(outcomes[:3], 1) == outcomes[:3]
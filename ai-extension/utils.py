@@ -1,4 +1,4 @@
-import holdem_calc
+import equity_cache
 
 
 ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "T", "J", "Q", "K", "A"]
@@ -16,9 +16,9 @@ mapping = {i: f"{ranks[i//4]}{suits[i%4]}" for i in range(52)}
 # mapping[48] == 'Ac'
 
 
-def state_to_card_info(state):
+def state_to_card_ids(state):
     # collect only the chance‐node (player == -1) actions in deal order
-    cards = [mapping[step.action] for step in state.full_history() if step.player == -1]
+    cards = [step.action for step in state.full_history() if step.player == -1]
 
     # slice into hero, villain, board
     hero = cards[0:2]
@@ -28,11 +28,25 @@ def state_to_card_info(state):
     return hero, villain, board
 
 
+def state_to_card_info(state):
+    hero, villain, board = state_to_card_ids(state)
+    return (
+        [mapping[c] for c in hero],
+        [mapping[c] for c in villain],
+        [mapping[c] for c in board],
+    )
+
+
 # 0 assumed to be hero, aka first two hole cards
+# returns [tie, agent win, other win] like holdem_calc.calculate did, but exact
+# enumeration goes through the lookup table evaluator in hand_eval.py, memoized on
+# canonical hands by equity_cache.EQUITY_CACHE
 def calc_hero_equity(state, agent):
-    hero, villain, board = state_to_card_info(state)
-    hole_cards = [*hero, *villain] if agent == 0 else [*villain, *hero]
-    return holdem_calc.calculate(board, True, 1, None, hole_cards, False)
+    hero, villain, board = state_to_card_ids(state)
+    cache = equity_cache.EQUITY_CACHE
+    if agent == 0:
+        return list(cache.equity(hero, villain, board))
+    return list(cache.equity(villain, hero, board))
 
 
 from collections import Counter
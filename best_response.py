@@ -0,0 +1,160 @@
+"""
+Best response and exploitability of fixed Leduc agents.
+
+The best responder sees what a real player sees: its own hand, the public card once it is
+revealed and the full action record (which also tells its position). Its information
+sets are built while expanding the game tree of every deal against the fixed agent (see
+exact_eval), with the agent's branches weighted by its action_probs(). Values are then
+backed up from the deepest information sets, taking the best action at each, so any
+agent with action_probs() can be scored, whatever process_leduc_state_v* it uses.
+
+Score the saved agents with:
+    python best_response.py agents/*.pkl
+"""
+
+import sys
+
+import numpy as np
+
+from exact_eval import _action_id, all_deals
+from leduc_engine import ACTIONS, LeducBatchEngine
+
+
+def _info_key(state):
+    raw_obs = state["raw_obs"]
+    return (raw_obs["hand"], raw_obs["public_card"], tuple(state["action_record"]))
+
+
+def best_response(agent, br_seat):
+    """
+    Best response of seat `br_seat` against `agent` playing the other seat.
+
+    Args:
+        agent: Fixed agent with action_probs(state) -> {action: prob}.
+        br_seat (int): 0 or 1, the seat the best responder plays.
+
+    Returns:
+        tuple: (value, policy), the best responder's expected payoff per hand in big
+        blinds and {info key: best action label} (see BestResponseAgent).
+    """
+    deck, small_blind, prob = all_deals()
+    engine = LeducBatchEngine()
+    engine.reset(len(deck), deck=deck, small_blind=small_blind)
+    weights = np.full(len(deck), prob)
+    # last (info set, action) edge of the best responder in each game, -1 before it acts
+    edge = np.full(len(deck), -1)
+
+    info_ids = {}
+    info_keys, info_parent, info_edges = [], [], []
+    edge_ids = {}
+    edge_action = []
+    # expected payoff below each edge, first of the games ending right after it,
+    # then plus the backed up values of the info sets that follow it
+    edge_value = []
+    root = 0.0
+
+    while engine.num_games:
+        over = engine.is_over()
+        if over.any():
+            ended = np.flatnonzero(over)
+            values = weights[ended] * engine.get_payoffs()[ended, br_seat]
+            for e, v in zip(edge[ended].tolist(), values.tolist()):
+                if e < 0:
+                    root += v
+                else:
+                    edge_value[e] += v
+
+        games = np.flatnonzero(~over)
+        states = engine.get_states(games)
+        parents, actions, child_weights, child_edges = [], [], [], []
+        for g, pid, state in zip(games, engine.game_pointer[games], states):
+            if pid == br_seat:
+                key = _info_key(state)
+                iid = info_ids.get(key)
+                if iid is None:
+                    iid = info_ids[key] = len(info_keys)
+                    info_keys.append(key)
+                    # perfect recall: every history of an info set shares its last edge
+                    info_parent.append(edge[g])
+                    info_edges.append([])
+                for a in state["raw_obs"]["legal_actions"]:
+                    eid = edge_ids.get((iid, a))
+                    if eid is None:
+                        eid = edge_ids[(iid, a)] = len(edge_action)
+                        edge_action.append(a)
+                        edge_value.append(0.0)
+                        info_edges[iid].append(eid)
+                    parents.append(g)
+                    actions.append(ACTIONS.index(a))
+                    child_weights.append(weights[g])
+                    child_edges.append(eid)
+            else:
+                for a, p in agent.action_probs(state).items():
+                    if p > 0:
+                        parents.append(g)
+                        actions.append(_action_id(a))
+                        child_weights.append(weights[g] * p)
+                        child_edges.append(edge[g])
+
+        engine.select(parents)
+        weights = np.array(child_weights)
+        edge = np.array(child_edges, dtype=np.int64)
+        if parents:
+            engine.step(np.arange(len(parents)), actions)
+
+    # info sets were created in depth order, so children come after their parents
+    policy = {}
+    for iid in reversed(range(len(info_keys))):
+        eids = info_edges[iid]
+        best = max(eids, key=lambda e: edge_value[e])
+        policy[info_keys[iid]] = edge_action[best]
+        if info_parent[iid] < 0:
+            root += edge_value[best]
+        else:
+            edge_value[info_parent[iid]] += edge_value[best]
+    return float(root), policy
+
+
+def exploitability(agent0, agent1=None):
+    """
+    How much a best responder wins per hand against the pair (agent0 in seat 0,
+    agent1 in seat 1), averaged over both seats. Leduc's value is 0 for either seat
+    (the small blind is random), so this is 0 exactly for an equilibrium and the
+    average loss against a perfect opponent otherwise.
+
+    Args:
+        agent0: Agent playing seat 0.
+        agent1: Agent playing seat 1, defaults to agent0.
+
+    Returns:
+        float: exploitability in big blinds per hand.
+    """
+    agent1 = agent0 if agent1 is None else agent1
+    br_vs_1, _ = best_response(agent1, 0)
+    br_vs_0, _ = best_response(agent0, 1)
+    return (br_vs_1 + br_vs_0) / 2
+
+
+class BestResponseAgent:
+    """Plays a best_response() policy, e.g. to watch how an agent gets exploited."""
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def step(self, state):
+        return self.policy[_info_key(state)]
+
+    def action_probs(self, state):
+        best = self.step(state)
+        return {a: float(a == best) for a in state["raw_obs"]["legal_actions"]}
+
+    def update(self, trajectories):
+        pass
+
+
+if __name__ == "__main__":
+    from agents import EveryVisitMCAgent
+
+    for path in sys.argv[1:]:
+        agent = EveryVisitMCAgent.load(path)
+        print(f"{path}: {exploitability(agent):.4f} bb/hand")
@@ -0,0 +1,311 @@
+"""
+Checkpointing for long play_episodes training runs.
+
+A checkpoint directory holds numbered files, written atomically:
+
+    000000.full.pkl    whole agents (pickled like agent.save)
+    000001.delta.pkl   only the Q/N cells changed since the previous checkpoint
+    ...
+    payoffs.bin        float64 [p0, p1] of every episode, appended at each checkpoint
+
+Every file also carries the episode counter and the RNG states (python `random`, numpy's
+global RNG and the env / batched engine RNG), so resuming from the newest file continues
+the run exactly where it stopped.
+A full snapshot is written every `full_every` checkpoints, which bounds the chain of
+deltas to replay, and older chains are deleted once a new full snapshot is on disk.
+A new Checkpointer starts its directory over (an older run's files would otherwise
+outlive it and get resumed), only load_checkpoint keeps them.
+
+Usage:
+    ckpt = Checkpointer("checkpoints/run1", every_episodes=100000, every_seconds=600)
+    play_episodes(env, agent0, agent1, 10000000, update_freq=100, checkpoint=ckpt)
+
+    # after a crash, see experiments.resume_training
+    agent0, agent1, ckpt = load_checkpoint("checkpoints/run1")
+    play_episodes(env, agent0, agent1, 10000000 - ckpt.episodes_done, update_freq=100,
+                  checkpoint=ckpt)
+"""
+
+import os
+import pickle
+import random
+import time
+
+import numpy as np
+
+PAYOFFS_FILE = "payoffs.bin"
+
+
+def _rng_state(rng_owner):
+    """RNG state of an rlcard env (RandomState) or a batched engine (Generator)."""
+    rng = rng_owner.np_random
+    if isinstance(rng, np.random.Generator):
+        return rng.bit_generator.state
+    return rng.get_state()
+
+
+def _set_rng_state(rng_owner, state):
+    rng = rng_owner.np_random
+    if isinstance(rng, np.random.Generator):
+        rng.bit_generator.state = state
+    else:
+        # rlcard's game and dealer share the env's RandomState, set it in place
+        rng.set_state(state)
+
+
+def _store_snapshot(store):
+    used, cols = len(store), len(store.actions)
+    return used, cols, store.q[:used, :cols].copy(), store.n[:used, :cols].copy()
+
+
+def _store_delta(store, base):
+    """Q/N cells of `store` that differ from `base` (see _store_snapshot)."""
+    base_rows, base_cols, base_q, base_n = base
+    used, cols = len(store), len(store.actions)
+    q = store.q[:used, :cols]
+    n = store.n[:used, :cols]
+
+    # new rows / columns compare against zeros
+    old_q = np.zeros((used, cols))
+    old_n = np.zeros((used, cols), dtype=np.int64)
+    old_q[:base_rows, :base_cols] = base_q
+    old_n[:base_rows, :base_cols] = base_n
+    sids, aids = np.nonzero((q != old_q) | (n != old_n))
+    return {
+        "new_states": store.states[base_rows:used],
+        "new_actions": store.actions[base_cols:cols],
+        "sids": sids,
+        "aids": aids,
+        "q": q[sids, aids],
+        "n": n[sids, aids],
+    }
+
+
+def _apply_store_delta(store, delta):
+    for s in delta["new_states"]:
+        store.state_id(s)
+    for a in delta["new_actions"]:
+        store.action_id(a)
+    store.q[delta["sids"], delta["aids"]] = delta["q"]
+    store.n[delta["sids"], delta["aids"]] = delta["n"]
+
+
+class Checkpointer:
+    """
+    Periodically saves a play_episodes run to a directory, see the module docstring.
+
+    play_episodes calls maybe_save() whenever no trajectories are buffered (right after
+    an update, or after every episode / batch when not training), so checkpoints land on
+    update boundaries and a resumed run replays the same updates.
+
+    Attributes:
+        episodes_done (int): Episodes played over the whole run, including before resume.
+    """
+
+    def __init__(
+        self,
+        directory,
+        every_episodes=None,
+        every_seconds=None,
+        full_every=10,
+        resume=False,
+    ):
+        """
+        Args:
+            directory (str): Where checkpoint files go, created if missing.
+            every_episodes (int): Checkpoint at the first safe point after this many
+                episodes since the last one.
+            every_seconds (float): Checkpoint at the first safe point after this many
+                seconds since the last one. Either trigger is enough.
+            full_every (int): Write a full snapshot every `full_every` checkpoints,
+                deltas in between.
+            resume (bool): Keep the checkpoint files already in `directory`
+                (load_checkpoint), by default they are deleted so a fresh run never
+                mixes with an older one.
+        """
+        if every_episodes is None and every_seconds is None:
+            raise ValueError("Set every_episodes and/or every_seconds")
+        self.directory = directory
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.full_every = full_every
+        os.makedirs(directory, exist_ok=True)
+        if not resume:
+            self._remove_run()
+
+        self.episodes_done = 0
+        self.seq = 0
+        self._last_episodes = 0
+        self._last_time = time.time()
+        self._payoffs = []
+        self._bases = None
+        self._pending_rng = None
+
+    def attach(self, rng_owner):
+        """Called by play_episodes with the env / engine, restores its RNG on resume."""
+        if self._pending_rng is not None:
+            _set_rng_state(rng_owner, self._pending_rng)
+            self._pending_rng = None
+
+    def record(self, payoffs):
+        """Count finished episodes (one [p0, p1] payoff each)."""
+        self._payoffs.extend(payoffs)
+        self.episodes_done += len(payoffs)
+
+    def finish(self, agents, rng_owner):
+        """End of a play_episodes call, checkpoint whatever was played since the last one."""
+        if self.episodes_done > self._last_episodes:
+            self.save(agents, rng_owner)
+
+    def maybe_save(self, agents, rng_owner):
+        """Checkpoint if a trigger fired. Returns True if a file was written."""
+        due = (
+            self.every_episodes is not None
+            and self.episodes_done - self._last_episodes >= self.every_episodes
+        ) or (
+            self.every_seconds is not None
+            and time.time() - self._last_time >= self.every_seconds
+        )
+        if not due or self.episodes_done == self._last_episodes:
+            return False
+        self.save(agents, rng_owner)
+        return True
+
+    def save(self, agents, rng_owner):
+        """Write the next checkpoint file now (full or delta by sequence number)."""
+        full = self._bases is None or self.seq % self.full_every == 0
+        record = {
+            "episodes_done": self.episodes_done,
+            "config": {
+                "every_episodes": self.every_episodes,
+                "every_seconds": self.every_seconds,
+                "full_every": self.full_every,
+            },
+            "rng": {
+                "random": random.getstate(),
+                "numpy": np.random.get_state(),
+                "env": _rng_state(rng_owner),
+            },
+        }
+        if full:
+            record["agents"] = list(agents)
+        else:
+            record["agents"] = [
+                self._agent_delta(agent, base) for agent, base in zip(agents, self._bases)
+            ]
+
+        # payoffs first: a crash before the checkpoint file lands leaves extra rows,
+        # which load_checkpoint cuts back to the checkpoint's episode count
+        with open(os.path.join(self.directory, PAYOFFS_FILE), "ab") as f:
+            f.write(np.asarray(self._payoffs, dtype="<f8").tobytes())
+
+        kind = "full" if full else "delta"
+        path = os.path.join(self.directory, f"{self.seq:06d}.{kind}.pkl")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        if full:
+            self._remove_before(self.seq)
+
+        self._bases = [
+            _store_snapshot(a.store) if hasattr(a, "store") else None for a in agents
+        ]
+        self.seq += 1
+        self._last_episodes = self.episodes_done
+        self._last_time = time.time()
+        self._payoffs = []
+
+    @staticmethod
+    def _agent_delta(agent, base):
+        if base is None:
+            # agents without a TabularStore are small, keep them whole
+            return ("full", agent)
+        attrs = {k: v for k, v in agent.__dict__.items() if k != "store"}
+        return ("delta", attrs, _store_delta(agent.store, base))
+
+    def _remove_run(self):
+        # leftover .tmp files of a crashed save included
+        for name in os.listdir(self.directory):
+            parts = name.split(".")
+            if name == PAYOFFS_FILE or parts[1:2] in (["full"], ["delta"]):
+                os.remove(os.path.join(self.directory, name))
+
+    def _remove_before(self, seq):
+        for name, file_seq, _ in _checkpoint_files(self.directory):
+            if file_seq < seq:
+                os.remove(os.path.join(self.directory, name))
+
+
+def _checkpoint_files(directory):
+    """(file name, sequence number, kind) of every finished checkpoint, in order."""
+    files = []
+    for name in os.listdir(directory):
+        parts = name.split(".")
+        if len(parts) == 3 and parts[2] == "pkl" and parts[1] in ("full", "delta"):
+            files.append((name, int(parts[0]), parts[1]))
+    return sorted(files, key=lambda f: f[1])
+
+
+def has_checkpoint(directory):
+    """True if `directory` holds a full checkpoint load_checkpoint can resume from."""
+    return os.path.isdir(directory) and any(
+        kind == "full" for _, _, kind in _checkpoint_files(directory)
+    )
+
+
+def load_payoffs(directory):
+    """Payoffs of every checkpointed episode of a run, float array [episodes, 2]."""
+    return np.fromfile(os.path.join(directory, PAYOFFS_FILE), dtype="<f8").reshape(-1, 2)
+
+
+def load_checkpoint(directory, **overrides):
+    """
+    Rebuild a run from its newest full snapshot plus the deltas after it.
+
+    RNG states are restored right away for `random` and numpy's global RNG, and handed
+    to play_episodes through the returned Checkpointer for the env / engine RNG.
+
+    Args:
+        directory (str): Checkpoint directory written by a Checkpointer.
+        **overrides: every_episodes / every_seconds / full_every for the returned
+            Checkpointer, which keeps writing to the same directory. Defaults to the
+            settings of the run being resumed.
+
+    Returns:
+        tuple: (agent0, agent1, checkpointer), checkpointer.episodes_done tells how many
+        episodes the run had played.
+    """
+    files = _checkpoint_files(directory)
+    fulls = [i for i, (_, _, kind) in enumerate(files) if kind == "full"]
+    if not fulls:
+        raise FileNotFoundError(f"No full checkpoint in {directory}")
+
+    agents = None
+    for name, _, kind in files[fulls[-1] :]:
+        with open(os.path.join(directory, name), "rb") as f:
+            record = pickle.load(f)
+        if kind == "full":
+            agents = record["agents"]
+            continue
+        for i, entry in enumerate(record["agents"]):
+            if entry[0] == "full":
+                agents[i] = entry[1]
+            else:
+                _, attrs, store_delta = entry
+                agents[i].__dict__.update(attrs)
+                _apply_store_delta(agents[i].store, store_delta)
+
+    random.setstate(record["rng"]["random"])
+    np.random.set_state(record["rng"]["numpy"])
+
+    ckpt = Checkpointer(directory, **{**record["config"], **overrides}, resume=True)
+    ckpt.episodes_done = ckpt._last_episodes = record["episodes_done"]
+    ckpt.seq = files[-1][1] + 1
+    ckpt._pending_rng = record["rng"]["env"]
+    ckpt._bases = [
+        _store_snapshot(a.store) if hasattr(a, "store") else None for a in agents
+    ]
+    with open(os.path.join(directory, PAYOFFS_FILE), "r+b") as f:
+        f.truncate(record["episodes_done"] * 2 * 8)
+    return agents[0], agents[1], ckpt
@@ -3,7 +3,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import rlcard
 from agents import FirstVisitMCAgent, EveryVisitMCAgent, RandomAgent
-from experiments import play_episodes
+from experiments import train_with_milestones
+from exact_eval import evaluate_agents_exact
 from utils import process_leduc_state_v1
 
 # Set parameters
@@ -21,56 +22,51 @@ training_points = [
     500000,
     1000000,
 ]
-num_eval_episodes = 10000  # Evaluation episodes against Random Agent
+num_eval_episodes = 10000  # Evaluation episodes against Random Agent (scales the exact EV)
 epsilon = 0.01
 gamma = 0.9
 state_processor = process_leduc_state_v1
 
-# Storage for cumulative rewards for each algorithm
-everyvisit_results = []
-firstvisit_results = []
-
 env = rlcard.make("leduc-holdem")
 
 # For reproducibility you could set seeds here if desired
 
-# Iterate over each training milestone
-for train_eps in training_points:
-    print(f"\n--- Training for {train_eps} episodes ---")
-    # Reinitialize agents (so each milestone has a clean slate)
-    agent_ev = EveryVisitMCAgent(
-        epsilon=epsilon, gamma=gamma, state_transformer=state_processor
-    )
-    agent_fv = FirstVisitMCAgent(
-        epsilon=epsilon, gamma=gamma, state_transformer=state_processor
-    )
-    random_agent = RandomAgent()
-
-    # Train agents against each other (using orientation 1: EV as player 0, FV as player 1)
-    play_episodes(
-        env,
-        agent_ev,  # Player 0
-        agent_fv,  # Player 1
-        num_episodes=train_eps,
-        do_update=True,
-        update_freq=100,
-        state_transformer=state_processor,
-    )
-
-    # Evaluate EveryVisit agent: let it be Player 0 vs Random Agent (Player 1)
-    ev_vs_rand_payoffs = play_episodes(
-        env, agent_ev, random_agent, num_eval_episodes, do_update=False
-    )
-    # Sum up rewards for Player 0 (EveryVisit)
-    ev_cum_reward = np.sum([p[0] for p in ev_vs_rand_payoffs])
-
-    # Evaluate FirstVisit agent: let it be Player 1 vs Random Agent (Player 0)
-    fv_vs_rand_payoffs = play_episodes(
-        env, random_agent, agent_fv, num_eval_episodes, do_update=False
-    )
-    # Sum up rewards for Player 1 (FirstVisit)
-    fv_cum_reward = np.sum([p[1] for p in fv_vs_rand_payoffs])
+agent_ev = EveryVisitMCAgent(
+    epsilon=epsilon, gamma=gamma, state_transformer=state_processor
+)
+agent_fv = FirstVisitMCAgent(
+    epsilon=epsilon, gamma=gamma, state_transformer=state_processor
+)
+random_agent = RandomAgent()
+
+
+def evaluate_vs_random(agent_ev, agent_fv):
+    # exact expected payoff scaled to num_eval_episodes, so the bars keep their
+    # cumulative reward scale without the sampling noise
+    # EveryVisit as Player 0 vs Random Agent (Player 1)
+    ev_cum_reward = evaluate_agents_exact(agent_ev, random_agent)[0] * num_eval_episodes
+    # FirstVisit as Player 1 vs Random Agent (Player 0)
+    fv_cum_reward = evaluate_agents_exact(random_agent, agent_fv)[1] * num_eval_episodes
+    return ev_cum_reward, fv_cum_reward
+
+
+# Train agents against each other once (orientation 1: EV as player 0, FV as player 1),
+# each milestone is evaluated on a snapshot in the background while training continues.
+# A snapshot at m episodes matches agents trained from scratch for m episodes.
+milestone_results = train_with_milestones(
+    env,
+    agent_ev,  # Player 0
+    agent_fv,  # Player 1
+    training_points,
+    evaluate_vs_random,
+    update_freq=100,
+    state_transformer=state_processor,
+)
 
+# Storage for cumulative rewards for each algorithm
+everyvisit_results = []
+firstvisit_results = []
+for train_eps, (ev_cum_reward, fv_cum_reward) in milestone_results:
     everyvisit_results.append(ev_cum_reward)
     firstvisit_results.append(fv_cum_reward)
 
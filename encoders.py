@@ -0,0 +1,331 @@
+"""
+Integer info-state keys, one encoder per process_*_state_v* abstraction of utils.py.
+
+encode_<game>_state_v*(state, pid) gives the same information as the tuple transformer of
+the same version packed into one int, so Q/N lookups hash a small int instead of a tuple
+of strings (v3/v4 still turn the action record into a tuple, but only to look its
+history code up in a memo, the key keeps the int). The packing, low bits first:
+
+    card      rank << suit_bits | suit, all ones for a card not dealt yet
+              Leduc: 2 bit rank (J Q K) + 1 bit suit (S H) = 3 bits
+              limit: 4 bit rank (A 2 .. K) + 2 bit suit (S H D C) = 6 bits
+    chips     5 bits (Leduc, at most 14 in), 6 bits (limit, at most 50 in)
+    raises    3 bits per betting round (limit, at most 4)
+    history   1, then 3 bits per action (pid << 2 | index in ACTIONS), so it is
+              extended one action at a time with extend_history()
+
+    leduc v1  hand | public << 3 | my_chips << 6 | opp_chips << 11            16 bits
+    leduc v2  hand | public << 3                                               6 bits
+    leduc v3  leduc v1 | history << 16                                        41 bits
+    leduc v4  leduc v2 | history << 6                                         31 bits
+    limit v1  hole cards | board << 12 | my << 42 | opp << 48 | raises << 54  66 bits
+    limit v2  hole cards | board << 12 | my << 42 | opp << 48                 54 bits
+
+Every key decodes back to the tuple the matching transformer returns (decode_*), and
+pack_* turns such a tuple into its key, which encode_agent uses to convert trained agents.
+"""
+
+from isomorphism import SuitCanonical
+from leduc_engine import ACTIONS
+from tabular import TabularStore
+
+LEDUC_RANKS = "JQK"
+LEDUC_SUITS = "SH"
+LIMIT_RANKS = "A23456789TJQK"
+LIMIT_SUITS = "SHDC"
+
+LEDUC_CARD_BITS = 3
+LIMIT_CARD_BITS = 6
+LEDUC_CHIP_BITS = 5
+LIMIT_CHIP_BITS = 6
+RAISE_BITS = 3
+ACTION_BITS = 3
+NUM_BOARD_CARDS = 5
+NUM_ROUNDS = 4
+
+
+def _card_codes(ranks, suits):
+    suit_bits = (len(suits) - 1).bit_length()
+    return {
+        s + r: i << suit_bits | j for i, r in enumerate(ranks) for j, s in enumerate(suits)
+    }
+
+
+LEDUC_CARD_CODES = _card_codes(LEDUC_RANKS, LEDUC_SUITS)
+LIMIT_CARD_CODES = _card_codes(LIMIT_RANKS, LIMIT_SUITS)
+LEDUC_NO_CARD = (1 << LEDUC_CARD_BITS) - 1
+LIMIT_NO_CARD = (1 << LIMIT_CARD_BITS) - 1
+LEDUC_CARD_CODES[None] = LEDUC_NO_CARD
+# slots -> that many empty card slots
+_EMPTY_SLOTS = [(1 << (LIMIT_CARD_BITS * n)) - 1 for n in range(6)]
+_LEDUC_PUBLIC_CODES = {card: code << 3 for card, code in LEDUC_CARD_CODES.items()}
+LEDUC_CARD_STRS = {code: card for card, code in LEDUC_CARD_CODES.items()}
+LIMIT_CARD_STRS = {code: card for card, code in LIMIT_CARD_CODES.items()}
+
+# (pid, action) -> 3 bit history symbol
+ACTION_CODES = {(pid, a): pid << 2 | i for pid in (0, 1) for i, a in enumerate(ACTIONS)}
+ACTION_RECORDS = {code: pa for pa, code in ACTION_CODES.items()}
+EMPTY_HISTORY = 1
+
+
+def _mask(bits):
+    return (1 << bits) - 1
+
+
+def extend_history(history, pid, action):
+    """History code after `pid` played `action`, EMPTY_HISTORY before any action."""
+    return history << ACTION_BITS | ACTION_CODES[(pid, action)]
+
+
+def encode_history(action_record):
+    """Action record [(pid, action), ...] -> history code."""
+    history = EMPTY_HISTORY
+    for pid, action in action_record:
+        history = extend_history(history, pid, action)
+    return history
+
+
+# action record tuple -> history code, the histories of a game are few (Leduc has 8
+# actions at most), so after warm up encoding one is a single dict lookup
+_HISTORY_CODES = {(): EMPTY_HISTORY}
+
+
+def _history_code(action_record):
+    record = tuple(action_record)
+    history = _HISTORY_CODES.get(record)
+    if history is None:
+        # a new record extends a shorter one, usually cached already
+        history = extend_history(_history_code(record[:-1]), *record[-1])
+        _HISTORY_CODES[record] = history
+    return history
+
+
+def decode_history(history):
+    """History code -> action record tuple ((pid, action), ...)."""
+    record = []
+    while history > EMPTY_HISTORY:
+        record.append(ACTION_RECORDS[history & _mask(ACTION_BITS)])
+        history >>= ACTION_BITS
+    return tuple(reversed(record))
+
+
+# --- Leduc ---
+
+
+def pack_leduc_v1(hand, public_card, my_chips, opp_chips):
+    return (
+        LEDUC_CARD_CODES[hand]
+        | LEDUC_CARD_CODES[public_card] << 3
+        | my_chips << 6
+        | opp_chips << 11
+    )
+
+
+def pack_leduc_v2(hand, public_card):
+    return LEDUC_CARD_CODES[hand] | LEDUC_CARD_CODES[public_card] << 3
+
+
+def pack_leduc_v3(hand, public_card, my_chips, opp_chips, action_record):
+    return pack_leduc_v1(hand, public_card, my_chips, opp_chips) | (
+        encode_history(action_record) << 16
+    )
+
+
+def pack_leduc_v4(hand, public_card, action_record):
+    return pack_leduc_v2(hand, public_card) | encode_history(action_record) << 6
+
+
+def encode_leduc_state_v1(raw_imperfect_state, pid):
+    """Integer process_leduc_state_v1: hand, public card, my chips, opponent chips."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    chips = raw_obs["all_chips"]
+    return (
+        LEDUC_CARD_CODES[raw_obs["hand"]]
+        | _LEDUC_PUBLIC_CODES[raw_obs["public_card"]]
+        | chips[pid] << 6
+        | chips[1 - pid] << 11
+    )
+
+
+def encode_leduc_state_v2(raw_imperfect_state, pid):
+    """Integer process_leduc_state_v2: hand, public card."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    return (
+        LEDUC_CARD_CODES[raw_obs["hand"]]
+        | _LEDUC_PUBLIC_CODES[raw_obs["public_card"]]
+    )
+
+
+def encode_leduc_state_v3(raw_imperfect_state, pid):
+    """Integer process_leduc_state_v3: v1 plus the action record."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    chips = raw_obs["all_chips"]
+    return (
+        LEDUC_CARD_CODES[raw_obs["hand"]]
+        | _LEDUC_PUBLIC_CODES[raw_obs["public_card"]]
+        | chips[pid] << 6
+        | chips[1 - pid] << 11
+        | _history_code(raw_imperfect_state["action_record"]) << 16
+    )
+
+
+def encode_leduc_state_v4(raw_imperfect_state, pid):
+    """Integer process_leduc_state_v4: hand, public card and the action record."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    return (
+        LEDUC_CARD_CODES[raw_obs["hand"]]
+        | _LEDUC_PUBLIC_CODES[raw_obs["public_card"]]
+        | _history_code(raw_imperfect_state["action_record"]) << 6
+    )
+
+
+def decode_leduc_v1(key):
+    return (
+        LEDUC_CARD_STRS[key & 7],
+        LEDUC_CARD_STRS[key >> 3 & 7],
+        key >> 6 & _mask(LEDUC_CHIP_BITS),
+        key >> 11 & _mask(LEDUC_CHIP_BITS),
+    )
+
+
+def decode_leduc_v2(key):
+    return (LEDUC_CARD_STRS[key & 7], LEDUC_CARD_STRS[key >> 3 & 7])
+
+
+def decode_leduc_v3(key):
+    return decode_leduc_v1(key & _mask(16)) + (decode_history(key >> 16),)
+
+
+def decode_leduc_v4(key):
+    return decode_leduc_v2(key & _mask(6)) + (decode_history(key >> 6),)
+
+
+# --- limit hold'em ---
+
+
+def _pack_cards(cards, slots):
+    """Cards in the low `slots` 6 bit slots, the slots past len(cards) all ones."""
+    code = _EMPTY_SLOTS[slots] >> (LIMIT_CARD_BITS * len(cards)) << (
+        LIMIT_CARD_BITS * len(cards)
+    )
+    shift = 0
+    for card in cards:
+        code |= LIMIT_CARD_CODES[card] << shift
+        shift += LIMIT_CARD_BITS
+    return code
+
+
+def _unpack_cards(code, slots):
+    cards = []
+    for i in range(slots):
+        c = code >> (LIMIT_CARD_BITS * i) & LIMIT_NO_CARD
+        if c == LIMIT_NO_CARD:
+            break
+        cards.append(LIMIT_CARD_STRS[c])
+    return tuple(cards)
+
+
+def pack_limit_v2(hand, public_cards, my_chips, opp_chips):
+    return (
+        _pack_cards(hand, 2)
+        | _pack_cards(public_cards, NUM_BOARD_CARDS) << 12
+        | my_chips << 42
+        | opp_chips << 48
+    )
+
+
+def pack_limit_v1(hand, public_cards, my_chips, opp_chips, raise_nums):
+    raises = 0
+    for i, r in enumerate(raise_nums):
+        raises |= r << (RAISE_BITS * i)
+    return pack_limit_v2(hand, public_cards, my_chips, opp_chips) | raises << 54
+
+
+def encode_limit_state_v2(raw_imperfect_state, pid):
+    """Integer process_limit_state_v2: hole cards, board, my chips, opponent chips."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    my_chips = raw_obs["my_chips"]
+    return pack_limit_v2(
+        raw_obs["hand"],
+        raw_obs.get("public_cards", []),
+        my_chips,
+        sum(raw_obs["all_chips"]) - my_chips,
+    )
+
+
+def encode_limit_state_v1(raw_imperfect_state, pid):
+    """Integer process_limit_state_v1: v2 plus the raises of every round."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    raises = 0
+    for i, r in enumerate(raw_obs.get("raise_nums", [])):
+        raises |= r << (RAISE_BITS * i)
+    return encode_limit_state_v2(raw_imperfect_state, pid) | raises << 54
+
+
+def decode_limit_v2(key):
+    return (
+        _unpack_cards(key & _mask(12), 2),
+        _unpack_cards(key >> 12 & _mask(30), NUM_BOARD_CARDS),
+        key >> 42 & _mask(LIMIT_CHIP_BITS),
+        key >> 48 & _mask(LIMIT_CHIP_BITS),
+    )
+
+
+def decode_limit_v1(key):
+    raises = key >> 54
+    return decode_limit_v2(key & _mask(54)) + (
+        tuple(raises >> (RAISE_BITS * i) & _mask(RAISE_BITS) for i in range(NUM_ROUNDS)),
+    )
+
+
+# tuple transformer name -> (integer encoder, tuple -> key, key -> tuple)
+INT_ENCODERS = {
+    "process_leduc_state_v1": (encode_leduc_state_v1, pack_leduc_v1, decode_leduc_v1),
+    "process_leduc_state_v2": (encode_leduc_state_v2, pack_leduc_v2, decode_leduc_v2),
+    "process_leduc_state_v3": (encode_leduc_state_v3, pack_leduc_v3, decode_leduc_v3),
+    "process_leduc_state_v4": (encode_leduc_state_v4, pack_leduc_v4, decode_leduc_v4),
+    "process_limit_state_v1": (encode_limit_state_v1, pack_limit_v1, decode_limit_v1),
+    "process_limit_state_v2": (encode_limit_state_v2, pack_limit_v2, decode_limit_v2),
+}
+DECODERS = {encode.__name__: decode for encode, _, decode in INT_ENCODERS.values()}
+
+
+def decode_key(state_transformer, key):
+    """
+    The tuple info state behind `key` of an agent using an encode_* transformer (or its
+    isomorphism.SuitCanonical wrapper).
+    """
+    if isinstance(state_transformer, SuitCanonical):
+        state_transformer = state_transformer.transformer
+    return DECODERS[state_transformer.__name__](key)
+
+
+def encode_agent(agent):
+    """
+    Switch an MC agent trained with a process_*_state_v* transformer to the matching
+    integer encoder, re-keying its table in place (Q and N are unchanged). Agents on a
+    SuitCanonical transformer keep it, wrapped around the encoder.
+
+    Returns:
+        agent: The same agent.
+    """
+    transformer = agent.state_transformer
+    canonical = isinstance(transformer, SuitCanonical)
+    if canonical:
+        transformer = transformer.transformer
+    if transformer.__name__ in DECODERS:
+        return agent  # already on integer keys
+    encode, pack, _ = INT_ENCODERS[transformer.__name__]
+    if canonical:
+        encode = SuitCanonical(encode)
+    store = agent.store
+    used, cols = len(store.states), len(store.actions)
+    agent.store = TabularStore.from_arrays(
+        [pack(*s) for s in store.states],
+        store.actions,
+        store.q[:used, :cols],
+        store.n[:used, :cols],
+    )
+    agent.state_transformer = encode
+    return agent
+
@@ -0,0 +1,99 @@
+"""
+Exact expected payoffs in Leduc Hold'em by enumerating the whole game tree.
+
+Instead of sampling hands, every deal (6 * 5 * 4 ordered hand / hand / public cards,
+times which seat posts the small blind) is expanded over every action sequence on a
+LeducBatchEngine, weighting each branch by the chance of the deal and the probability
+each agent's action_probs() gives the action. The tree has a few tens of thousands of
+nodes, so this takes well under a second and has no sampling error.
+"""
+
+from itertools import permutations
+
+import numpy as np
+
+from leduc_engine import ACTIONS, CARD_STRS, LeducBatchEngine
+
+
+def all_deals():
+    """
+    Every Leduc deal with its probability.
+
+    Returns:
+        tuple: (deck, small_blind, prob), deck int array [num_deals, 3] of
+        (hand of seat 0, hand of seat 1, public card), small_blind int array, prob float.
+    """
+    cards = list(permutations(range(len(CARD_STRS)), 3))
+    deck = np.array(cards * 2)
+    small_blind = np.repeat([0, 1], len(cards))
+    return deck, small_blind, 1.0 / len(deck)
+
+
+def _action_id(a):
+    return ACTIONS.index(a) if isinstance(a, str) else int(a)
+
+
+def expand_tree(agent0, agent1, on_leaves=None):
+    """
+    Walk the whole Leduc tree with both agents' action probabilities, one betting
+    decision depth at a time.
+
+    Args:
+        agent0, agent1: Agents with action_probs(state) -> {action: prob}.
+        on_leaves (callable): Optional, called as on_leaves(engine, games, weights) for
+            the games that just ended at each depth.
+
+    Returns:
+        np.ndarray: float [2], expected payoff of player 0 and player 1 in big blinds.
+    """
+    agents = (agent0, agent1)
+    deck, small_blind, prob = all_deals()
+    engine = LeducBatchEngine()
+    engine.reset(len(deck), deck=deck, small_blind=small_blind)
+    weights = np.full(len(deck), prob)
+    ev = np.zeros(2)
+
+    while engine.num_games:
+        over = engine.is_over()
+        if over.any():
+            ended = np.flatnonzero(over)
+            ev += weights[ended] @ engine.get_payoffs()[ended]
+            if on_leaves is not None:
+                on_leaves(engine, ended, weights[ended])
+
+        # one child game per action with non zero probability
+        games = np.flatnonzero(~over)
+        states = engine.get_states(games)
+        parents, actions, child_weights = [], [], []
+        for g, pid, state in zip(games, engine.game_pointer[games], states):
+            for a, p in agents[pid].action_probs(state).items():
+                if p > 0:
+                    parents.append(g)
+                    actions.append(_action_id(a))
+                    child_weights.append(weights[g] * p)
+
+        engine.select(parents)
+        weights = np.array(child_weights)
+        if parents:
+            engine.step(np.arange(len(parents)), actions)
+
+    return ev
+
+
+def evaluate_agents_exact(agent0, agent1):
+    """
+    Exact counterpart of evaluate_agents for Leduc: the expected payoff of each seat,
+    with every deal and every action weighted by its probability.
+
+    Both agents need an action_probs(state) method (the MC agents, FrozenMCAgent,
+    RandomAgent and PolicyAgent have one). Exploration is included like in step();
+    set an agent's epsilon to 0 to evaluate its greedy policy.
+
+    Returns:
+        tuple: (ev_p0, ev_p1), expected payoff per hand of player 0 / player 1.
+    """
+    for agent in (agent0, agent1):
+        if not hasattr(agent, "action_probs"):
+            raise TypeError(f"{type(agent).__name__} has no action_probs()")
+    ev = expand_tree(agent0, agent1)
+    return (float(ev[0]), float(ev[1]))
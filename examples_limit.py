@@ -1,6 +1,7 @@
 import rlcard
 from agents import EveryVisitMCAgent, RandomAgent
 from experiments import play_episodes, evaluate_agents
+from checkpoint import Checkpointer
 from utils import process_limit_state_v1, process_limit_state_v2
 
 env = rlcard.make("limit-holdem")
@@ -25,6 +26,8 @@ train_payoffs = play_episodes(
     do_update=True,
     update_freq=100,
     state_transformer=process_limit_state_v2,
+    # resume with experiments.resume_training(env, "checkpoints/agentR1e7v2", 10000000, ...)
+    checkpoint=Checkpointer("checkpoints/agentR1e7v2", every_seconds=600),
 )
 agent_ev4.save("agents/agentR1e7v2.pkl")
 agentR, randomR = evaluate_agents(env, agent_ev4, random_agent, num_episodes=100000)
@@ -1,9 +1,22 @@
 import random
+import multiprocessing as mp
+from statistics import NormalDist
 
+import numpy as np
+import rlcard
 from utils import process_leduc_state_v1
-import matplotlib.pyplot as plt
+from checkpoint import load_checkpoint
+from leduc_engine import ACTIONS, LeducBatchEngine
+from limit_engine import LimitBatchEngine
+from metrics import read_metrics
 from collections import Counter
 
+# rlcard env name -> batched NumPy engine used by backend="numpy"
+BATCH_ENGINES = {
+    "leduc-holdem": LeducBatchEngine,
+    "limit-holdem": LimitBatchEngine,
+}
+
 
 def play_episodes(
     env,
@@ -13,6 +26,10 @@ def play_episodes(
     do_update=True,
     update_freq=1,
     state_transformer=process_leduc_state_v1,
+    backend="rlcard",
+    batch_size=1024,
+    checkpoint=None,
+    metrics=None,
 ):
     """
     Run 'num_episodes' episodes of the environment with agent0 (player 0) and agent1 (player 1).
@@ -25,11 +42,41 @@ def play_episodes(
         do_update (bool): If True, we collect trajectories and update the agents.
         update_freq (int): How often (in number of episodes) to call .update().
                            E.g. update_freq=10 means we call .update() every 10 episodes.
+        backend (str): "rlcard" steps `env` one decision at a time, "numpy" plays the same
+                       game (picked by env.name) in batches on the matching BATCH_ENGINES engine.
+        batch_size (int): How many games the numpy backend plays at once.
+        checkpoint (Checkpointer): Optional, saves the run every so often so it can be
+                                   resumed after a crash (see checkpoint.py / resume_training).
+        metrics (MetricsSink): Optional, payoffs are streamed there (columns p0, p1)
+                               instead of being kept in memory, see metrics.py.
 
     Returns:
-        payoffs_history (list): A list of [payoff_p0, payoff_p1] for each episode.
+        payoffs_history (list): A list of [payoff_p0, payoff_p1] for each episode,
+                                empty when `metrics` is given.
     """
+    if backend == "numpy":
+        if env.name not in BATCH_ENGINES:
+            raise ValueError(f"No batched engine for env '{env.name}'")
+        # seeded from the env so rlcard.make(..., config={"seed": s}) fixes the deals too
+        engine = BATCH_ENGINES[env.name](int(env.np_random.randint(2**31)))
+        return play_episodes_batched(
+            engine,
+            agent0,
+            agent1,
+            num_episodes,
+            do_update,
+            update_freq,
+            state_transformer,
+            batch_size,
+            checkpoint,
+            metrics,
+        )
+    if backend != "rlcard":
+        raise ValueError(f"Unknown backend '{backend}', use 'rlcard' or 'numpy'")
+
     # print("in PLAY", use_raw)
+    if checkpoint is not None:
+        checkpoint.attach(env)
 
     payoffs_history = []  # store final payoffs of each episode
 
@@ -82,7 +129,12 @@ def play_episodes(
 
         # get final payoffs
         payoffs = env.get_payoffs()  # [payoff_p0, payoff_p1]
-        payoffs_history.append(payoffs)
+        if metrics is None:
+            payoffs_history.append(payoffs)
+        else:
+            metrics.log(p0=payoffs[0], p1=payoffs[1])
+        if checkpoint is not None:
+            checkpoint.record([payoffs])
 
         if do_update:
             # Overwrite last transition's reward
@@ -109,9 +161,374 @@ def play_episodes(
                 all_trajectories_0 = []
                 all_trajectories_1 = []
 
+        # only checkpoint with nothing buffered, so a resumed run does the same updates
+        if checkpoint is not None and (
+            not do_update or (episode_id + 1) % update_freq == 0
+        ):
+            checkpoint.maybe_save((agent0, agent1), env)
+
+    if checkpoint is not None:
+        checkpoint.finish((agent0, agent1), env)
+    if metrics is not None:
+        metrics.flush()
+    return payoffs_history
+
+
+def play_episodes_batched(
+    engine,
+    agent0,
+    agent1,
+    num_episodes=1000,
+    do_update=True,
+    update_freq=1,
+    state_transformer=process_leduc_state_v1,
+    batch_size=1024,
+    checkpoint=None,
+    metrics=None,
+):
+    """
+    Same contract as play_episodes, but deals, steps and scores `batch_size` games at a
+    time on a batched engine (LeducBatchEngine or LimitBatchEngine). Agents still pick one action per
+    decision, the engine applies all of a round's actions at once.
+
+    When do_update is True, a batch never crosses an update boundary, so .update() is
+    called after exactly the same episode counts as the sequential loop.
+
+    Returns:
+        payoffs_history (list): A list of [payoff_p0, payoff_p1] for each episode.
+    """
+    agents = (agent0, agent1)
+    payoffs_history = []
+    if do_update:
+        all_trajectories = ([], [])
+    if checkpoint is not None:
+        checkpoint.attach(engine)
+
+    done = 0
+    while done < num_episodes:
+        n = min(batch_size, num_episodes - done)
+        if do_update:
+            n = min(n, update_freq - done % update_freq)
+        engine.reset(n)
+
+        # per game (state, action, reward) lists for each player
+        episode_trajs = ([[] for _ in range(n)], [[] for _ in range(n)])
+
+        games = engine.active_games()
+        while len(games):
+            states = engine.get_states(games)
+            actions = []
+            # limit raw_obs has no current_player, so ask the engine
+            for g, pid, state in zip(games, engine.game_pointer[games], states):
+                action = agents[pid].step(state)
+                actions.append(action)
+                if do_update:
+                    info_s = state_transformer(state, pid)
+                    episode_trajs[pid][g].append((info_s, action, 0.0))
+            engine.step(games, actions)
+            games = engine.active_games()
+
+        payoffs = engine.get_payoffs()
+        if metrics is None:
+            payoffs_history.extend(payoffs)
+        else:
+            metrics.log(p0=payoffs[:, 0], p1=payoffs[:, 1])
+        if checkpoint is not None:
+            checkpoint.record(payoffs)
+
+        if do_update:
+            for pid in (0, 1):
+                for g, traj in enumerate(episode_trajs[pid]):
+                    # Overwrite last transition's reward
+                    if traj:
+                        s_last, a_last, _ = traj[-1]
+                        traj[-1] = (s_last, a_last, payoffs[g][pid])
+                    all_trajectories[pid].append(traj)
+
+        done += n
+        if do_update and done % update_freq == 0:
+            agent0.update(all_trajectories[0])
+            agent1.update(all_trajectories[1])
+            all_trajectories = ([], [])
+
+        if checkpoint is not None and (not do_update or done % update_freq == 0):
+            checkpoint.maybe_save(agents, engine)
+
+    if checkpoint is not None:
+        checkpoint.finish(agents, engine)
+    if metrics is not None:
+        metrics.flush()
     return payoffs_history
 
 
+def resume_training(env, directory, num_episodes, **kwargs):
+    """
+    Continue a checkpointed play_episodes run until it has played `num_episodes` in total.
+
+    Agent tables, RNG states and the episode counter come from the newest checkpoint in
+    `directory`, so with the same env, backend and update_freq the run ends up where an
+    uninterrupted one would have. The continued run keeps checkpointing to `directory`.
+
+    Arguments:
+        env: The env the run was using.
+        directory (str): Checkpoint directory of the run.
+        num_episodes (int): Total episodes of the whole run, not the remaining ones.
+        **kwargs: Passed to play_episodes (do_update, update_freq, state_transformer,
+                  backend, batch_size).
+
+    Returns:
+        tuple: (agent0, agent1, payoffs_history) where payoffs_history only covers the
+        episodes played by this call (checkpoint.load_payoffs has all of them).
+    """
+    agent0, agent1, ckpt = load_checkpoint(directory)
+    payoffs = play_episodes(
+        env,
+        agent0,
+        agent1,
+        num_episodes - ckpt.episodes_done,
+        checkpoint=ckpt,
+        **kwargs,
+    )
+    return agent0, agent1, payoffs
+
+
+class _StatsRecorder:
+    """
+    Wraps an agent inside a training worker: steps are passed through, but update()
+    only records sufficient statistics instead of changing the agent's tables.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.stats = {}
+
+    def step(self, state):
+        return self.agent.step(state)
+
+    def update(self, trajectories):
+        if hasattr(self.agent, "sufficient_stats"):
+            self.stats = self.agent.sufficient_stats(trajectories)
+
+
+def _training_worker(
+    conn, env_name, agent0, agent1, state_transformer, backend, batch_size, seed
+):
+    """
+    Worker loop for play_episodes_parallel. Each message is (num_episodes, deltas):
+    merge the broadcast deltas, play the shard with the now fixed policy, and send back
+    (payoffs, [stats_p0, stats_p1]). A None message stops the worker.
+    """
+    random.seed(seed)
+    if backend == "numpy":
+        engine = BATCH_ENGINES[env_name](seed)
+    else:
+        env = rlcard.make(env_name, config={"seed": seed})
+    agents = (agent0, agent1)
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        num_episodes, deltas = msg
+        for agent, delta in zip(agents, deltas):
+            if delta:
+                agent.merge_stats(delta)
+
+        rec0, rec1 = _StatsRecorder(agent0), _StatsRecorder(agent1)
+        if backend == "numpy":
+            payoffs = play_episodes_batched(
+                engine,
+                rec0,
+                rec1,
+                num_episodes,
+                True,
+                num_episodes,
+                state_transformer,
+                batch_size,
+            )
+        else:
+            payoffs = play_episodes(
+                env, rec0, rec1, num_episodes, True, num_episodes, state_transformer
+            )
+        conn.send((payoffs, [rec0.stats, rec1.stats]))
+    conn.close()
+
+
+def _add_stats(total, stats):
+    for key, (count, ret) in stats.items():
+        entry = total.setdefault(key, [0, 0.0])
+        entry[0] += count
+        entry[1] += ret
+
+
+def play_episodes_parallel(
+    env,
+    agent0,
+    agent1,
+    num_episodes=1000,
+    update_freq=100,
+    state_transformer=process_leduc_state_v1,
+    num_workers=None,
+    backend="rlcard",
+    batch_size=1024,
+    seed=0,
+):
+    """
+    Train agent0/agent1 like play_episodes(do_update=True), with episodes sharded over
+    `num_workers` processes.
+
+    MC values are plain averages, so every worker plays its shard with the current
+    (fixed) policy and sends back per-(state, action) visit counts and return sums.
+    The coordinator merges all of them into agent0/agent1 (exact, order does not matter)
+    and broadcasts the combined delta so each worker's copy matches before the next
+    shard. One sync round covers `update_freq` episodes per worker, so the policy is
+    refreshed every num_workers * update_freq episodes.
+
+    Arguments:
+        env: An RLCard environment, only its name is used to build each worker's own env.
+        num_workers (int): Worker processes, defaults to the number of cores.
+        backend (str): "rlcard" or "numpy", as in play_episodes.
+        seed (int): Worker i seeds its RNGs with seed + i.
+
+    Returns:
+        payoffs_history (list): A list of [payoff_p0, payoff_p1] for each episode.
+    """
+    num_workers = num_workers or mp.cpu_count()
+    agents = (agent0, agent1)
+
+    workers = []
+    for i in range(num_workers):
+        parent, child = mp.Pipe()
+        proc = mp.Process(
+            target=_training_worker,
+            args=(
+                child,
+                env.name,
+                agent0,
+                agent1,
+                state_transformer,
+                backend,
+                batch_size,
+                seed + i,
+            ),
+            daemon=True,
+        )
+        proc.start()
+        workers.append((proc, parent))
+
+    payoffs_history = []
+    deltas = [{}, {}]
+    done = 0
+    try:
+        while done < num_episodes:
+            # split the next round as evenly as possible, idle workers still get the delta
+            round_eps = min(num_workers * update_freq, num_episodes - done)
+            shards = [
+                round_eps // num_workers + (i < round_eps % num_workers)
+                for i in range(num_workers)
+            ]
+            for (_, conn), shard in zip(workers, shards):
+                conn.send((shard, deltas))
+
+            deltas = [{}, {}]
+            for _, conn in workers:
+                payoffs, stats = conn.recv()
+                payoffs_history.extend(payoffs)
+                for pid in (0, 1):
+                    _add_stats(deltas[pid], stats[pid])
+
+            for agent, delta in zip(agents, deltas):
+                if delta:
+                    agent.merge_stats(delta)
+            done += round_eps
+    finally:
+        for proc, conn in workers:
+            conn.send(None)
+            proc.join()
+
+    return payoffs_history
+
+
+def _milestone_worker(conn, evaluate, agent0, agent1):
+    conn.send(evaluate(agent0, agent1))
+    conn.close()
+
+
+def train_with_milestones(
+    env,
+    agent0,
+    agent1,
+    milestones,
+    evaluate,
+    update_freq=100,
+    state_transformer=process_leduc_state_v1,
+    backend="rlcard",
+    batch_size=1024,
+    max_workers=None,
+):
+    """
+    Train agent0/agent1 once up to the last milestone and evaluate them at every
+    milestone on the way, e.g. for convergence curves.
+
+    Agents trained from scratch for m episodes with play_episodes only ever applied the
+    updates at multiples of update_freq (the rest of the buffer is dropped), so the
+    snapshot for milestone m is taken once training reaches m // update_freq * update_freq.
+    Each snapshot is a forked process: it gets a copy-on-write view of the agents at that
+    point and runs `evaluate` while training carries on in this process. At most
+    `max_workers` evaluations run at the same time.
+
+    Arguments:
+        milestones (list): Episode counts to evaluate at.
+        evaluate (callable): evaluate(agent0, agent1) -> result, run in the snapshot
+                             process (fork start method, so lambdas are fine).
+        max_workers (int): Concurrent evaluations, defaults to the number of cores.
+        update_freq, state_transformer, backend, batch_size: As in play_episodes.
+
+    Returns:
+        list: (milestone, result) for every milestone, in increasing order.
+    """
+    ctx = mp.get_context("fork")
+    max_workers = max_workers or mp.cpu_count()
+    pending = []
+    results = {}
+
+    def collect():
+        m, proc, conn = pending.pop(0)
+        results[m] = conn.recv()
+        proc.join()
+
+    trained = 0
+    for m in sorted(milestones):
+        target = m // update_freq * update_freq
+        if target > trained:
+            play_episodes(
+                env,
+                agent0,
+                agent1,
+                target - trained,
+                True,
+                update_freq,
+                state_transformer,
+                backend=backend,
+                batch_size=batch_size,
+            )
+            trained = target
+
+        while len(pending) >= max_workers:
+            collect()
+        parent, child = ctx.Pipe(duplex=False)
+        proc = ctx.Process(
+            target=_milestone_worker, args=(child, evaluate, agent0, agent1), daemon=True
+        )
+        proc.start()
+        child.close()
+        pending.append((m, proc, parent))
+
+    while pending:
+        collect()
+    return [(m, results[m]) for m in sorted(milestones)]
+
+
 def evaluate_agents(
     env,
     agent0,
@@ -119,41 +536,245 @@ def evaluate_agents(
     num_episodes=1000,
     plot=False,
     state_transformer=process_leduc_state_v1,
+    backend="rlcard",
+    batch_size=1024,
+    metrics=None,
 ):
     """
     Plays `num_episodes` episodes of agent0 vs. agent1 and returns
     the average payoff of (player0, player1).
 
     If plot=True, displays a simple line chart of each player's
-    rewards across episodes.
+    rewards across episodes. `backend`/`batch_size` are passed to play_episodes.
+    With a MetricsSink as `metrics`, per-episode payoffs are streamed to it instead of
+    kept in memory (plot=True then plots the whole metrics file), plot them later with
+    `python plot_metrics.py <dir> --kind rewards`.
     """
     # print("eval called", use_raw)
     # Gather payoffs from each episode
+    if metrics is not None:
+        before = dict(metrics.totals)
     payoffs = play_episodes(
-        env, agent0, agent1, num_episodes, False, 1, state_transformer
+        env,
+        agent0,
+        agent1,
+        num_episodes,
+        False,
+        1,
+        state_transformer,
+        backend=backend,
+        batch_size=batch_size,
+        metrics=metrics,
     )
-    # Separate payoffs for each agent
-    p0_rewards = [p[0] for p in payoffs]
-    p1_rewards = [p[1] for p in payoffs]
 
-    # Compute averages
-    avg_p0 = sum(p0_rewards) / num_episodes
-    avg_p1 = sum(p1_rewards) / num_episodes
+    if metrics is None:
+        # Separate payoffs for each agent
+        p0_rewards = [p[0] for p in payoffs]
+        p1_rewards = [p[1] for p in payoffs]
+
+        # Compute averages
+        avg_p0 = sum(p0_rewards) / num_episodes
+        avg_p1 = sum(p1_rewards) / num_episodes
+        columns = {"p0": p0_rewards, "p1": p1_rewards}
+    else:
+        avg_p0 = (metrics.totals["p0"] - before["p0"]) / num_episodes
+        avg_p1 = (metrics.totals["p1"] - before["p1"]) / num_episodes
 
     # Optionally plot
     if plot:
-        plt.figure()
-        plt.plot(p0_rewards, label="Player 0 Reward")
-        plt.plot(p1_rewards, label="Player 1 Reward")
-        plt.xlabel("Episode")
-        plt.ylabel("Reward")
-        plt.legend()
-        plt.title("Rewards Over Time")
-        plt.show()
+        # matplotlib is only imported when plotting
+        from plot_metrics import plot_rewards
+
+        if metrics is not None:
+            columns = read_metrics(metrics.directory)
+        plot_rewards(columns)
 
     return (avg_p0, avg_p1)
 
 
+def evaluate_agents_sequential(
+    env,
+    agent0,
+    agent1,
+    target_width=0.1,
+    confidence=0.95,
+    min_episodes=200,
+    max_episodes=100000,
+    check_every=100,
+    backend="rlcard",
+    batch_size=1024,
+):
+    """
+    Plays agent0 vs. agent1 in chunks of `check_every` episodes until the answer is
+    clear, instead of a fixed number of episodes.
+
+    The per-episode payoff difference p0 - p1 is folded into a running mean / variance
+    after every chunk. Play stops once `min_episodes` are done and either
+      - the `confidence` interval of the mean difference is narrower than target_width, or
+      - the sequential test decides which agent is better: the interval widened so that
+        `confidence` holds over all the checks up to max_episodes (Bonferroni) excludes 0,
+    or when max_episodes is reached.
+
+    Arguments:
+        target_width (float): Full width of the interval to reach, in big blinds.
+        confidence (float): Confidence level of the interval and the test.
+        min_episodes (int): Never stop before this many episodes.
+        max_episodes (int): Hard cap on the episodes played.
+        check_every (int): Episodes between two checks.
+        backend, batch_size: Passed to play_episodes.
+
+    Returns:
+        tuple: (mean_diff, (low, high), num_episodes), mean of p0 - p1 per episode,
+        its `confidence` interval and how many episodes were played. When the test is
+        what stopped play, the interval is the widened one (it excludes 0).
+    """
+    alpha = 1 - confidence
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    num_checks = -(-max_episodes // check_every)
+    z_test = NormalDist().inv_cdf(1 - alpha / (2 * num_checks))
+
+    n, mean, m2 = 0, 0.0, 0.0
+    z_out = z
+    while n < max_episodes:
+        payoffs = np.array(
+            play_episodes(
+                env,
+                agent0,
+                agent1,
+                min(check_every, max_episodes - n),
+                False,
+                1,
+                backend=backend,
+                batch_size=batch_size,
+            )
+        )
+        diff = payoffs[:, 0] - payoffs[:, 1]
+        # merge the chunk's mean / sum of squares into the running ones (Chan et al.)
+        n_b, mean_b = len(diff), diff.mean()
+        delta = mean_b - mean
+        m2 += ((diff - mean_b) ** 2).sum() + delta**2 * n * n_b / (n + n_b)
+        mean += delta * n_b / (n + n_b)
+        n += n_b
+
+        if n < max(min_episodes, 2):
+            continue
+        stderr = (m2 / (n - 1) / n) ** 0.5
+        if 2 * z * stderr < target_width:
+            break
+        if abs(mean) > z_test * stderr:
+            # stopped on the data, only the widened interval keeps `confidence`
+            z_out = z_test
+            break
+
+    stderr = (m2 / (n - 1) / n) ** 0.5 if n > 1 else float("inf")
+    return (
+        float(mean),
+        (float(mean - z_out * stderr), float(mean + z_out * stderr)),
+        n,
+    )
+
+
+# set in each evaluate_agents_parallel worker by _init_eval_worker
+_eval_worker = {}
+
+
+def _init_eval_worker(env_name, agent0, agent1, backend, batch_size):
+    _eval_worker.update(
+        env_name=env_name,
+        env=rlcard.make(env_name) if backend == "rlcard" else None,
+        agents=(agent0, agent1),
+        backend=backend,
+        batch_size=batch_size,
+    )
+
+
+def _play_seeded(agent0, agent1, num_episodes, seed):
+    """play_episodes without updates, with every deal drawn from `seed` alone."""
+    w = _eval_worker
+    if w["backend"] == "numpy":
+        engine = BATCH_ENGINES[w["env_name"]](seed)
+        return play_episodes_batched(
+            engine, agent0, agent1, num_episodes, False, 1, batch_size=w["batch_size"]
+        )
+    # rlcard only draws from env.np_random when dealing, so reseeding replays the deals
+    w["env"].seed(seed)
+    return play_episodes(w["env"], agent0, agent1, num_episodes, False, 1)
+
+
+def _eval_chunk(task):
+    """
+    Play one chunk of evaluate_agents_parallel, returns agent0's / agent1's payoff of
+    every deal (averaged over both seatings in duplicate mode).
+    """
+    num_episodes, seed_seq, duplicate = task
+    agent_seed, deal_seed = seed_seq.generate_state(2)
+    random.seed(int(agent_seed))
+    np.random.seed(int(agent_seed))
+
+    agent0, agent1 = _eval_worker["agents"]
+    payoffs = np.array(_play_seeded(agent0, agent1, num_episodes, int(deal_seed)))
+    if duplicate:
+        # same cards and positions, agents trade seats
+        swapped = np.array(_play_seeded(agent1, agent0, num_episodes, int(deal_seed)))
+        payoffs = (payoffs + swapped[:, ::-1]) / 2
+    return payoffs
+
+
+def evaluate_agents_parallel(
+    env,
+    agent0,
+    agent1,
+    num_episodes=1000,
+    duplicate=True,
+    num_workers=None,
+    backend="rlcard",
+    batch_size=1024,
+    chunk_size=1000,
+    seed=0,
+):
+    """
+    evaluate_agents over a process pool, optionally as duplicate poker.
+
+    Episodes are split into chunks of `chunk_size`. Chunk i draws its deals and the
+    agents' exploration from its own child of np.random.SeedSequence(seed), so the
+    result only depends on `seed`, not on num_workers or scheduling.
+
+    With duplicate=True every deal is played twice with the same cards: once as
+    agent0 vs agent1 and once with the agents in each other's seat. Each deal then
+    scores agent0's mean payoff over the two seatings, which cancels most of the card
+    luck and the position bias, so far fewer deals are needed for the same confidence
+    than with separate evaluations of both orientations.
+
+    Arguments:
+        env: An RLCard environment, only its name is used by the workers.
+        num_episodes (int): Number of deals (each is played twice when duplicate).
+        duplicate (bool): Replay every deal with the seats swapped.
+        num_workers (int): Worker processes, defaults to the number of cores.
+        backend (str): "rlcard" or "numpy", as in play_episodes.
+        chunk_size (int): Episodes per task handed to a worker.
+        seed (int): Root seed of all deal / agent RNG streams.
+
+    Returns:
+        tuple: (avg_p0, avg_p1), average payoff per deal of agent0 and agent1.
+    """
+    num_workers = num_workers or mp.cpu_count()
+    sizes = [chunk_size] * (num_episodes // chunk_size)
+    if num_episodes % chunk_size:
+        sizes.append(num_episodes % chunk_size)
+    seed_seqs = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(n, ss, duplicate) for n, ss in zip(sizes, seed_seqs)]
+
+    with mp.Pool(
+        num_workers,
+        initializer=_init_eval_worker,
+        initargs=(env.name, agent0, agent1, backend, batch_size),
+    ) as pool:
+        payoffs = np.concatenate(pool.map(_eval_chunk, tasks))
+
+    avg_p0, avg_p1 = payoffs.mean(axis=0)
+    return (float(avg_p0), float(avg_p1))
+
+
 def flip(pid):
     if pid == 0:
         return 1
@@ -200,7 +821,7 @@ def human_play_bot(env, human_agent, bot_agent, human_first):
 
 
 def evaluate_agents_with_action_counts(
-    env, agent0, agent1, num_episodes=1000, plot=False
+    env, agent0, agent1, num_episodes=1000, plot=False, metrics=None
 ):
     """
     Plays `num_episodes` of agent0 vs. agent1, returning:
@@ -210,17 +831,21 @@ def evaluate_agents_with_action_counts(
             1: Counter({...})
         }
     If plot=True, shows a line chart of cumulative action counts over episodes.
+    With a MetricsSink opened with metrics.ACTION_COLUMNS as `metrics`, each episode's
+    payoffs and action counts are streamed to it, plot them later with
+    `python plot_metrics.py <dir> --kind actions`.
     """
 
     total_payoffs = [0.0, 0.0]
     # per‑agent total counts
     action_counts = {0: Counter(), 1: Counter()}
-    # for plotting: keep a running history of totals after each episode
-    history0 = []
-    history1 = []
+    # for plotting without a sink: actions of each episode, [episode, pid, action]
+    if plot and metrics is None:
+        history = np.zeros((num_episodes, 2, len(ACTIONS)), dtype=np.uint16)
 
-    for ep in range(1, num_episodes + 1):
+    for ep in range(num_episodes):
         env.reset()
+        episode_counts = np.zeros((2, len(ACTIONS)), dtype=np.uint16)
 
         # play one episode, counting actions as we go
         while not env.is_over():
@@ -232,47 +857,44 @@ def evaluate_agents_with_action_counts(
                 action = agent1.step(state)
             # record the action
             action_counts[pid][action] += 1
+            episode_counts[pid, ACTIONS.index(action)] += 1
             env.step(action, True)
 
         payoffs = env.get_payoffs()
         total_payoffs[0] += payoffs[0]
         total_payoffs[1] += payoffs[1]
 
-        if plot:
-            # snapshot cumulative counts so far
-            history0.append(dict(action_counts[0]))
-            history1.append(dict(action_counts[1]))
+        if metrics is not None:
+            metrics.log(
+                p0=payoffs[0],
+                p1=payoffs[1],
+                **{
+                    f"p{pid}_{a}": episode_counts[pid, i]
+                    for pid in (0, 1)
+                    for i, a in enumerate(ACTIONS)
+                },
+            )
+        elif plot:
+            history[ep] = episode_counts
 
     avg_p0 = total_payoffs[0] / num_episodes
     avg_p1 = total_payoffs[1] / num_episodes
 
     if plot:
-        # build a DataFrame‐like structure for plotting
-        # for simplicity, assume both agents have same action set
-        actions = set(action_counts[0].keys()) | set(action_counts[1].keys())
-        plt.figure(figsize=(12, 5))
-
-        # Agent 0
-        plt.subplot(1, 2, 1)
-        for act in actions:
-            vals = [h.get(act, 0) for h in history0]
-            plt.plot(vals, label=act)
-        plt.title("Agent 0 cumulative action counts")
-        plt.xlabel("Episode")
-        plt.ylabel("Count")
-        plt.legend()
-
-        # Agent 1
-        plt.subplot(1, 2, 2)
-        for act in actions:
-            vals = [h.get(act, 0) for h in history1]
-            plt.plot(vals, label=act)
-        plt.title("Agent 1 cumulative action counts")
-        plt.xlabel("Episode")
-        plt.ylabel("Count")
-        plt.legend()
-
-        plt.tight_layout()
-        plt.show()
+        # matplotlib is only imported when plotting
+        from plot_metrics import plot_action_counts
+
+        if metrics is not None:
+            metrics.flush()
+            columns = read_metrics(metrics.directory)
+        else:
+            columns = {
+                f"p{pid}_{a}": history[:, pid, i]
+                for pid in (0, 1)
+                for i, a in enumerate(ACTIONS)
+            }
+        plot_action_counts(columns)
+    elif metrics is not None:
+        metrics.flush()
 
     return (avg_p0, avg_p1), action_counts
@@ -0,0 +1,104 @@
+"""
+Suit isomorphism: map every info state to one representative of the states that only
+differ by a relabeling of the suits, before a state transformer turns it into a key.
+
+    Leduc  only ranks matter (there are no flushes), so the hand becomes the spade of its
+           rank and the public card the spade of its rank, or the heart when it pairs
+           the hand ('HK', 'SK' and 'SK', 'HK' are both 'SK', 'HK').
+    limit  suits are relabeled S, H, D, C in order of how they show up in the hole
+           cards, then the flop, turn and river (see canonical_limit_cards), and the
+           hole cards / flop are sorted, so a hand and its up to 24 suit permutations
+           (and its card orders) share one entry in Q/N.
+
+Any state transformer opts in by wrapping it, SuitCanonical(process_limit_state_v1)
+behaves like process_limit_state_v1 on the canonical state. utils.STATE_TRANSFORMERS
+registers the wrapped version of every transformer as canonical_<name>.
+"""
+
+LIMIT_RANKS = "A23456789TJQK"
+LIMIT_SUITS = "SHDC"
+# betting round each of the 2 hole + 5 board cards shows up in
+_ROUND_OF_CARD = (0, 0, 1, 1, 1, 2, 3)
+_RANK_INDEX = {r: i for i, r in enumerate(LIMIT_RANKS)}
+
+
+def _card_order(card):
+    return _RANK_INDEX[card[1]], card[0]
+
+
+def canonical_leduc_cards(hand, public_card):
+    """Representative (hand, public_card) of a Leduc deal, public_card may be None."""
+    rank = hand[1]
+    if public_card is None:
+        return "S" + rank, None
+    public_rank = public_card[1]
+    return "S" + rank, ("H" if public_rank == rank else "S") + public_rank
+
+
+def canonical_limit_cards(hand, public_cards):
+    """
+    Representative (hand, public_cards) of a limit hold'em deal.
+
+    Each suit's pattern is the sorted (round, rank) of its cards, rounds being the hole
+    cards, flop, turn and river. Suits are renamed S, H, D, C in pattern order (suits
+    not dealt last), so only suits with the same pattern, which are interchangeable,
+    can tie and the result does not depend on the original suits.
+
+    Returns:
+        tuple: (hand list, public_cards list), hand and flop sorted.
+    """
+    cards = [*hand, *public_cards]
+    patterns = {suit: [] for suit in LIMIT_SUITS}
+    for rnd, card in zip(_ROUND_OF_CARD, cards):
+        patterns[card[0]].append((rnd, _RANK_INDEX[card[1]]))
+    order = sorted(LIMIT_SUITS, key=lambda s: (not patterns[s], sorted(patterns[s])))
+    rename = dict(zip(order, LIMIT_SUITS))
+
+    renamed = [rename[c[0]] + c[1] for c in cards]
+    renamed[0:2] = sorted(renamed[0:2], key=_card_order)
+    renamed[2:5] = sorted(renamed[2:5], key=_card_order)
+    return renamed[: len(hand)], renamed[len(hand) :]
+
+
+def canonical_state(raw_imperfect_state):
+    """Copy of an rlcard (or batched engine) state with its cards made canonical."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    if "public_card" in raw_obs:
+        hand, public_card = canonical_leduc_cards(
+            raw_obs["hand"], raw_obs["public_card"]
+        )
+        cards = {"hand": hand, "public_card": public_card}
+    else:
+        hand, public_cards = canonical_limit_cards(
+            raw_obs["hand"], raw_obs.get("public_cards", [])
+        )
+        cards = {"hand": hand, "public_cards": public_cards}
+    return {**raw_imperfect_state, "raw_obs": {**raw_obs, **cards}}
+
+
+class SuitCanonical:
+    """
+    State transformer wrapper: transformer(canonical_state(state), pid).
+
+    Has a __name__ like the transformer functions, since agents, agent_format and the
+    STATE_TRANSFORMERS registry only call it and read that. Wrappers of the same
+    transformer compare equal, so an unpickled agent matches the registered one.
+    """
+
+    def __init__(self, transformer):
+        self.transformer = transformer
+        self.__name__ = "canonical_" + transformer.__name__
+
+    def __call__(self, raw_imperfect_state, pid):
+        return self.transformer(canonical_state(raw_imperfect_state), pid)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, SuitCanonical) and other.transformer is self.transformer
+        )
+
+    def __hash__(self):
+        return hash(self.__name__)
+
+    def __repr__(self):
+        return f"SuitCanonical({self.transformer.__name__})"
@@ -0,0 +1,277 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# card ids follow the rlcard dealer order, rank = id // 2, suit = id % 2
+CARD_STRS = ["SJ", "HJ", "SQ", "HQ", "SK", "HK"]
+ACTIONS = ["call", "raise", "fold", "check"]
+CALL, RAISE, FOLD, CHECK = range(4)
+
+SMALL_BLIND = 1
+BIG_BLIND = 2
+
+
+class LeducBatchEngine:
+    """
+    Vectorized two-player Leduc Hold'em that plays many games at once in NumPy arrays.
+
+    Mirrors the rules of rlcard's `leduc-holdem` (random small blind acts first, raise
+    size 2 then 4, at most 2 raises per round, pair with the public card beats high card)
+    so that the states handed to agents have the same `raw_obs` contents the
+    `process_leduc_state_v*` transformers expect.
+
+    The betting rules are driven by the class attributes below, so other two-player
+    limit games (see limit_engine.LimitBatchEngine) only override dealing, states and
+    showdown.
+
+    Attributes:
+        name (str): rlcard env name this engine stands in for.
+        num_actions (int): Size of the action space, same as the rlcard env.
+        num_rounds (int): Betting rounds per game.
+        raise_amounts (tuple): Raise size of each betting round.
+        allowed_raise_num (int): Max raises per betting round.
+        max_actions (int): Longest possible action record.
+    """
+
+    name = "leduc-holdem"
+    num_actions = len(ACTIONS)
+    num_rounds = 2
+    raise_amounts = (2, 4)
+    allowed_raise_num = 2
+    # at most 4 actions per round (check, raise, raise, call)
+    max_actions = 8
+
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed (int): Optional seed for the dealing / blind RNG.
+        """
+        self.np_random = np.random.default_rng(seed)
+        self.reset(0)
+
+    def reset(self, num_games, deck=None, small_blind=None):
+        """
+        Deal `num_games` fresh games, replacing whatever batch was in progress.
+
+        Args:
+            num_games (int): Games in the new batch.
+            deck (np.ndarray): Optional int array [num_games, k], the cards of each game
+                in dealing order (hands first), instead of a random shuffle.
+            small_blind (np.ndarray): Optional int array [num_games], the seat posting
+                the small blind (and acting first), instead of a random one.
+        """
+        n = num_games
+        self.num_games = n
+        self._deal(n, deck)
+
+        if small_blind is None:
+            small_blind = self.np_random.integers(0, 2, size=n)
+        small = np.asarray(small_blind, dtype=np.int64)
+        self.in_chips = np.zeros((n, 2), dtype=np.int64)
+        self.in_chips[np.arange(n), small] = SMALL_BLIND
+        self.in_chips[np.arange(n), 1 - small] = BIG_BLIND
+        # chips put in during the current betting round
+        self.raised = self.in_chips.copy()
+        self.game_pointer = small.copy()
+
+        self.round_counter = np.zeros(n, dtype=np.int64)
+        self.have_raised = np.zeros(n, dtype=np.int64)
+        self.not_raise_num = np.zeros(n, dtype=np.int64)
+        # raises made in each betting round so far
+        self.raise_nums = np.zeros((n, self.num_rounds), dtype=np.int64)
+        self.folded = np.zeros((n, 2), dtype=bool)
+
+        self.record_player = np.zeros((n, self.max_actions), dtype=np.int8)
+        self.record_action = np.zeros((n, self.max_actions), dtype=np.int8)
+        self.record_len = np.zeros(n, dtype=np.int64)
+
+    def _deal(self, n, deck=None):
+        """Shuffle one deck per game (unless given), hands are the first two cards."""
+        if deck is None:
+            deck = np.argsort(self.np_random.random((n, len(CARD_STRS))), axis=1)
+        self.deck = np.asarray(deck)
+        self.hands = self.deck[:, :2].copy()
+        self.public_card = self.deck[:, 2].copy()
+
+    def select(self, games):
+        """
+        Keep only the games `games`, in that order. Repeating an index copies that game,
+        which lets a batch branch into one game per action (see exact_eval).
+        """
+        games = np.asarray(games, dtype=np.int64)
+        for key, value in vars(self).items():
+            # every per-game array has the games on its first axis
+            if isinstance(value, np.ndarray) and len(value) == self.num_games:
+                setattr(self, key, value[games])
+        self.num_games = len(games)
+
+    def is_over(self):
+        """Boolean array, True for every finished game in the batch."""
+        return self.folded.any(axis=1) | (self.round_counter >= self.num_rounds)
+
+    def active_games(self):
+        """Indices of the games that still need a decision."""
+        return np.flatnonzero(~self.is_over())
+
+    def legal_mask(self, games):
+        """
+        Legal actions of the current player of each game in `games`.
+
+        Returns:
+            np.ndarray: bool array of shape [len(games), 4], columns ordered as ACTIONS.
+        """
+        ptr = self.game_pointer[games]
+        raised = self.raised[games]
+        mine = raised[np.arange(len(games)), ptr]
+        behind = mine < raised.max(axis=1)
+
+        mask = np.ones((len(games), len(ACTIONS)), dtype=bool)
+        mask[:, RAISE] = self.have_raised[games] < self.allowed_raise_num
+        mask[:, CHECK] = ~behind
+        mask[:, CALL] = behind
+        return mask
+
+    def get_states(self, games):
+        """
+        Build the rlcard-style state dict of the current player for each game in `games`.
+
+        Returns:
+            list[dict]: one state per game, with `raw_obs`, `obs`, `legal_actions`,
+            `raw_legal_actions` and `action_record` laid out like rlcard's.
+        """
+        games = np.asarray(games)
+        ptr = self.game_pointer[games]
+        rows = np.arange(len(games))
+        hand = self.hands[games, ptr]
+        revealed = self.round_counter[games] >= 1
+        public = self.public_card[games]
+        chips = self.in_chips[games]
+        my_chips = chips[rows, ptr]
+        mask = self.legal_mask(games)
+
+        # same 36-dim encoding as rlcard's LeducholdemEnv._extract_state
+        obs = np.zeros((len(games), 36))
+        obs[rows, hand // 2] = 1
+        obs[rows[revealed], public[revealed] // 2 + 3] = 1
+        obs[rows, my_chips + 6] = 1
+        obs[rows, chips.sum(axis=1) - my_chips + 21] = 1
+
+        raw_obs = []
+        for i in range(len(games)):
+            all_chips = chips[i].tolist()
+            raw_obs.append(
+                {
+                    "hand": CARD_STRS[hand[i]],
+                    "public_card": CARD_STRS[public[i]] if revealed[i] else None,
+                    "all_chips": all_chips,
+                    "my_chips": all_chips[ptr[i]],
+                    "legal_actions": [ACTIONS[a] for a in np.flatnonzero(mask[i])],
+                    "current_player": int(ptr[i]),
+                }
+            )
+        return self._wrap_states(games, raw_obs, obs)
+
+    def _wrap_states(self, games, raw_obs, obs):
+        """Add the rlcard env level fields around each game's raw_obs."""
+        states = []
+        for i, g in enumerate(games):
+            legal = raw_obs[i]["legal_actions"]
+            n_rec = self.record_len[g]
+            action_record = [
+                (int(p), ACTIONS[a])
+                for p, a in zip(
+                    self.record_player[g, :n_rec], self.record_action[g, :n_rec]
+                )
+            ]
+            states.append(
+                {
+                    "legal_actions": OrderedDict(
+                        (ACTIONS.index(a), None) for a in legal
+                    ),
+                    "obs": obs[i],
+                    "raw_obs": raw_obs[i],
+                    "raw_legal_actions": list(legal),
+                    "action_record": action_record,
+                }
+            )
+        return states
+
+    def step(self, games, actions):
+        """
+        Apply one action to each game in `games` (all must be active).
+
+        Args:
+            games (array-like): game indices.
+            actions (array-like): action labels ('call', ...) or action ids, one per game.
+                Illegal choices fall back to check/fold like rlcard's _decode_action.
+        """
+        games = np.asarray(games)
+        acts = np.array(
+            [ACTIONS.index(a) if isinstance(a, str) else int(a) for a in actions],
+            dtype=np.int64,
+        )
+        rows = np.arange(len(games))
+        mask = self.legal_mask(games)
+        illegal = ~mask[rows, acts]
+        acts[illegal] = np.where(mask[illegal, CHECK], CHECK, FOLD)
+
+        ptr = self.game_pointer[games]
+        raised = self.raised[games]
+        top = raised.max(axis=1)
+
+        n_rec = self.record_len[games]
+        self.record_player[games, n_rec] = ptr
+        self.record_action[games, n_rec] = acts
+        self.record_len[games] += 1
+
+        # call: match the highest bet of the round
+        # raise: match it and add the current raise amount
+        raise_amount = np.asarray(self.raise_amounts)[self.round_counter[games]]
+        target = np.where(acts == RAISE, top + raise_amount, top)
+        pays = (acts == CALL) | (acts == RAISE)
+        self.in_chips[games[pays], ptr[pays]] += (target - raised[rows, ptr])[pays]
+        self.raised[games[pays], ptr[pays]] = target[pays]
+
+        is_raise = acts == RAISE
+        self.have_raised[games[is_raise]] += 1
+        self.not_raise_num[games[is_raise]] = 1
+        passive = (acts == CALL) | (acts == CHECK)
+        self.not_raise_num[games[passive]] += 1
+        self.folded[games[acts == FOLD], ptr[acts == FOLD]] = True
+        self.raise_nums[games, self.round_counter[games]] = self.have_raised[games]
+
+        self.game_pointer[games] = 1 - ptr
+
+        # betting round over: the next street starts with fresh round bets,
+        # public cards show up through round_counter
+        done = games[(self.not_raise_num[games] >= 2) & ~(acts == FOLD)]
+        self.round_counter[done] += 1
+        self.have_raised[done] = 0
+        self.not_raise_num[done] = 0
+        self.raised[done] = 0
+
+    def get_payoffs(self):
+        """
+        Payoffs of every game in the batch, in big blinds like rlcard.
+
+        Returns:
+            np.ndarray: float array of shape [num_games, 2].
+        """
+        ranks = self.hands // 2
+        public_rank = self.public_card // 2
+
+        # 1 for the winner(s), folding beats everything, then pairing the board,
+        # then the higher rank, with ties split
+        paired = ranks == public_rank[:, None]
+        winners = np.where(
+            paired.any(axis=1)[:, None],
+            paired,
+            ranks == ranks.max(axis=1, keepdims=True),
+        )
+        folded_any = self.folded.any(axis=1)
+        winners[folded_any] = ~self.folded[folded_any]
+
+        total = self.in_chips.sum(axis=1)
+        each_win = total / winners.sum(axis=1)
+        payoffs = np.where(winners, each_win[:, None], 0.0) - self.in_chips
+        return payoffs / BIG_BLIND
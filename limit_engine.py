@@ -0,0 +1,174 @@
+from itertools import combinations
+
+import numpy as np
+
+from leduc_engine import ACTIONS, BIG_BLIND, LeducBatchEngine
+
+# card ids follow rlcard's limitholdem card2index: suit * 13 + rank, suits S H D C,
+# ranks A 2 .. K, so a card id is also its slot in the 72-dim obs vector
+SUITS = "SHDC"
+RANKS = "A23456789TJQK"
+CARD_STRS = [s + r for s in SUITS for r in RANKS]
+NUM_CARDS = len(CARD_STRS)
+
+# visible board cards at each value of round_counter (preflop, flop, turn, river, over)
+BOARD_SIZES = np.array([0, 3, 4, 5, 5])
+
+# hand categories, higher beats lower
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = (
+    range(9)
+)
+
+_FIVE_OF_SEVEN = np.array(list(combinations(range(7), 5)))
+_KICKER_WEIGHTS = 13 ** np.arange(4, -1, -1)
+
+
+def _rank_five(cards):
+    """
+    Score 5-card hands, larger is better and equal means a split pot.
+
+    Args:
+        cards (np.ndarray): int array [n, 5] of card ids.
+
+    Returns:
+        np.ndarray: int64 array [n] of category * 13^5 + kickers.
+    """
+    # 2 -> 0, ..., K -> 11, A -> 12
+    ranks = (cards % 13 - 1) % 13
+    suits = cards // 13
+    ranks = -np.sort(-ranks, axis=1)
+
+    # order ranks by (multiplicity, rank), so e.g. a full house reads trips then pair
+    counts = (ranks[:, :, None] == ranks[:, None, :]).sum(axis=2)
+    order = np.argsort(-(counts * 16 + ranks), axis=1, kind="stable")
+    ordered = np.take_along_axis(ranks, order, axis=1)
+    counts = np.take_along_axis(counts, order, axis=1)
+
+    flush = (suits == suits[:, :1]).all(axis=1)
+    distinct = counts[:, 0] == 1
+    wheel = distinct & (ranks[:, 0] == 12) & (ranks[:, 1] == 3)
+    straight = (distinct & (ranks[:, 0] - ranks[:, 4] == 4)) | wheel
+    # A-2-3-4-5 plays as a five high straight
+    ordered[wheel] = [3, 2, 1, 0, 0]
+
+    category = np.select(
+        [
+            straight & flush,
+            counts[:, 0] == 4,
+            (counts[:, 0] == 3) & (counts[:, 3] == 2),
+            flush,
+            straight,
+            counts[:, 0] == 3,
+            (counts[:, 0] == 2) & (counts[:, 2] == 2),
+            counts[:, 0] == 2,
+        ],
+        [STRAIGHT_FLUSH, QUADS, FULL_HOUSE, FLUSH, STRAIGHT, TRIPS, TWO_PAIR, PAIR],
+        HIGH_CARD,
+    )
+    return category * 13**5 + ordered @ _KICKER_WEIGHTS
+
+
+def rank_hands(cards):
+    """
+    Vectorized showdown ranking of 7-card hands (best 5 of the 7).
+
+    Args:
+        cards (np.ndarray): int array [n, 7] of card ids.
+
+    Returns:
+        np.ndarray: int64 array [n], comparable across hands, larger is better.
+    """
+    cards = np.asarray(cards)
+    n = len(cards)
+    fives = cards[:, _FIVE_OF_SEVEN].reshape(-1, 5)
+    return _rank_five(fives).reshape(n, len(_FIVE_OF_SEVEN)).max(axis=1)
+
+
+class LimitBatchEngine(LeducBatchEngine):
+    """
+    Vectorized two-player limit Texas Hold'em that plays many games at once in NumPy arrays.
+
+    Mirrors rlcard's `limit-holdem` (blinds 1/2, raise size 2 preflop and flop then 4,
+    at most 4 raises per round) and hands agents states with the same `raw_obs` fields
+    (`hand`, `public_cards`, `all_chips`, `my_chips`, `legal_actions`, `raise_nums`)
+    that `process_limit_state_v1/v2` read. Like rlcard, `raw_obs` has no `current_player`.
+    """
+
+    name = "limit-holdem"
+    num_rounds = 4
+    raise_amounts = (2, 2, 4, 4)
+    allowed_raise_num = 4
+    # at most 6 actions per round (check, 4 raises, call)
+    max_actions = 24
+
+    def _deal(self, n, deck=None):
+        """Shuffle one deck per game (unless given), two hole cards each and a five card board."""
+        if deck is None:
+            deck = np.argsort(self.np_random.random((n, NUM_CARDS)), axis=1)
+        self.deck = np.asarray(deck)
+        self.hands = self.deck[:, :4].reshape(n, 2, 2)
+        self.board = self.deck[:, 4:9]
+
+    def get_states(self, games):
+        """
+        Build the rlcard-style state dict of the current player for each game in `games`.
+
+        Returns:
+            list[dict]: one state per game, with `raw_obs`, `obs`, `legal_actions`,
+            `raw_legal_actions` and `action_record` laid out like rlcard's.
+        """
+        games = np.asarray(games)
+        ptr = self.game_pointer[games]
+        rows = np.arange(len(games))
+        hand = self.hands[games, ptr]
+        board_size = BOARD_SIZES[self.round_counter[games]]
+        board = self.board[games]
+        chips = self.in_chips[games]
+        raise_nums = self.raise_nums[games]
+        mask = self.legal_mask(games)
+
+        # same 72-dim encoding as rlcard's LimitholdemEnv._extract_state
+        obs = np.zeros((len(games), 72))
+        obs[rows[:, None], hand] = 1
+        shown = np.arange(5) < board_size[:, None]
+        obs[np.nonzero(shown)[0], board[shown]] = 1
+        obs[rows[:, None], 52 + np.arange(self.num_rounds) * 5 + raise_nums] = 1
+
+        raw_obs = []
+        for i in range(len(games)):
+            all_chips = chips[i].tolist()
+            raw_obs.append(
+                {
+                    "hand": [CARD_STRS[c] for c in hand[i]],
+                    "public_cards": [CARD_STRS[c] for c in board[i, : board_size[i]]],
+                    "all_chips": all_chips,
+                    "my_chips": all_chips[ptr[i]],
+                    "legal_actions": [ACTIONS[a] for a in np.flatnonzero(mask[i])],
+                    "raise_nums": raise_nums[i].tolist(),
+                }
+            )
+        return self._wrap_states(games, raw_obs, obs)
+
+    def get_payoffs(self):
+        """
+        Payoffs of every game in the batch, in big blinds like rlcard.
+
+        Returns:
+            np.ndarray: float array of shape [num_games, 2].
+        """
+        n = self.num_games
+        scores = np.empty((n, 2), dtype=np.int64)
+        for pid in (0, 1):
+            scores[:, pid] = rank_hands(
+                np.concatenate([self.hands[:, pid], self.board], axis=1)
+            )
+
+        # folding beats everything, otherwise best hand wins with ties split
+        winners = scores == scores.max(axis=1, keepdims=True)
+        folded_any = self.folded.any(axis=1)
+        winners[folded_any] = ~self.folded[folded_any]
+
+        total = self.in_chips.sum(axis=1)
+        each_win = total / winners.sum(axis=1)
+        payoffs = np.where(winners, each_win[:, None], 0.0) - self.in_chips
+        return payoffs / BIG_BLIND
@@ -1,224 +1,176 @@
 # How does every visit mc compare against first visit mc?
+# runs as a sweep (see sweep.py): re-running skips finished configs and resumes
+# interrupted ones from their training checkpoints
 import os
-import numpy as np
+import shutil
 import rlcard
 from agents import FirstVisitMCAgent, RandomAgent, HumanAgent, EveryVisitMCAgent
-from experiments import play_episodes, evaluate_agents
-from utils import (
-    process_leduc_state_v1,
-    process_leduc_state_v2,
-    process_leduc_state_v3,
-    process_leduc_state_v4,
-)
-
-import matplotlib.pyplot as plt
+from checkpoint import Checkpointer, has_checkpoint
+from experiments import play_episodes, evaluate_agents, resume_training
+from metrics import MetricsSink, read_metrics
+from sweep import cell_seed, run_sweep
+from utils import STATE_TRANSFORMERS
 
 # config
 NUM_EPISODES = 100000
 UPDATE_FREQ = 100
-state_processors = [
-    process_leduc_state_v1,
-    process_leduc_state_v2,
-    process_leduc_state_v3,
-    process_leduc_state_v4,
-]
-epsilons = [0.01, 0.1]
-gammas = [1, 0.99, 0.9, 0.5]
-
-env = rlcard.make("leduc-holdem")
-random_agent = RandomAgent()
-
-# --------------------
-# 1) Original "orientation": agent_e (EveryVisit) is Player 0, agent_f (FirstVisit) is Player 1
-# --------------------
-for sp in state_processors:
-    for e in epsilons:
-        for g in gammas:
-            print(
-                f"\n=== (Orientation 1) EveryVisit vs. FirstVisit "
-                f"w/ e={e}, gamma={g}, sp={sp.__name__} ==="
-            )
-
-            agent_e = EveryVisitMCAgent(epsilon=e, gamma=g, state_transformer=sp)
-            agent_f = FirstVisitMCAgent(epsilon=e, gamma=g, state_transformer=sp)
-
-            # Train them against each other
-            play_episodes(
-                env,
-                agent_e,  # Player 0
-                agent_f,  # Player 1
-                num_episodes=NUM_EPISODES,
-                do_update=True,
-                update_freq=UPDATE_FREQ,
-                state_transformer=sp,
-            )
-
-            # Evaluate agent_e (as Player 0) vs Random
-            e_vs_rand_payoffs = play_episodes(
-                env, agent_e, random_agent, 10000, do_update=False
-            )
-            e_rewards = [p[0] for p in e_vs_rand_payoffs]
-            e_cumulative = np.cumsum(e_rewards)
-
-            # Evaluate agent_f (as Player 1) vs Random
-            f_vs_rand_payoffs = play_episodes(
-                env, random_agent, agent_f, 10000, do_update=False
-            )
-            f_rewards = [p[1] for p in f_vs_rand_payoffs]
-            f_cumulative = np.cumsum(f_rewards)
-
-            # Plot both lines in a single figure
-            plt.figure()
-            plt.plot(e_cumulative, label="EveryVisit MC vs Random (Player 0)")
-            plt.plot(f_cumulative, label="FirstVisit MC vs Random (Player 1)")
-            plt.xlabel("Episode")
-            plt.ylabel("Cumulative Reward")
-            plt.title(f"[Orientation 1] {sp.__name__}, e={e}, gamma={g}")
-            plt.legend()
-
-            # Save plot to file
-            filename = f"graphs/EvF_{sp.__name__}_e{e}_g{g}.png"
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            plt.savefig(filename)
-            plt.close()
-            print(f"Saved combined plot to {filename}")
-
-            # Evaluate agent_e vs agent_f directly
-            p0_avg, p1_avg = evaluate_agents(
-                env, agent_e, agent_f, num_episodes=1000, plot=False
-            )
-            print("Over 1000 episodes of EveryVisit vs. FirstVisit (Orientation 1):")
-            print(f"  EveryVisit (Player 0) average payoff = {p0_avg}")
-            print(f"  FirstVisit (Player 1) average payoff = {p1_avg}")
-            if p0_avg > p1_avg:
-                print("  => EveryVisitMCAgent performs better.")
-            elif p1_avg > p0_avg:
-                print("  => FirstVisitMCAgent performs better.")
-            else:
-                print("  => They perform equally.")
-
-            # --- Evaluate head-to-head (duel) and plot cumulative sums ---
-            duel_payoffs = play_episodes(
-                env,
-                agent_e,  # Player 0
-                agent_f,  # Player 1
-                num_episodes=10000,
-                do_update=False,
-                state_transformer=sp,
-            )
-
-            # Extract payoffs
-            e_duel_rewards = [p[0] for p in duel_payoffs]
-            f_duel_rewards = [p[1] for p in duel_payoffs]
-            e_duel_cum = np.cumsum(e_duel_rewards)
-            f_duel_cum = np.cumsum(f_duel_rewards)
-
-            # Plot the cumulative sums
-            plt.figure()
-            plt.plot(e_duel_cum, label="EveryVisit (P0) - Duel")
-            plt.plot(f_duel_cum, label="FirstVisit (P1) - Duel")
-            plt.xlabel("Episode")
-            plt.ylabel("Cumulative Reward")
-            plt.title(f"[Orientation 1 Duel] {sp.__name__}, e={e}, gamma={g}")
-            plt.legend()
-
-            duel_filename = f"graphs/FvE_{sp.__name__}_e{e}_g{g}_duel.png"
-            plt.savefig(duel_filename)
-            plt.close()
-            print(f"Saved duel plot to {duel_filename}")
-
-# --------------------
-# 2) "Flipped orientation": agent_f (FirstVisit) is Player 0, agent_e (EveryVisit) is Player 1
-# --------------------
-for sp in state_processors:
-    for e in epsilons:
-        for g in gammas:
-            print(
-                f"\n=== (Orientation 2) FirstVisit vs. EveryVisit "
-                f"w/ e={e}, gamma={g}, sp={sp.__name__} ==="
-            )
-
-            # Create fresh agents
-            agent_e = EveryVisitMCAgent(epsilon=e, gamma=g, state_transformer=sp)
-            agent_f = FirstVisitMCAgent(epsilon=e, gamma=g, state_transformer=sp)
-
-            # Train them with reversed orientation
-            play_episodes(
-                env,
-                agent_f,  # Player 0
-                agent_e,  # Player 1
-                num_episodes=NUM_EPISODES,
-                do_update=True,
-                update_freq=UPDATE_FREQ,
-                state_transformer=sp,
-            )
-
-            # Evaluate agent_f (Player 0) vs Random
-            f_vs_rand_payoffs = play_episodes(
-                env, agent_f, random_agent, 10000, do_update=False
-            )
-            f_rewards = [p[0] for p in f_vs_rand_payoffs]
-            f_cumulative = np.cumsum(f_rewards)
-
-            # Evaluate agent_e (Player 1) vs Random
-            e_vs_rand_payoffs = play_episodes(
-                env, random_agent, agent_e, 10000, do_update=False
-            )
-            e_rewards = [p[1] for p in e_vs_rand_payoffs]
-            e_cumulative = np.cumsum(e_rewards)
-
-            # Plot both lines in a single figure
-            plt.figure()
-            plt.plot(f_cumulative, label="FirstVisit MC vs Random (Player 0)")
-            plt.plot(e_cumulative, label="EveryVisit MC vs Random (Player 1)")
-            plt.xlabel("Episode")
-            plt.ylabel("Cumulative Reward")
-            plt.title(f"[Orientation 2] {sp.__name__}, e={e}, gamma={g}")
-            plt.legend()
-
-            filename = f"graphs/FvE_{sp.__name__}_e{e}_g{g}.png"
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
-            plt.savefig(filename)
-            plt.close()
-            print(f"Saved combined plot to {filename}")
-
-            # Evaluate agent_f vs agent_e directly
-            p0_avg, p1_avg = evaluate_agents(
-                env, agent_f, agent_e, num_episodes=1000, plot=False
-            )
-            print("Over 1000 episodes of FirstVisit vs. EveryVisit (Orientation 2):")
-            print(f"  FirstVisit (Player 0) average payoff = {p0_avg}")
-            print(f"  EveryVisit (Player 1) average payoff = {p1_avg}")
-            if p0_avg > p1_avg:
-                print("  => FirstVisitMCAgent performs better.")
-            elif p1_avg > p0_avg:
-                print("  => EveryVisitMCAgent performs better.")
-            else:
-                print("  => They perform equally.")
-
-            # --- Evaluate head-to-head (duel) and plot cumulative sums ---
-            duel_payoffs = play_episodes(
-                env,
-                agent_f,  # Player 0
-                agent_e,  # Player 1
-                num_episodes=10000,
-                do_update=False,
-                state_transformer=sp,
-            )
-            f_duel_rewards = [p[0] for p in duel_payoffs]
-            e_duel_rewards = [p[1] for p in duel_payoffs]
-            f_duel_cum = np.cumsum(f_duel_rewards)
-            e_duel_cum = np.cumsum(e_duel_rewards)
-
-            plt.figure()
-            plt.plot(f_duel_cum, label="FirstVisit (P0) - Duel")
-            plt.plot(e_duel_cum, label="EveryVisit (P1) - Duel")
-            plt.xlabel("Episode")
-            plt.ylabel("Cumulative Reward")
-            plt.title(f"[Orientation 2 Duel] {sp.__name__}, e={e}, gamma={g}")
-            plt.legend()
-
-            duel_filename = f"graphs/FvE_{sp.__name__}_e{e}_g{g}_duel.png"
-            plt.savefig(duel_filename)
-            plt.close()
-            print(f"Saved duel plot to {duel_filename}")
+SWEEP_DIR = "sweeps/mc_type"
+GRID = {
+    # 1) Original "orientation": agent_e (EveryVisit) is Player 0, agent_f (FirstVisit) is Player 1
+    # 2) "Flipped orientation": agent_f (FirstVisit) is Player 0, agent_e (EveryVisit) is Player 1
+    "orientation": [1, 2],
+    "state_processor": [
+        "process_leduc_state_v1",
+        "process_leduc_state_v2",
+        "process_leduc_state_v3",
+        "process_leduc_state_v4",
+    ],
+    "epsilon": [0.01, 0.1],
+    "gamma": [1, 0.99, 0.9, 0.5],
+}
+
+
+def run_cell(config, workdir):
+    """Train EveryVisit vs. FirstVisit for one config, evaluate and plot them."""
+    sp = STATE_TRANSFORMERS[config["state_processor"]]
+    e, g, orientation = config["epsilon"], config["gamma"], config["orientation"]
+    env = rlcard.make("leduc-holdem", config={"seed": cell_seed(config)})
+    random_agent = RandomAgent()
+
+    if orientation == 1:
+        names = ("EveryVisit", "FirstVisit")
+    else:
+        names = ("FirstVisit", "EveryVisit")
+    print(
+        f"\n=== (Orientation {orientation}) {names[0]} vs. {names[1]} "
+        f"w/ e={e}, gamma={g}, sp={sp.__name__} ==="
+    )
+
+    # Train them against each other, resuming if this cell was interrupted
+    ckpt_dir = os.path.join(workdir, "checkpoint")
+    if has_checkpoint(ckpt_dir):
+        agent_p0, agent_p1, _ = resume_training(
+            env,
+            ckpt_dir,
+            NUM_EPISODES,
+            do_update=True,
+            update_freq=UPDATE_FREQ,
+            state_transformer=sp,
+        )
+    else:
+        agent_e = EveryVisitMCAgent(epsilon=e, gamma=g, state_transformer=sp)
+        agent_f = FirstVisitMCAgent(epsilon=e, gamma=g, state_transformer=sp)
+        agent_p0, agent_p1 = (agent_e, agent_f) if orientation == 1 else (agent_f, agent_e)
+        play_episodes(
+            env,
+            agent_p0,
+            agent_p1,
+            num_episodes=NUM_EPISODES,
+            do_update=True,
+            update_freq=UPDATE_FREQ,
+            state_transformer=sp,
+            checkpoint=Checkpointer(ckpt_dir, every_seconds=300),
+        )
+
+    # Evaluate both agents vs Random and against each other, payoffs go to metrics
+    # files in the workdir and the graphs are drawn after the sweep (see plot_cell)
+    metrics_dirs = {
+        key: os.path.join(workdir, "metrics", key)
+        for key in ("p0_vs_random", "p1_vs_random", "duel")
+    }
+    for key, (a0, a1) in (
+        ("p0_vs_random", (agent_p0, random_agent)),  # Player 0's agent vs Random
+        ("p1_vs_random", (random_agent, agent_p1)),  # Player 1's agent vs Random
+    ):
+        shutil.rmtree(metrics_dirs[key], ignore_errors=True)
+        play_episodes(
+            env, a0, a1, 10000, do_update=False, metrics=MetricsSink(metrics_dirs[key])
+        )
+
+    # Evaluate the agents against each other directly
+    p0_avg, p1_avg = evaluate_agents(
+        env, agent_p0, agent_p1, num_episodes=1000, plot=False
+    )
+    print(f"Over 1000 episodes of {names[0]} vs. {names[1]} (Orientation {orientation}):")
+    print(f"  {names[0]} (Player 0) average payoff = {p0_avg}")
+    print(f"  {names[1]} (Player 1) average payoff = {p1_avg}")
+    if p0_avg > p1_avg:
+        print(f"  => {names[0]}MCAgent performs better.")
+    elif p1_avg > p0_avg:
+        print(f"  => {names[1]}MCAgent performs better.")
+    else:
+        print("  => They perform equally.")
+
+    # --- Evaluate head-to-head (duel) ---
+    shutil.rmtree(metrics_dirs["duel"], ignore_errors=True)
+    duel = MetricsSink(metrics_dirs["duel"])
+    play_episodes(
+        env,
+        agent_p0,  # Player 0
+        agent_p1,  # Player 1
+        num_episodes=10000,
+        do_update=False,
+        state_transformer=sp,
+        metrics=duel,
+    )
+
+    agent_paths = [os.path.join(workdir, f"{name}.pkl") for name in names]
+    agent_p0.save(agent_paths[0])
+    agent_p1.save(agent_paths[1])
+
+    return {
+        "players": list(names),
+        "p0_vs_p1": float(p0_avg),
+        "p1_vs_p0": float(p1_avg),
+        "duel_p0": duel.totals["p0"] / duel.rows,
+        "metrics": metrics_dirs,
+        "artifacts": list(metrics_dirs.values()) + agent_paths,
+    }
+
+
+def plot_cell(record):
+    """Draw the vs. Random and duel graphs of a finished cell from its metrics files."""
+    # plotting happens after the sweep, the sweep workers never import matplotlib
+    from plot_metrics import plot_cumulative
+
+    config, result = record["config"], record["result"]
+    sp_name, e, g = config["state_processor"], config["epsilon"], config["gamma"]
+    orientation = config["orientation"]
+    names = result["players"]
+    tag = "EvF" if orientation == 1 else "FvE"
+    dirs = result["metrics"]
+
+    # Plot both lines in a single figure
+    filename = f"graphs/{tag}_{sp_name}_e{e}_g{g}.png"
+    plot_cumulative(
+        {
+            "p0": read_metrics(dirs["p0_vs_random"])["p0"],
+            "p1": read_metrics(dirs["p1_vs_random"])["p1"],
+        },
+        labels=(
+            f"{names[0]} MC vs Random (Player 0)",
+            f"{names[1]} MC vs Random (Player 1)",
+        ),
+        title=f"[Orientation {orientation}] {sp_name}, e={e}, gamma={g}",
+        out=filename,
+    )
+    print(f"Saved combined plot to {filename}")
+
+    # (orientation 1 used to write FvE_..._duel too, overwritten by orientation 2)
+    duel_filename = f"graphs/{tag}_{sp_name}_e{e}_g{g}_duel.png"
+    plot_cumulative(
+        read_metrics(dirs["duel"]),
+        labels=(f"{names[0]} (P0) - Duel", f"{names[1]} (P1) - Duel"),
+        title=f"[Orientation {orientation} Duel] {sp_name}, e={e}, gamma={g}",
+        out=duel_filename,
+    )
+    print(f"Saved duel plot to {duel_filename}")
+
+
+if __name__ == "__main__":
+    records = run_sweep(run_cell, GRID, SWEEP_DIR)
+    for record in records:
+        result = record.get("result", {})
+        print(record["config"], record["status"], result.get("p0_vs_p1"))
+        if record["status"] == "done":
+            plot_cell(record)
@@ -0,0 +1,135 @@
+"""
+Append-only columnar metrics files, so training / evaluation loops don't keep per-episode
+histories in memory or draw plots themselves.
+
+A metrics directory holds one raw little endian binary file per column plus meta.json
+with the column dtypes:
+
+    runs/eval1/meta.json   {"columns": {"p0": "<f4", "p1": "<f4", ...}}
+    runs/eval1/p0.bin
+    runs/eval1/p1.bin
+
+MetricsSink buffers rows in fixed size numpy chunks and appends each full chunk to the
+column files, read_metrics loads the columns back and plot_metrics.py draws the graphs.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from leduc_engine import ACTIONS
+
+# columns written by play_episodes / evaluate_agents
+PAYOFF_COLUMNS = {"p0": "<f4", "p1": "<f4"}
+# columns written by evaluate_agents_with_action_counts, actions taken per episode
+ACTION_COLUMNS = {
+    **PAYOFF_COLUMNS,
+    **{f"p{pid}_{a}": "<u2" for pid in (0, 1) for a in ACTIONS},
+}
+
+
+class MetricsSink:
+    """
+    Buffered writer of a metrics directory, see the module docstring.
+
+    Opening an existing directory with the same columns appends to it.
+
+    Attributes:
+        totals (dict): column name -> sum of everything logged through this sink.
+        rows (int): Rows logged through this sink.
+    """
+
+    def __init__(self, directory, columns=PAYOFF_COLUMNS, chunk_size=4096):
+        """
+        Args:
+            directory (str): Metrics directory, created if missing.
+            columns (dict): column name -> numpy dtype string.
+            chunk_size (int): Rows buffered before they are appended to disk.
+        """
+        self.directory = directory
+        self.columns = {name: np.dtype(dtype).str for name, dtype in columns.items()}
+        os.makedirs(directory, exist_ok=True)
+
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                existing = json.load(f)["columns"]
+            if existing != self.columns:
+                raise ValueError(
+                    f"{directory} holds columns {existing}, not {self.columns}"
+                )
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"columns": self.columns}, f)
+
+        self.chunk_size = chunk_size
+        self._buffers = {
+            name: np.zeros(chunk_size, dtype=dtype)
+            for name, dtype in self.columns.items()
+        }
+        self._rows = 0
+        self.totals = {name: 0.0 for name in self.columns}
+        self.rows = 0
+
+    def log(self, **values):
+        """
+        Append rows, one keyword per column (missing columns are written as 0).
+
+        Each value is a scalar (one row) or a 1-D array-like (one row per entry), all of
+        the same length.
+        """
+        values = {name: np.atleast_1d(v) for name, v in values.items()}
+        n = len(next(iter(values.values())))
+        for name, v in values.items():
+            self.totals[name] += float(v.sum())
+        self.rows += n
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_size - self._rows)
+            rows = slice(self._rows, self._rows + take)
+            for name, buf in self._buffers.items():
+                buf[rows] = values[name][start : start + take] if name in values else 0
+            self._rows += take
+            start += take
+            if self._rows == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Append the buffered rows to the column files."""
+        if not self._rows:
+            return
+        for name, buf in self._buffers.items():
+            with open(os.path.join(self.directory, name + ".bin"), "ab") as f:
+                f.write(buf[: self._rows].tobytes())
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_metrics(directory):
+    """
+    Load a metrics directory.
+
+    Returns:
+        dict: column name -> np.ndarray, all of the same length.
+    """
+    with open(os.path.join(directory, "meta.json")) as f:
+        columns = json.load(f)["columns"]
+    out = {}
+    for name, dtype in columns.items():
+        path = os.path.join(directory, name + ".bin")
+        if os.path.exists(path):
+            out[name] = np.fromfile(path, dtype=dtype)
+        else:
+            out[name] = np.zeros(0, dtype=dtype)
+    # a crash mid flush can leave columns of different lengths, keep the complete rows
+    rows = min(len(col) for col in out.values())
+    return {name: col[:rows] for name, col in out.items()}
@@ -0,0 +1,88 @@
+"""
+Offline plots of metrics directories written by metrics.MetricsSink, the only place
+besides the old scripts that imports matplotlib.
+
+    python plot_metrics.py runs/eval1 --kind rewards
+    python plot_metrics.py runs/eval1 --kind cumulative --out graphs/eval1.png
+    python plot_metrics.py runs/gamma_0.9 --kind actions
+
+Each function takes the columns (a dict from metrics.read_metrics, or the same built in
+memory), draws one of the experiments graphs, then saves it to `out` or shows it.
+"""
+
+import argparse
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from leduc_engine import ACTIONS
+from metrics import read_metrics
+
+
+def _finish(out):
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        plt.savefig(out)
+        plt.close()
+    else:
+        plt.show()
+
+
+def plot_rewards(columns, title="Rewards Over Time", out=None):
+    """Per-episode reward of both players (evaluate_agents(plot=True))."""
+    plt.figure()
+    plt.plot(columns["p0"], label="Player 0 Reward")
+    plt.plot(columns["p1"], label="Player 1 Reward")
+    plt.xlabel("Episode")
+    plt.ylabel("Reward")
+    plt.legend()
+    plt.title(title)
+    _finish(out)
+
+
+def plot_cumulative(
+    columns, labels=("Player 0", "Player 1"), title="Cumulative Reward", out=None
+):
+    """Cumulative reward of both players (the mc_type.py / convergence style lines)."""
+    plt.figure()
+    plt.plot(np.cumsum(columns["p0"], dtype=float), label=labels[0])
+    plt.plot(np.cumsum(columns["p1"], dtype=float), label=labels[1])
+    plt.xlabel("Episode")
+    plt.ylabel("Cumulative Reward")
+    plt.title(title)
+    plt.legend()
+    _finish(out)
+
+
+def plot_action_counts(columns, out=None):
+    """Cumulative action counts of each agent (evaluate_agents_with_action_counts)."""
+    plt.figure(figsize=(12, 5))
+    for pid in (0, 1):
+        plt.subplot(1, 2, pid + 1)
+        for act in ACTIONS:
+            counts = columns[f"p{pid}_{act}"]
+            if counts.any():
+                plt.plot(np.cumsum(counts, dtype=np.int64), label=act)
+        plt.title(f"Agent {pid} cumulative action counts")
+        plt.xlabel("Episode")
+        plt.ylabel("Count")
+        plt.legend()
+    plt.tight_layout()
+    _finish(out)
+
+
+PLOTS = {
+    "rewards": plot_rewards,
+    "cumulative": plot_cumulative,
+    "actions": plot_action_counts,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("directory", help="metrics directory")
+    parser.add_argument("--kind", choices=sorted(PLOTS), default="rewards")
+    parser.add_argument("--out", help="save to this file instead of showing the plot")
+    args = parser.parse_args()
+    PLOTS[args.kind](read_metrics(args.directory), out=args.out)
@@ -0,0 +1,159 @@
+"""
+Hyperparameter sweeps over a process pool with a resumable result store.
+
+A sweep is a grid {param: [values]} and a cell function run_cell(config, workdir) that
+trains / evaluates one config and returns a JSON-able dict (put artifact paths under
+"artifacts"). Every cell gets one record in the store, keyed by a hash of its config:
+
+    <store>/results/<hash>.json   config, status, result, start time, elapsed seconds
+    <store>/cells/<hash>/         the cell's workdir (checkpoints, saved agents, ...)
+
+Re-running the same sweep skips cells whose record is "done". Cells that were "running"
+or "failed" run again with the same workdir, so a cell that checkpoints its training
+there (see checkpoint.has_checkpoint / experiments.resume_training) picks up where it was
+interrupted. Configs must be JSON-able, pass state transformers by name
+(utils.STATE_TRANSFORMERS).
+
+See mc_type.py for an example.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+import traceback
+from itertools import product
+
+import numpy as np
+
+
+def expand_grid(grid):
+    """{param: [values]} -> list of config dicts, one per combination, in grid order."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[k] for k in keys))]
+
+
+def config_hash(config):
+    """Stable short hash of a JSON-able config dict."""
+    text = json.dumps(config, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def cell_seed(config):
+    """Seed of a config's cell, for random / numpy and the cell's own env."""
+    return int(config_hash(config)[:8], 16)
+
+
+class ResultStore:
+    """One JSON record per config hash under `directory`, see the module docstring."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "results"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "cells"), exist_ok=True)
+
+    def _path(self, config):
+        return os.path.join(self.directory, "results", config_hash(config) + ".json")
+
+    def workdir(self, config):
+        """Directory for the cell's checkpoints / artifacts, created if missing."""
+        path = os.path.join(self.directory, "cells", config_hash(config))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def get(self, config):
+        """The cell's record, or None if it never started."""
+        try:
+            with open(self._path(config)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, config, record):
+        # atomic so an interrupted write never leaves a broken record
+        path = self._path(config)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"config": config, **record}, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def is_done(self, config):
+        record = self.get(config)
+        return record is not None and record["status"] == "done"
+
+    def records(self):
+        """Every record in the store."""
+        out = []
+        results = os.path.join(self.directory, "results")
+        for name in sorted(os.listdir(results)):
+            if name.endswith(".json"):
+                with open(os.path.join(results, name)) as f:
+                    out.append(json.load(f))
+        return out
+
+
+def _run_cell(task):
+    """Pool worker: run one cell and record it, failures are recorded, not raised."""
+    run_cell, config, directory = task
+    store = ResultStore(directory)
+    # per cell seed, run_cell seeds its env with cell_seed(config) too, so a cell
+    # gives the same result whichever worker runs it
+    seed = cell_seed(config)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    start = time.time()
+    store.put(config, {"status": "running", "started": start})
+    try:
+        result = run_cell(config, store.workdir(config))
+    except Exception:
+        store.put(
+            config,
+            {
+                "status": "failed",
+                "started": start,
+                "elapsed": time.time() - start,
+                "error": traceback.format_exc(),
+            },
+        )
+        return config, "failed"
+    store.put(
+        config,
+        {
+            "status": "done",
+            "started": start,
+            "elapsed": time.time() - start,
+            "result": result,
+        },
+    )
+    return config, "done"
+
+
+def run_sweep(run_cell, grid, directory, num_workers=None):
+    """
+    Run every config of `grid` that is not done yet on a process pool.
+
+    Args:
+        run_cell (callable): run_cell(config, workdir) -> JSON-able dict, must be a
+            module level function so the pool can pickle it.
+        grid (dict | list): {param: [values]} (see expand_grid) or a list of configs.
+        directory (str): Result store directory.
+        num_workers (int): Worker processes, defaults to the number of cores.
+
+    Returns:
+        list: the store's record of every config of the grid, in grid order.
+    """
+    configs = expand_grid(grid) if isinstance(grid, dict) else list(grid)
+    store = ResultStore(directory)
+    todo = [c for c in configs if not store.is_done(c)]
+    print(f"sweep: {len(configs) - len(todo)} of {len(configs)} cells already done")
+
+    if todo:
+        # one task per worker at a time, cells are long
+        with mp.Pool(num_workers or mp.cpu_count(), maxtasksperchild=1) as pool:
+            tasks = [(run_cell, c, directory) for c in todo]
+            for config, status in pool.imap_unordered(_run_cell, tasks, chunksize=1):
+                print(f"sweep: {status} {config}")
+
+    return [store.get(c) for c in configs]
@@ -0,0 +1,345 @@
+import ast
+from functools import cached_property
+
+import numpy as np
+
+
+def discounted_returns(rewards, lengths, gamma):
+    """
+    Returns G_t = r_t + gamma * G_{t+1} of every step, for episodes stored back to back.
+
+    Episodes are padded into an [episodes, max_len] matrix and the recursion runs once
+    per time step over all episodes, so the arithmetic matches the reverse loop exactly.
+
+    Args:
+        rewards (np.ndarray): float array, all steps of all episodes in order.
+        lengths (np.ndarray): int array, number of steps of each episode.
+        gamma (float): Discount factor.
+
+    Returns:
+        np.ndarray: float array aligned with rewards.
+    """
+    if len(rewards) == 0:
+        return np.zeros(0)
+    starts = np.cumsum(lengths) - lengths
+    episode = np.repeat(np.arange(len(lengths)), lengths)
+    pos = np.arange(len(rewards)) - starts[episode]
+
+    max_len = lengths.max()
+    R = np.zeros((len(lengths), max_len))
+    R[episode, pos] = rewards
+    G = np.zeros((len(lengths), max_len + 1))
+    for t in reversed(range(max_len)):
+        G[:, t] = gamma * G[:, t + 1] + R[:, t]
+    return G[episode, pos]
+
+
+class TabularStore:
+    """
+    Dense Q/N tables for the MC agents.
+
+    Info states and action labels are interned to row / column ids, Q lives in a float
+    array and N in an int array, both [num_states, num_actions]. Rows and columns grow
+    geometrically. `store.Q[s][a]` / `store.N[s][a]` read and write like the old
+    defaultdict-of-defaultdict tables, except that reading an unseen entry returns 0
+    without inserting it.
+
+    Attributes:
+        state_ids (dict): info state -> row id.
+        states (list): row id -> info state.
+        action_ids (dict): action label -> column id.
+        actions (list): column id -> action label.
+        q (np.ndarray): float64 [capacity, action capacity] action values.
+        n (np.ndarray): int64 [capacity, action capacity] visit counts.
+    """
+
+    def __init__(self, capacity=1024, num_actions=4):
+        self.state_ids = {}
+        self.states = []
+        self.action_ids = {}
+        self.actions = []
+        self.q = np.zeros((capacity, num_actions))
+        self.n = np.zeros((capacity, num_actions), dtype=np.int64)
+
+    @property
+    def Q(self):
+        return _TableView(self, "q")
+
+    @property
+    def N(self):
+        return _TableView(self, "n")
+
+    def __len__(self):
+        return len(self.states)
+
+    def state_id(self, s, create=True):
+        """Row id of info state `s`, interning it if needed (None if unseen and not create)."""
+        sid = self.state_ids.get(s)
+        if sid is None and create:
+            sid = len(self.states)
+            if sid == len(self.q):
+                self._grow(max(2 * len(self.q), 16), self.q.shape[1])
+            self.state_ids[s] = sid
+            self.states.append(s)
+        return sid
+
+    def action_id(self, a, create=True):
+        """Column id of action `a`, interning it if needed (None if unseen and not create)."""
+        aid = self.action_ids.get(a)
+        if aid is None and create:
+            aid = len(self.actions)
+            if aid == self.q.shape[1]:
+                self._grow(len(self.q), max(2 * self.q.shape[1], 4))
+            self.action_ids[a] = aid
+            self.actions.append(a)
+        return aid
+
+    def _grow(self, rows, cols):
+        old_rows, old_cols = self.q.shape
+        q = np.zeros((rows, cols))
+        n = np.zeros((rows, cols), dtype=np.int64)
+        q[:old_rows, :old_cols] = self.q
+        n[:old_rows, :old_cols] = self.n
+        self.q, self.n = q, n
+
+    def best_actions(self, s, legal_acts):
+        """
+        Legal actions with the highest Q in state `s` (unseen entries count as 0.0).
+
+        Returns:
+            list: every action tied for the max, in legal_acts order.
+        """
+        sid = self.state_ids.get(s)
+        if sid is None:
+            return list(legal_acts)
+        # rows are a handful of actions wide, one tolist beats per-element indexing
+        row = self.q[sid, : len(self.actions)].tolist()
+        values = [
+            row[aid] if aid is not None else 0.0
+            for aid in map(self.action_ids.get, legal_acts)
+        ]
+        best = max(values)
+        return [a for a, v in zip(legal_acts, values) if v == best]
+
+    def encode(self, trajectories):
+        """
+        Flatten episodes of (state, action, reward) into id arrays, interning new keys.
+
+        Returns:
+            tuple: (sids, aids, rewards, lengths), the first three aligned per step and
+            lengths giving the number of steps of each episode.
+        """
+        sids, aids, rewards, lengths = [], [], [], []
+        state_id, action_id = self.state_id, self.action_id
+        for episode in trajectories:
+            lengths.append(len(episode))
+            for s, a, r in episode:
+                sids.append(state_id(s))
+                aids.append(action_id(a))
+                rewards.append(r)
+        return (
+            np.array(sids, dtype=np.int64),
+            np.array(aids, dtype=np.int64),
+            np.array(rewards, dtype=float),
+            np.array(lengths, dtype=np.int64),
+        )
+
+    def update_batch(self, sids, aids, rewards, lengths, gamma, first_visit):
+        """
+        Monte Carlo update for a whole buffer of encoded episodes (see encode).
+
+        Returns of every step come from discounted_returns. With first_visit, only the
+        first occurrence of each (state, action) met walking an episode backwards counts,
+        like the per-episode `first_visit` set in FirstVisitMCAgent. Counts and return
+        sums are then scatter-added per entry and folded in with
+        Q += (sum - count * Q) / (N + count), the batched form of Q += (G - Q) / N.
+        """
+        if len(sids) == 0:
+            return
+        G = discounted_returns(rewards, lengths, gamma)
+        cols = self.q.shape[1]
+        cells = sids * cols + aids
+
+        if first_visit:
+            episode = np.repeat(np.arange(len(lengths)), lengths)
+            key = episode * (len(self.q) * cols) + cells
+            # np.unique keeps the first index, so search the reversed steps
+            _, rev_idx = np.unique(key[::-1], return_index=True)
+            keep = len(key) - 1 - rev_idx
+            cells, G = cells[keep], G[keep]
+
+        uniq, inv = np.unique(cells, return_inverse=True)
+        count = np.bincount(inv)
+        total = np.bincount(inv, weights=G)
+
+        q = self.q.reshape(-1)
+        n = self.n.reshape(-1)
+        n_new = n[uniq] + count
+        q[uniq] += (total - count * q[uniq]) / n_new
+        n[uniq] = n_new
+
+    def merge(self, stats):
+        """Fold {(state, action): (count, sum of returns)} into N and Q exactly."""
+        for (s, a), (count, total) in stats.items():
+            sid = self.state_id(s)
+            aid = self.action_id(a)
+            self.n[sid, aid] += count
+            self.q[sid, aid] += (total - count * self.q[sid, aid]) / self.n[sid, aid]
+
+    @classmethod
+    def from_arrays(cls, states, actions, q, n):
+        """Build a store from row-ordered states/actions and their [rows, cols] Q/N."""
+        store = cls(capacity=0, num_actions=0)
+        store.states = list(states)
+        store.state_ids = {s: i for i, s in enumerate(store.states)}
+        store.actions = list(actions)
+        store.action_ids = {a: i for i, a in enumerate(store.actions)}
+        store.q = np.array(q, dtype=float)
+        store.n = np.array(n, dtype=np.int64)
+        return store
+
+    @classmethod
+    def from_dicts(cls, Q, N):
+        """Build a store from the old Q[s][a] / N[s][a] nested dicts."""
+        store = cls(capacity=max(len(Q), 1))
+        for table, arr_name in ((Q, "q"), (N, "n")):
+            for s, row in table.items():
+                sid = store.state_id(s)
+                for a, v in row.items():
+                    getattr(store, arr_name)[sid, store.action_id(a)] = v
+        return store
+
+    def __getstate__(self):
+        # only pickle the used part of the arrays
+        state = self.__dict__.copy()
+        used, cols = len(self.states), len(self.actions)
+        state["q"] = self.q[:used, :cols].copy()
+        state["n"] = self.n[:used, :cols].copy()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # leave headroom so the next insert does not immediately regrow
+        rows, cols = self.q.shape
+        self._grow(max(2 * rows, 1), max(cols, 4))
+
+
+class MappedTabularStore(TabularStore):
+    """
+    TabularStore over arrays from an agent file (see agent_format), typically np.memmap.
+
+    Q/N pages are shared with every other process mapping the same file and are only
+    copied when written or when the table grows. Info state keys stay an encoded blob
+    until the first lookup needs them. Pickling one gives back a plain TabularStore.
+    """
+
+    def __init__(self, key_blob, key_offsets, actions, q, n):
+        """
+        Args:
+            key_blob (np.ndarray): uint8 array, repr() of every state followed by ",".
+            key_offsets (np.ndarray): int64 [num_states + 1], start of each key in the blob.
+            actions (list): column id -> action label.
+            q, n (np.ndarray): [num_states, num_actions] Q and N.
+        """
+        self._key_blob = key_blob
+        self._key_offsets = key_offsets
+        self.actions = list(actions)
+        self.action_ids = {a: i for i, a in enumerate(self.actions)}
+        self.q = q
+        self.n = n
+
+    @cached_property
+    def states(self):
+        # one parse of the whole blob is much faster than one literal_eval per key
+        text = self._key_blob.tobytes().decode("utf-8")
+        return list(ast.literal_eval("(" + text + ")"))
+
+    @cached_property
+    def state_ids(self):
+        return {s: i for i, s in enumerate(self.states)}
+
+    def __len__(self):
+        # once the keys are decoded, states can grow past what is on disk
+        if "states" in self.__dict__:
+            return len(self.states)
+        return len(self._key_offsets) - 1
+
+    def __reduce__(self):
+        used, cols = len(self), len(self.actions)
+        return (
+            TabularStore.from_arrays,
+            (self.states, self.actions, self.q[:used, :cols], self.n[:used, :cols]),
+        )
+
+
+class _TableView:
+    """Q or N of a TabularStore seen as a mapping info state -> row."""
+
+    def __init__(self, store, arr_name):
+        self.store = store
+        self.arr_name = arr_name
+
+    def __getitem__(self, s):
+        return _RowView(self.store, self.arr_name, s)
+
+    def __contains__(self, s):
+        return s in self.store.state_ids
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(self.store.states)
+
+    def keys(self):
+        return list(self.store.states)
+
+    def items(self):
+        return [(s, self[s]) for s in self.store.states]
+
+
+class _RowView:
+    """One info state's row, read and written like a defaultdict(float/int)."""
+
+    def __init__(self, store, arr_name, s):
+        self.store = store
+        self.arr_name = arr_name
+        self.s = s
+
+    def _arr(self):
+        return getattr(self.store, self.arr_name)
+
+    def __getitem__(self, a):
+        sid = self.store.state_ids.get(self.s)
+        aid = self.store.action_ids.get(a)
+        if sid is None or aid is None:
+            return self._arr().dtype.type(0)
+        return self._arr()[sid, aid]
+
+    def __setitem__(self, a, v):
+        sid = self.store.state_id(self.s)
+        aid = self.store.action_id(a)
+        self._arr()[sid, aid] = v
+
+    def keys(self):
+        """Actions with any recorded visit or value in this state."""
+        sid = self.store.state_ids.get(self.s)
+        if sid is None:
+            return []
+        touched = (self.store.n[sid] != 0) | (self.store.q[sid] != 0)
+        return [self.store.actions[aid] for aid in np.flatnonzero(touched)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, a):
+        return a in self.keys()
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(a, self[a]) for a in self.keys()]
+
+    def __repr__(self):
+        return repr(dict(self.items()))
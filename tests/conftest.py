@@ -0,0 +1,31 @@
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UTILS = os.path.join(ROOT, "utils.py")
+
+_utils = None
+
+
+def _use_root_modules():
+    # the repo's modules are top level and ai-extension/ has its own utils.py, so
+    # put the root first and make `utils` the root's for the tests here (also at run
+    # time, pickle looks agents' state transformers up in sys.modules["utils"])
+    global _utils
+    if ROOT in sys.path:
+        sys.path.remove(ROOT)
+    sys.path.insert(0, ROOT)
+    if _utils is None:
+        if getattr(sys.modules.get("utils"), "__file__", UTILS) != UTILS:
+            del sys.modules["utils"]
+        _utils = importlib.import_module("utils")
+    sys.modules["utils"] = _utils
+
+
+def pytest_collectstart(collector):
+    _use_root_modules()
+
+
+def pytest_runtest_setup(item):
+    _use_root_modules()
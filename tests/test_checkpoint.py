@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from agents import FirstVisitMCAgent
+from checkpoint import Checkpointer, load_checkpoint, load_payoffs
+
+
+def _run(directory, checkpoints, reward):
+    """Checkpoint `checkpoints` times, one episode of `reward` between each."""
+    agents = [FirstVisitMCAgent(), FirstVisitMCAgent()]
+    env = SimpleNamespace(np_random=np.random.RandomState(0))
+    ckpt = Checkpointer(directory, every_episodes=1, full_every=2)
+    for _ in range(checkpoints):
+        agents[0].update([[(("SK", None, 1), "raise", reward)]])
+        ckpt.record([[reward, -reward]])
+        ckpt.maybe_save(agents, env)
+    return ckpt
+
+
+def test_fresh_run_replaces_an_older_one(tmp_path):
+    _run(str(tmp_path), 5, 1.0)
+    # the new run crashes after its first checkpoint, well before the old run's last
+    _run(str(tmp_path), 1, -1.0)
+
+    agent0, _, ckpt = load_checkpoint(str(tmp_path))
+    assert ckpt.episodes_done == 1
+    assert agent0.Q[("SK", None, 1)]["raise"] == -1.0
+    assert load_payoffs(str(tmp_path)).tolist() == [[-1.0, 1.0]]
+
+
+def test_resumed_run_keeps_its_files(tmp_path):
+    _run(str(tmp_path), 3, 1.0)
+    agent0, agent1, ckpt = load_checkpoint(str(tmp_path))
+    assert ckpt.episodes_done == 3 and ckpt.seq == 3
+    assert agent0.N[("SK", None, 1)]["raise"] == 3
+    assert len(load_payoffs(str(tmp_path))) == 3
@@ -0,0 +1,39 @@
+import random
+
+import numpy as np
+import rlcard
+
+from leduc_engine import CARD_STRS, LeducBatchEngine
+
+
+def _copy_deal(env, engine):
+    """Put rlcard's current deal (hands, next public card, blinds) into game 0."""
+    game = env.game
+    engine.reset(1)
+    engine.hands[0] = [CARD_STRS.index(p.hand.get_index()) for p in game.players]
+    engine.public_card[0] = CARD_STRS.index(game.dealer.deck[-1].get_index())
+    engine.in_chips[0] = [p.in_chips for p in game.players]
+    engine.raised[0] = engine.in_chips[0]
+    engine.game_pointer[0] = game.game_pointer
+
+
+def test_matches_rlcard_on_random_games():
+    env = rlcard.make("leduc-holdem", config={"seed": 1})
+    engine = LeducBatchEngine(0)
+    rng = random.Random(0)
+    for _ in range(3000):
+        env.reset()
+        _copy_deal(env, engine)
+        while not env.is_over():
+            assert list(engine.active_games()) == [0]
+            state = env.get_state(env.get_player_id())
+            mine = engine.get_states([0])[0]
+            assert mine["raw_obs"] == state["raw_obs"]
+            assert mine["action_record"] == list(state["action_record"])
+            assert (mine["obs"] == state["obs"]).all()
+            assert list(mine["legal_actions"]) == list(state["legal_actions"])
+            action = rng.choice(state["raw_obs"]["legal_actions"])
+            env.step(action, True)
+            engine.step([0], [action])
+        assert len(engine.active_games()) == 0
+        assert np.allclose(engine.get_payoffs()[0], env.get_payoffs())
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import rlcard
+from rlcard.games.limitholdem.utils import compare_hands
+
+from limit_engine import CARD_STRS, LimitBatchEngine, rank_hands
+
+
+def _copy_deal(env, engine):
+    """Put rlcard's current deal (hands, board to come, blinds) into game 0."""
+    game = env.game
+    engine.reset(1)
+    engine.hands[0] = [
+        [CARD_STRS.index(c.get_index()) for c in p.hand] for p in game.players
+    ]
+    # rlcard deals the board from the end of the deck
+    engine.board[0] = [
+        CARD_STRS.index(game.dealer.deck[-k].get_index()) for k in range(1, 6)
+    ]
+    engine.in_chips[0] = [p.in_chips for p in game.players]
+    engine.raised[0] = engine.in_chips[0]
+    engine.game_pointer[0] = game.game_pointer
+
+
+def test_showdowns_match_rlcard():
+    rng = np.random.default_rng(0)
+    for _ in range(5000):
+        deal = rng.permutation(52)[:9]
+        hands = [list(deal[[0, 1, 4, 5, 6, 7, 8]]), list(deal[[2, 3, 4, 5, 6, 7, 8]])]
+        winners = compare_hands([[CARD_STRS[c] for c in hand] for hand in hands])
+        values = rank_hands(np.array(hands))
+        assert [int(v == values.max()) for v in values] == winners
+
+
+def test_matches_rlcard_on_random_games():
+    env = rlcard.make("limit-holdem", config={"seed": 1})
+    engine = LimitBatchEngine(0)
+    rng = random.Random(0)
+    showdowns = 0
+    for _ in range(3000):
+        env.reset()
+        _copy_deal(env, engine)
+        while not env.is_over():
+            assert list(engine.active_games()) == [0]
+            pid = env.get_player_id()
+            assert engine.game_pointer[0] == pid
+            state = env.get_state(pid)
+            mine = engine.get_states([0])[0]
+            assert mine["raw_obs"] == state["raw_obs"]
+            assert mine["action_record"] == list(state["action_record"])
+            assert (mine["obs"] == state["obs"]).all()
+            legal = state["raw_obs"]["legal_actions"]
+            action = rng.choice(legal)
+            # fold less often, so plenty of games reach a showdown
+            if action == "fold" and rng.random() < 0.9:
+                action = legal[0]
+            env.step(action, True)
+            engine.step([0], [action])
+        assert len(engine.active_games()) == 0
+        assert np.allclose(engine.get_payoffs()[0], env.get_payoffs())
+        showdowns += action != "fold"
+    assert showdowns > 1500
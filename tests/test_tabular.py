@@ -0,0 +1,41 @@
+import pickle
+
+from agent_format import load_agent_binary, save_agent_binary
+from agents import FirstVisitMCAgent, FrozenMCAgent
+
+
+def _trained_agent():
+    agent = FirstVisitMCAgent()
+    agent.update(
+        [
+            [(("SK", None, 1), "raise", 0.0), (("SK", "HQ", 3), "call", 1.0)],
+            [(("HJ", None, 1), "fold", -1.0)],
+        ]
+    )
+    return agent
+
+
+def test_mapped_store_trains_after_load(tmp_path):
+    path = tmp_path / "agent.mca"
+    save_agent_binary(_trained_agent(), path)
+    agent = load_agent_binary(path)
+    assert len(agent.store) == 3
+
+    new_state = ("HQ", "SQ", 5)
+    agent.update([[(new_state, "call", 2.0)]])
+    assert len(agent.store) == len(agent.store.states) == 4
+    assert agent.Q[new_state]["call"] == 2.0
+
+    # pickle keeps the new row
+    clone = pickle.loads(pickle.dumps(agent))
+    assert len(clone.store) == 4
+    assert clone.Q[new_state]["call"] == 2.0
+    assert clone.Q[("SK", None, 1)]["raise"] == agent.Q[("SK", None, 1)]["raise"]
+
+    # so does writing it back out, and compiling it
+    path2 = tmp_path / "agent2.mca"
+    save_agent_binary(agent, path2)
+    reloaded = load_agent_binary(path2)
+    assert len(reloaded.store) == 4
+    assert reloaded.Q[new_state]["call"] == 2.0
+    assert new_state in FrozenMCAgent.from_agent(agent).policy
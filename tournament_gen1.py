@@ -1,6 +1,7 @@
 import rlcard
 from agents import EveryVisitMCAgent, RandomAgent
 from experiments import play_episodes, evaluate_agents
+from checkpoint import Checkpointer
 from utils import process_leduc_state_v4
 
 NUM_EPISODES = 1000000
@@ -29,6 +30,7 @@ train_payoffs = play_episodes(
     do_update=True,
     update_freq=UPDATE_FREQ,
     state_transformer=process_leduc_state_v4,
+    checkpoint=Checkpointer("checkpoints/gen1_v4", every_episodes=100000),
 )
 
 g1av4, r_g1av4 = evaluate_agents(
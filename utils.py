@@ -1,3 +1,17 @@
+from abstraction import bucket_history
+
+# integer key versions of the transformers below, see encoders.py
+from encoders import (
+    encode_leduc_state_v1,
+    encode_leduc_state_v2,
+    encode_leduc_state_v3,
+    encode_leduc_state_v4,
+    encode_limit_state_v1,
+    encode_limit_state_v2,
+)
+from isomorphism import SuitCanonical
+
+
 def process_leduc_state_v1(raw_imperfect_state, pid):
     """we are given a lot of information in the leduc game state for a GIVEN player (note this is imperfect info)
     but we want some minimalist, consistent version that can be used for 'uniqueness' as well as for our conveience,
@@ -84,7 +98,6 @@ def process_leduc_state_v4(raw_imperfect_state, pid):
     """
     raw_obs = raw_imperfect_state["raw_obs"]
     hand = raw_obs["hand"]
-    print(raw_obs)
     public_card = raw_obs["public_card"]
     # make immutable
     action_record = tuple(raw_imperfect_state["action_record"])
@@ -124,3 +137,52 @@ def process_limit_state_v2(raw_imperfect_state, pid):
     opp_chips = total_chips - my_chips
 
     return (hand, public_cards, my_chips, opp_chips)
+
+
+def process_limit_state_v3(raw_imperfect_state, pid):
+    """
+    process_limit_state_v1 with hand strength buckets (see abstraction.py) instead of
+    the cards: the hand's bucket on every street so far, then the chips and raises.
+    """
+    raw_obs = raw_imperfect_state["raw_obs"]
+    buckets = bucket_history(raw_obs["hand"], raw_obs.get("public_cards", []))
+    my_chips = raw_obs["my_chips"]
+    opp_chips = sum(raw_obs["all_chips"]) - my_chips
+    raise_nums = tuple(raw_obs.get("raise_nums", []))
+    return (buckets, my_chips, opp_chips, raise_nums)
+
+
+def process_limit_state_v4(raw_imperfect_state, pid):
+    """process_limit_state_v2 with hand strength buckets instead of the cards."""
+    raw_obs = raw_imperfect_state["raw_obs"]
+    buckets = bucket_history(raw_obs["hand"], raw_obs.get("public_cards", []))
+    my_chips = raw_obs["my_chips"]
+    opp_chips = sum(raw_obs["all_chips"]) - my_chips
+    return (buckets, my_chips, opp_chips)
+
+
+# registered transformers, agent files store the name instead of a function reference
+STATE_TRANSFORMERS = {
+    f.__name__: f
+    for f in (
+        process_leduc_state_v1,
+        process_leduc_state_v2,
+        process_leduc_state_v3,
+        process_leduc_state_v4,
+        process_limit_state_v1,
+        process_limit_state_v2,
+        process_limit_state_v3,
+        process_limit_state_v4,
+        encode_leduc_state_v1,
+        encode_leduc_state_v2,
+        encode_leduc_state_v3,
+        encode_leduc_state_v4,
+        encode_limit_state_v1,
+        encode_limit_state_v2,
+    )
+}
+# suit isomorphic versions of all of them, named canonical_<name> (see isomorphism.py)
+STATE_TRANSFORMERS.update(
+    (f"canonical_{name}", SuitCanonical(f))
+    for name, f in list(STATE_TRANSFORMERS.items())
+)